@@ -0,0 +1,83 @@
+"""Compare the binary (.jrtb) format with text formats on builder output.
+
+For each format: the file size, the time to load it into an rdflib Graph
+and, for .jrtb, the time to iterate its triples without building a graph.
+Times are the best of ``--repeat`` runs.
+
+    python benchmarks/bench_binary.py --records 10000 50000
+"""
+
+import argparse
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+
+from rdflib import Graph
+
+from jrt.binary import iter_binary, read_binary, write_binary
+from jrt.builder import GraphBuilder
+
+TEXT_FORMATS = {"nt": "nt", "ttl": "turtle", "xml": "xml"}
+
+
+def make_records(count: int) -> list:
+    return [
+        {
+            "id": f"r{i}",
+            "name": f"Record {i}",
+            "description": f"Record {i}, second of its kind",
+            "created": "2021-03-04",
+            "rank": i,
+            "score": i / 3,
+            "active": i % 2 == 0,
+            "homepage": f"https://example.org/{i}",
+            "tags": ["a", "b"],
+        }
+        for i in range(count)
+    ]
+
+
+def best(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'records':>8} {'triples':>9} {'format':>10} {'size':>10} {'load':>8} {'vs jrtb':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.records:
+            graph = GraphBuilder(data=make_records(count)).build()
+            binary = Path(tmp) / "out.jrtb"
+            write_binary(graph, binary)
+            fast = best(lambda: read_binary(binary), args.repeat)
+            assert len(read_binary(binary)) == len(graph), "binary round trip lost triples"
+
+            rows = [("jrtb", binary.stat().st_size, fast)]
+            rows.append(
+                ("jrtb iter", binary.stat().st_size, best(lambda: deque(iter_binary(binary), 0), 1))
+            )
+            for suffix, rdflib_format in TEXT_FORMATS.items():
+                path = Path(tmp) / f"out.{suffix}"
+                graph.serialize(destination=path, format=rdflib_format, encoding="utf-8")
+                load = best(lambda: Graph().parse(path, format=rdflib_format), args.repeat)
+                rows.append((suffix, path.stat().st_size, load))
+
+            for name, size, load in rows:
+                print(
+                    f"{count:>8} {len(graph):>9} {name:>10} {size / 2**20:>8.2f}Mi "
+                    f"{load:>7.3f}s {load / fast:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
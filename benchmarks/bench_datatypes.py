@@ -0,0 +1,63 @@
+"""Compare per-value datatype detection with the batch API on large columns.
+
+Each column mixes dates, date-times, booleans, URIs and plain strings with
+``--distinct`` different values; the script checks both give the same result.
+Times are the best of ``--repeat`` runs.
+
+    python benchmarks/bench_datatypes.py --values 1000000 --distinct 1000 100000
+"""
+
+import argparse
+import logging
+import random
+import time
+
+from jrt.datatypes import detect_datatype, detect_datatypes
+
+# rdflib logs every invalid date it is asked to convert
+logging.getLogger("rdflib.term").setLevel(logging.ERROR)
+
+
+def make_column(count: int, distinct: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    kinds = [
+        lambda i: f"{2000 + i % 30}-{1 + i % 12:02d}-{1 + i % 31:02d}",
+        lambda i: f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z",
+        lambda i: ("true", "false")[i % 2],
+        lambda i: f"https://example.org/item/{i}",
+        lambda i: f"item {i}",
+        lambda i: str(i),
+    ]
+    pool = [kinds[i % len(kinds)](i) for i in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def best(func, column: list, repeat: int) -> tuple:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(column)
+        runs.append(time.perf_counter() - start)
+    return min(runs), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=1000000)
+    parser.add_argument("--distinct", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'values':>8} {'distinct':>8} {'single':>8} {'batch':>8} {'speedup':>8}")
+    for distinct in args.distinct:
+        column = make_column(args.values, distinct)
+        single, expected = best(lambda c: [detect_datatype(v) for v in c], column, args.repeat)
+        batch, result = best(detect_datatypes, column, args.repeat)
+        assert result == expected, "detect_datatypes disagrees with detect_datatype"
+        print(
+            f"{args.values:>8} {distinct:>8} {single:>7.3f}s {batch:>7.3f}s {single / batch:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
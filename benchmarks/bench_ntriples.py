@@ -0,0 +1,69 @@
+"""Compare NTriplesWriter with rdflib's N-Triples serializer on builder output.
+
+Both write the same file (the script checks the bytes are identical); the
+time of each is the best of ``--repeat`` runs.
+
+    python benchmarks/bench_ntriples.py --records 10000 100000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from jrt.builder import GraphBuilder
+from jrt.ntriples import NTriplesWriter
+
+
+def make_records(count: int) -> list:
+    return [
+        {
+            "id": f"r{i}",
+            "name": f"Record {i}",
+            "description": f'Record "{i}"\nsecond line',
+            "created": "2021-03-04",
+            "rank": i,
+            "score": i / 3,
+            "active": i % 2 == 0,
+            "homepage": f"https://example.org/{i}",
+            "tags": ["a", "b"],
+        }
+        for i in range(count)
+    ]
+
+
+def best(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'records':>8} {'triples':>9} {'rdflib':>8} {'writer':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        reference, output = Path(tmp) / "rdflib.nt", Path(tmp) / "jrt.nt"
+        for count in args.records:
+            graph = GraphBuilder(data=make_records(count)).build()
+
+            def with_rdflib():
+                graph.serialize(destination=reference, format="nt", encoding="utf-8")
+
+            def with_writer():
+                with output.open("wb") as f, NTriplesWriter(f) as writer:
+                    writer.write(graph)
+
+            slow, fast = best(with_rdflib, args.repeat), best(with_writer, args.repeat)
+            assert reference.read_bytes() == output.read_bytes(), "outputs differ"
+            print(f"{count:>8} {len(graph):>9} {slow:>7.3f}s {fast:>7.3f}s {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
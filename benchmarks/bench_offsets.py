@@ -0,0 +1,52 @@
+"""Compare reading a slice at the end of a JSON array by streaming and through its index.
+
+Streaming parses every item before the slice; the index seeks to the end
+of the item before it. Both read the same items (the script checks).
+
+    python benchmarks/bench_offsets.py --records 200000 --slice 1000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+from jrt.offsets import RecordIndex, index_records
+from jrt.reader import iter_records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--slice", type=int, default=1000)
+    args = parser.parse_args()
+
+    records = [
+        {"id": f"p{i}", "name": f"Person {i}", "tags": ["a", "b"], "age": i % 90}
+        for i in range(args.records)
+    ]
+    start, stop = args.records - args.slice, args.records
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "records.json"
+        path.write_text(json.dumps(records), encoding="utf-8")
+        print(f"{path.stat().st_size / 2**20:.1f} MiB, items {start} to {stop}")
+
+        begin = time.perf_counter()
+        expected = list(islice(iter_records(path), start, stop))
+        print(f"{'stream':<10} {time.perf_counter() - begin:>7.3f}s")
+
+        begin = time.perf_counter()
+        index_records(path)
+        print(f"{'index':<10} {time.perf_counter() - begin:>7.3f}s  (once)")
+
+        begin = time.perf_counter()
+        with RecordIndex(path) as index:
+            selected = list(index.records(start, stop))
+        print(f"{'range':<10} {time.perf_counter() - begin:>7.3f}s")
+        assert selected == expected, "readers disagree"
+
+
+if __name__ == "__main__":
+    main()
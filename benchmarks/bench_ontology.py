@@ -0,0 +1,69 @@
+"""Time OntologyResolver indexing on synthetic ontologies of increasing size.
+
+Each term gets an ``rdf:type`` (cycling through the four indexed kinds), an
+``rdfs:label`` and an ``rdfs:comment``. The per-triple scan the resolver used
+to perform is timed alongside as a reference.
+
+    python benchmarks/bench_ontology.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import time
+from collections import defaultdict
+
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS
+
+from jrt.ontology import OntologyResolver
+
+KINDS = [OWL.Class, OWL.ObjectProperty, OWL.DatatypeProperty, RDF.Property]
+
+
+def make_ontology(terms: int) -> Graph:
+    g = Graph()
+    for i in range(terms):
+        s = URIRef(f"http://example.org/onto#term{i}")
+        g.add((s, RDF.type, KINDS[i % len(KINDS)]))
+        g.add((s, RDFS.label, Literal(f"Term {i}")))
+        g.add((s, RDFS.comment, Literal(f"Synthetic term number {i}")))
+    return g
+
+
+def per_triple_scan(g: Graph) -> None:
+    """Reference: visit every triple, splitting the subject URI each time."""
+    labels, kinds = defaultdict(set), defaultdict(set)
+    for s, p, o in g:
+        if not isinstance(s, URIRef):
+            continue
+        if p == RDFS.label and isinstance(o, Literal):
+            labels[str(o).lower()].add(s)
+        localname = s.split("#")[-1] if "#" in s else s.rsplit("/", 1)[-1]
+        labels[localname.lower()].add(s)
+        if p == RDF.type and o in KINDS:
+            kinds[o].add(s)
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'terms':>9} {'triples':>9} {'per-triple':>11} {'resolver':>9} {'speedup':>8}")
+    for terms in args.sizes:
+        g = make_ontology(terms)
+        reference = timed(per_triple_scan, g)
+        indexed = timed(OntologyResolver, [g])
+        print(
+            f"{terms:>9} {len(g):>9} {reference:>10.3f}s {indexed:>8.3f}s "
+            f"{reference / indexed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
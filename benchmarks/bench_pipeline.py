@@ -0,0 +1,78 @@
+"""Compare a sequential streamed conversion with the pipelined one, and profile its stages.
+
+Records are written to a temporary JSON array and NDJSON file, then
+converted to N-Triples files: read by a :class:`jrt.reader.RecordStream`,
+then by a :class:`jrt.pipeline.Pipeline` with ``--workers`` parse threads.
+Both outputs hold the same distinct lines (the script checks). The busy share of
+each pipeline stage is printed after its time.
+
+    python benchmarks/bench_pipeline.py --records 20000 --workers 1 4
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from jrt.builder import GraphBuilder
+from jrt.pipeline import Pipeline
+from jrt.reader import RecordStream
+
+
+def make_records(count: int) -> list:
+    return [
+        {
+            "id": f"p{i}",
+            "name": f"Person {i}",
+            "born": f"19{i % 100:02d}-01-02",
+            "age": i % 90,
+            "address": {"id": f"a{i % 500}", "city": "Paris"},
+            "tags": ["a", "b"],
+        }
+        for i in range(count)
+    ]
+
+
+def convert(data, output: Path) -> float:
+    builder = GraphBuilder(data=data)
+    start = time.perf_counter()
+    with output.open("wb") as f:
+        builder.write(f)
+    return time.perf_counter() - start
+
+
+def lines(path: Path) -> set:
+    # the root resource is random in every run; the pipeline writes the
+    # triples of resources shared by records again in every flush
+    return {line for line in path.read_bytes().splitlines() if b"owl#Thing" not in line}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    with tempfile.TemporaryDirectory() as tmp:
+        array, ndjson = Path(tmp) / "records.json", Path(tmp) / "records.ndjson"
+        array.write_text(json.dumps(records, indent=1), encoding="utf-8")
+        ndjson.write_text("\n".join(json.dumps(r) for r in records) + "\n", encoding="utf-8")
+        expected = Path(tmp) / "expected.nt"
+        print(f"{'sequential':<22} {convert(RecordStream(array), expected):>7.3f}s")
+        expected_lines = lines(expected)
+
+        for source in (array, ndjson):
+            for workers in args.workers if source is ndjson else [1]:
+                pipeline = Pipeline(source, parse_workers=workers)
+                output = Path(tmp) / "pipeline.nt"
+                seconds = convert(pipeline, output)
+                assert lines(output) == expected_lines, "conversions disagree"
+                busy = " ".join(f"{n} {s.utilization:>4.0%}" for n, s in pipeline.stats.items())
+                name = f"pipeline {source.suffix} x{workers}"
+                print(f"{name:<22} {seconds:>7.3f}s  {busy}")
+
+
+if __name__ == "__main__":
+    main()
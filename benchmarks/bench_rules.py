@@ -0,0 +1,57 @@
+"""Compare a per-value rule with the same lookup table as a BatchRule.
+
+Both rules map each record's code to a URI through a dict and produce the
+same triples (the script checks). Times are the best of ``--repeat``
+builds; "in rule" is the time the builder's rule_stats report for the rule.
+
+    python benchmarks/bench_rules.py --records 10000 100000
+"""
+
+import argparse
+import time
+
+from rdflib import URIRef
+
+from jrt.builder import GraphBuilder
+from jrt.rules import BatchRule
+
+CODES = {f"c{i}": URIRef(f"https://example.org/code/{i}") for i in range(100)}
+
+RULES = {
+    "single": lambda key, code: (key, CODES[code]),
+    "batch": BatchRule(lambda key, items: [(s, key, CODES[code]) for s, code in items]),
+}
+
+
+def make_records(count: int) -> list:
+    return [{"id": f"r{i}", "code": f"c{i % 100}", "tags": ["a"]} for i in range(count)]
+
+
+def build(records: list, rule) -> tuple:
+    builder = GraphBuilder(data=records)
+    builder.add_rule("code", rule)
+    start = time.perf_counter()
+    graph = builder.build()
+    return time.perf_counter() - start, builder.rule_stats["code"].seconds, graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'records':>8} {'rule':>8} {'build':>8} {'in rule':>8}")
+    for count in args.records:
+        records = make_records(count)
+        graphs = []
+        for name, rule in RULES.items():
+            runs = [build(records, rule) for _ in range(args.repeat)]
+            total, in_rule, graph = min(runs, key=lambda run: run[0])
+            graphs.append({t for t in graph if t[2] in CODES.values()})
+            print(f"{count:>8} {name:>8} {total:>7.3f}s {in_rule:>7.3f}s")
+        assert graphs[0] == graphs[1], "rules disagree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare the generic conversion of nested records with schema-planned conversion.
+
+Records hold nested objects and arrays, so the tabular fast path does not
+apply. Every object has an id, so both builds give the same triples (the
+script checks). Times are the best of ``--repeat`` builds; the inferred
+schema's sampling and compilation are included.
+
+    python benchmarks/bench_schema.py --records 10000 50000
+"""
+
+import argparse
+import time
+
+from rdflib.namespace import OWL
+
+from jrt.builder import GraphBuilder
+
+
+def make_records(count: int) -> list:
+    return [
+        {
+            "id": f"p{i}",
+            "name": f"Person {i}",
+            "type": "Person",
+            "born": f"19{i % 100:02d}-01-02",
+            "age": i % 90,
+            "email": f"https://example.org/people/{i}",
+            "address": {"id": f"a{i % 500}", "city": "Paris", "zip": "75001"},
+            "tags": ["a", "b"],
+            "knows": [{"id": f"p{i + 1}", "name": f"Person {i + 1}"}],
+            "note": None,
+        }
+        for i in range(count)
+    ]
+
+
+def build(records: list, infer_schema: bool) -> tuple:
+    builder = GraphBuilder(data=records, infer_schema=infer_schema)
+    start = time.perf_counter()
+    graph = builder.build()
+    return time.perf_counter() - start, graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'records':>8} {'generic':>8} {'schema':>8} {'speedup':>8}")
+    for count in args.records:
+        records = make_records(count)
+        times, graphs = [], []
+        for infer_schema in (False, True):
+            total, graph = min(
+                (build(records, infer_schema) for _ in range(args.repeat)), key=lambda r: r[0]
+            )
+            times.append(total)
+            graphs.append({t for t in graph if t[2] != OWL.Thing})
+        assert graphs[0] == graphs[1], "conversions disagree"
+        print(f"{count:>8} {times[0]:>7.3f}s {times[1]:>7.3f}s {times[0] / times[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
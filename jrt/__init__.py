@@ -2,23 +2,61 @@
 
 Public API::
 
-    from jrt import GraphBuilder, OntologyLoader, OntologyResolver, Ontology
+    from jrt import BatchRule, GraphBuilder, OntologyLoader, OntologyResolver, Ontology
+
+The public classes and ``__version__`` are loaded lazily on first access, so
+``import jrt`` (and short-lived commands such as ``jrt version``) do not pay for
+importing rdflib.
 """
 
-from importlib.metadata import PackageNotFoundError, version
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from .builder import GraphBuilder
-from .ontology import Ontology, OntologyLoader, OntologyResolver
+if TYPE_CHECKING:  # pragma: no cover
+    from .builder import GraphBuilder
+    from .ontology import Ontology, OntologyLoader, OntologyResolver
+    from .rules import BatchRule
 
-try:
-    __version__ = version("jrt")
-except PackageNotFoundError:  # pragma: no cover - running from a source checkout
-    __version__ = "0.0.0.dev0"
+# Public attribute -> submodule defining it
+_LAZY_ATTRIBUTES = {
+    "BatchRule": ".rules",
+    "GraphBuilder": ".builder",
+    "Ontology": ".ontology",
+    "OntologyLoader": ".ontology",
+    "OntologyResolver": ".ontology",
+}
 
 __all__ = [
+    "BatchRule",
     "GraphBuilder",
     "Ontology",
     "OntologyLoader",
     "OntologyResolver",
     "__version__",
 ]
+
+
+def _read_version() -> str:
+    # importlib.metadata alone costs more than the rest of `import jrt`
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("jrt")
+    except PackageNotFoundError:  # pragma: no cover - running from a source checkout
+        return "0.0.0.dev0"
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        value = globals()[name] = _read_version()
+        return value
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # cache: later lookups bypass __getattr__
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,190 @@
+"""Compact binary RDF files: a term dictionary plus a table of term ids.
+
+Text formats repeat every term on every line it appears in and need a
+parser to read back. A ``.jrtb`` file stores each distinct term once and
+each triple as three integers, so loading it is a few bulk reads, one term
+construction per *distinct* term and a zip over the id table.
+
+File layout (little-endian, ``u32`` unless stated)::
+
+    header        magic (8 bytes), version, term count N, triple count T
+    kinds         N bytes: URI, blank node, plain/typed/language literal,
+                  or language tag (a pseudo-term referenced by literals)
+    extras        N ids: the datatype term of a typed literal, the language
+                  tag term of a language literal, 0 otherwise
+    offsets       N + 1 offsets, in characters, into the decoded text blob
+    triples       3 x T term ids, subject / predicate / object per triple
+    text blob     UTF-8 lexical forms of every term, concatenated
+
+Offsets count characters rather than bytes so the blob is decoded once and
+every term is a plain ``str`` slice of it.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.term import Node
+
+from .ntriples import _graph_triples
+
+MAGIC = b"JRTRDF\x00\x00"
+VERSION = 1
+SUFFIX = ".jrtb"
+
+_HEADER = struct.Struct("<8sIII")
+
+# Term kinds, as stored in the kinds table
+URI, BLANK, PLAIN, TYPED, LANGUAGE_LITERAL, LANGUAGE_TAG = range(6)
+
+Triple = Tuple[Node, Node, Node]
+
+
+def _ids(values) -> array:
+    table = array("I", values)
+    if sys.byteorder == "big":  # pragma: no cover - the file is little-endian
+        table.byteswap()
+    return table
+
+
+def write_binary(graph: Graph, destination: Union[Path, IO[bytes]]) -> None:
+    """Write the triples of *graph* to *destination* (a path or binary stream)."""
+    if isinstance(destination, Path):
+        with destination.open("wb") as f:
+            write_binary(graph, f)
+        return
+
+    ids: Dict[Node, int] = {}
+    kinds = bytearray()
+    extras: List[int] = []
+    texts: List[str] = []
+    tags: Dict[str, int] = {}
+
+    def term_id(term: Node) -> int:
+        i = ids.get(term)
+        if i is not None:
+            return i
+        extra = 0
+        if isinstance(term, Literal):
+            if term.language:
+                extra = tags.get(term.language)
+                if extra is None:
+                    extra = tags[term.language] = _append(LANGUAGE_TAG, term.language, 0)
+                kind = LANGUAGE_LITERAL
+            elif term.datatype:
+                extra = term_id(term.datatype)
+                kind = TYPED
+            else:
+                kind = PLAIN
+        elif isinstance(term, BNode):
+            kind = BLANK
+        elif isinstance(term, URIRef):
+            kind = URI
+        else:
+            raise ValueError(f"Cannot store {type(term).__name__} term {term!r}")
+        i = ids[term] = _append(kind, str(term), extra)
+        return i
+
+    def _append(kind: int, text: str, extra: int) -> int:
+        kinds.append(kind)
+        extras.append(extra)
+        texts.append(text)
+        return len(texts) - 1
+
+    triples = array("I")
+    for s, p, o in _graph_triples(graph):
+        triples.append(term_id(s))
+        triples.append(term_id(p))
+        triples.append(term_id(o))
+    if sys.byteorder == "big":  # pragma: no cover
+        triples.byteswap()
+
+    offsets = [0]
+    for text in texts:
+        offsets.append(offsets[-1] + len(text))
+
+    destination.write(_HEADER.pack(MAGIC, VERSION, len(texts), len(triples) // 3))
+    destination.write(kinds)
+    destination.write(_ids(extras).tobytes())
+    destination.write(_ids(offsets).tobytes())
+    destination.write(triples.tobytes())
+    destination.write("".join(texts).encode("utf-8"))
+
+
+def iter_binary(source: Union[Path, IO[bytes]]) -> Iterator[Triple]:
+    """Yield the triples stored in *source* (a path or binary stream)."""
+    terms, table = _load(source)
+    lookup = terms.__getitem__
+    return zip(
+        map(lookup, table[0::3]),
+        map(lookup, table[1::3]),
+        map(lookup, table[2::3]),
+    )
+
+
+def read_binary(source: Union[Path, IO[bytes]], graph: Optional[Graph] = None) -> Graph:
+    """Load the triples stored in *source* into *graph* (a new Graph by default)."""
+    if graph is None:
+        graph = Graph(bind_namespaces="rdflib")
+    graph.addN((s, p, o, graph) for s, p, o in iter_binary(source))
+    return graph
+
+
+def _load(source: Union[Path, IO[bytes]]) -> Tuple[List[Node], array]:
+    data = source.read_bytes() if isinstance(source, Path) else source.read()
+    try:
+        magic, version, n, t = _HEADER.unpack_from(data)
+    except struct.error:
+        raise ValueError("Not a binary RDF (.jrtb) file") from None
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a binary RDF (.jrtb) file (version {VERSION})")
+
+    pos = _HEADER.size
+    kinds = data[pos : pos + n]
+    pos += n
+    tables = []
+    for size in (n, n + 1, 3 * t):
+        table = array("I")
+        table.frombytes(data[pos : pos + 4 * size])
+        if sys.byteorder == "big":  # pragma: no cover
+            table.byteswap()
+        tables.append(table)
+        pos += 4 * size
+    extras, offsets, triples = tables
+    try:
+        text = data[pos:].decode("utf-8")
+    except UnicodeDecodeError:
+        text = ""
+    if len(kinds) != n or len(offsets) != n + 1 or len(triples) != 3 * t:
+        raise ValueError("Truncated binary RDF (.jrtb) file")
+    if offsets[n] != len(text):
+        raise ValueError("Truncated binary RDF (.jrtb) file")
+
+    texts = [text[offsets[i] : offsets[i + 1]] for i in range(n)]
+    terms: List[Node] = [None] * n  # type: ignore[list-item]
+    # Every term was an rdflib term when written, so URIs, blank nodes and
+    # untyped literals are rebuilt without the validation and lexical-to-value
+    # conversion of their constructors. Datatypes and language tags are stored
+    # before the literals using them.
+    new = str.__new__
+    for i, (kind, value) in enumerate(zip(kinds, texts)):
+        if kind == URI:
+            terms[i] = new(URIRef, value)
+        elif kind == PLAIN or kind == LANGUAGE_LITERAL:
+            literal = terms[i] = new(Literal, value)
+            literal._language = texts[extras[i]] if kind == LANGUAGE_LITERAL else None
+            literal._datatype = literal._ill_typed = None
+            literal._value = value
+        elif kind == TYPED:
+            # keep the stored lexical form as is, valid or not
+            terms[i] = Literal(value, datatype=terms[extras[i]], normalize=False)
+        elif kind == BLANK:
+            terms[i] = new(BNode, value)
+        elif kind != LANGUAGE_TAG:
+            raise ValueError(f"Unknown term kind {kind} in binary RDF (.jrtb) file")
+    return terms, triples
@@ -1,18 +1,49 @@
 # lib/jrt/graph_builder.py
 from __future__ import annotations
 
+import hashlib
+import os
+import time
 import warnings
 from dataclasses import dataclass
+from itertools import chain, groupby, islice
 from pathlib import Path
-from typing import Any, Callable, List, Mapping, Optional, Union
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Union,
+)
+from urllib.parse import quote
 from uuid import NAMESPACE_DNS, uuid4, uuid5
 
-from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib import Dataset, Graph, Literal, Namespace, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
 from rdflib.namespace import DC, DCTERMS, FOAF, OWL, RDF, RDFS, SKOS, XSD
 
+from .checkpoint import Checkpoint, CheckpointState, LabelJournal
 from .constants import *
-from .datatypes import to_literal
+from .datatypes import detect_datatypes, to_literal
+from .jsonld import JsonLdWriter, jsonld_context
+from .keys import KeyMatcher
+from .mapping import MappingSpec, PathRule
+from .memo import CLASS, PREDICATE, Memo
+from .memory import LABEL_COST, TRIPLE_COST, LabelIndex
+from .ntriples import CACHE_SIZE, NTriplesWriter
 from .ontology import Ontology, OntologyResolver
+from .paths import ANY_ITEM, PathNode, format_segment
+from .pipeline import Pipeline, PipelineWriter
+from .reader import RecordStream, fingerprint, hash_range
+from .rules import BatchRule, RuleStats
+from .schema import SAMPLE_SIZE, ObjectShape, Schema, infer_schema
+from .stats import FLUSH_EVERY, OutputStats, StatsSink
+from .tabular import record_columns
 
 # Namespaces considered for *predicate* resolution (XSD intentionally omitted)
 PREDICATE_NAMESPACES = [FOAF, SKOS, DCTERMS, DC, RDFS]
@@ -21,6 +52,9 @@ CLASS_NAMESPACES = PREDICATE_NAMESPACES + [OWL]
 # Full catalogue used for generic public-term lookups
 NAMESPACE_CATALOGUE = CLASS_NAMESPACES
 
+# Ways of splitting the output into named graphs (see GraphBuilder `partition`)
+PARTITIONS = ("file", "record", "path")
+
 
 class GraphBuilder:
 
@@ -30,21 +64,99 @@ class GraphBuilder:
         ontologies: Optional[Union[Ontology, List[Ontology]]] = None,
         base_uri: Optional[Union[str, URIRef, Namespace]] = "http://example.org/resource/",
         detect_datatypes: bool = True,
+        tabular: bool = True,
+        mapping: Optional[MappingSpec] = None,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        resolver: Optional[OntologyResolver] = None,
+        hierarchy: bool = False,
+        normalize_keys: bool = False,
+        match_threshold: Optional[float] = None,
+        singular_keys: bool = False,
+        max_memory: Optional[int] = None,
+        spill_dir: Optional[Path] = None,
+        partition: Optional[str] = None,
+        source: Optional[str] = None,
+        dataset: Optional[Dataset] = None,
+        schema: Optional[Schema] = None,
+        infer_schema: bool = False,
+        memo: Optional[Memo] = None,
     ):
         self.ontologies = (
             (ontologies if isinstance(ontologies, list) else [ontologies]) if ontologies else None
         )
         self.detect_datatypes = detect_datatypes
+        self.tabular = tabular
         self.base_uri = self.__build_base_uri(base_uri) if base_uri else None
         self.graph = Graph(bind_namespaces="rdflib")
         self.data = data
-        self.resolver = OntologyResolver(
-            [o.graph for o in self.ontologies] if self.ontologies else []
+        if resolver is None:
+            resolver = OntologyResolver(
+                [o.graph for o in self.ontologies] if self.ontologies else [],
+                hierarchy=hierarchy,
+            )
+        elif hierarchy and not resolver.hierarchy:
+            # a compiled index holds no class hierarchy or property domains
+            raise ValueError("hierarchy=True needs a resolver built with the hierarchy")
+        self.resolver = resolver
+        self.key_matcher: KeyMatcher | None = None
+        if normalize_keys or match_threshold is not None or singular_keys:
+            self.key_matcher = KeyMatcher(
+                self._predicate_terms(), threshold=match_threshold, singularize=singular_keys
+            )
+        # the memo holds results for these ontologies and options only
+        self.memo = memo
+        if memo is not None:
+            memo.bind(
+                self.resolver.fingerprint(),
+                str(self.base_uri),
+                normalize_keys,
+                match_threshold,
+                singular_keys,
+            )
+        self.max_memory = max_memory
+        self.label_index: MutableMapping[str, URIRef] = (
+            LabelIndex(spill_dir) if max_memory is not None else {}
         )
-        self.label_index: dict[str, URIRef] = {}
+        self.flushes = 0
+        self.spills = 0
+        # object-property values linked to an existing resource, or given a new one
+        self.link_hits = 0
+        self.link_misses = 0
+        self._sink: NTriplesWriter | JsonLdWriter | StatsSink | PipelineWriter | None = None
+        # while writing, flush every this many top-level records (0: never)
+        self._flush_every = 0
+        self._unflushed_records = 0
+        self._written = 0
+        self._checkpoint: Checkpoint | None = None
+        self._checkpoint_state: CheckpointState | None = None
+        self._input_digest = None  # sha256 of the input up to the checkpoint offset
+        self.partition = partition
+        self.source = source
+        self.dataset: Dataset | None = None
+        self._graphs: Dict[URIRef, Graph] = {}
+        if partition is not None:
+            if partition not in PARTITIONS:
+                raise ValueError(f"Unknown partition {partition!r}; use one of {PARTITIONS}")
+            if partition == "file" and not source:
+                raise ValueError("partition='file' needs the `source` the data was read from")
+            self.dataset = dataset if dataset is not None else Dataset()
+            self._use_graph(self._file_graph() if partition == "file" else DATASET_DEFAULT_GRAPH_ID)
         self.rules: dict[str, Any] = {}
+        self.rule_stats: Dict[str, RuleStats] = {}
+        # values queued for each batch rule: (graph, subject, value)
+        self._batches: Dict[str, list] = {}
+        self.plan: PathNode | None = None
+        if mapping is not None or include or exclude:
+            spec = mapping if mapping is not None else MappingSpec()
+            self.plan = spec.compile(include=include or (), exclude=exclude or ())
+        self.schema = schema
+        self.infer_schema = infer_schema
+        # conversion plan of each object shape of the schema, while building
+        self._shapes: Dict[tuple, tuple] | None = None
 
     def build(self) -> Graph:
+        """Convert ``data``; return the graph, or the Dataset when ``partition`` is set."""
         with warnings.catch_warnings():
             warnings.filterwarnings(
                 "ignore",
@@ -52,15 +164,148 @@ class GraphBuilder:
                 category=UserWarning,
             )
             self._bind_namespaces()
-            root_subject = self._materialize(self.data)
+            streaming = isinstance(self.data, Iterable) and not isinstance(
+                self.data, (Mapping, list, str, bytes)
+            )
+            self._shapes = self._shape_plans(streaming)
+            if not streaming:
+                root_subject = self._materialize(
+                    self.data, plan=self.plan, path=self._root_path(), record=True
+                )
+            else:
+                # a stream of top-level records (see jrt.reader.iter_records),
+                # converted like the items of a top-level list
+                item_plan = self.plan.items if self.plan is not None else None
+                item_path = self._item_path(self._root_path())
+                for record in self.data:
+                    self._materialize(record, plan=item_plan, path=item_path, record=True)
+                    self._maybe_flush(record_end=True)
+                    if self._checkpoint is not None:
+                        self._next_checkpoint()
+                root_subject = URIRef(f"{self.base_uri}{uuid4()}")
+            self._run_batches()
             if root_subject is not None:
+                if self.partition == "path":
+                    self._use_graph(self._path_graph("$"))
                 self.graph.add((root_subject, RDF.type, OWL.Thing))
 
             # Add external ontologies if provided
             if self.ontologies:
+                target = self.graph
+                if self.dataset is not None:
+                    target = self.dataset.graph(DATASET_DEFAULT_GRAPH_ID)
                 for onto in self.ontologies:
-                    self.graph += onto.graph
-        return self.graph
+                    target += onto.graph
+        return self.dataset if self.dataset is not None else self.graph
+
+    def write(
+        self,
+        destination: IO[bytes],
+        background: bool = False,
+        format: str = "nt",
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> int:
+        """Build the graph as N-Triples (N-Quads, JSON-LD) into *destination*.
+
+        Returns the number of triples written.
+
+        With ``max_memory`` set, whenever the estimated size of the graph and
+        label index reaches it, the triples built so far are written out and
+        dropped, and a label index taking half the budget moves to disk.
+        When ``data`` is a stream of records (see
+        :func:`jrt.reader.iter_records`), the next record is only read once
+        the flush is done, which bounds the parsed input as well.
+
+        Triples repeated across flushes are written again: pipe the output
+        through ``jrt sort --dedupe`` for a duplicate-free file. *background*
+        writes the output from a separate thread (see
+        :class:`~jrt.ntriples.NTriplesWriter`).
+
+        ``format="json-ld"`` writes compact JSON-LD (see
+        :class:`~jrt.jsonld.JsonLdWriter`) and flushes after every top-level
+        record, so each record becomes its own node objects as soon as it is
+        converted.
+
+        When ``data`` is a :class:`~jrt.pipeline.Pipeline`, the records are
+        read and parsed by its threads, and the triples are flushed every
+        ``flush_every`` records to a thread formatting and writing them.
+
+        With ``partition`` set, ``format="nq"`` writes N-Quads naming the graph
+        of every triple; N-Triples and JSON-LD cannot carry graph names.
+
+        With a *checkpoint* (see :mod:`jrt.checkpoint`), ``data`` must be a
+        :class:`~jrt.reader.RecordStream` and *destination* a seekable file.
+        When the checkpoint holds a saved state, the conversion resumes from
+        it: *destination* is truncated to the output saved so far and the
+        records are read from the saved offset. A state saved for another
+        input (by size, :func:`~jrt.reader.fingerprint` and a hash of the input
+        before the saved offset, read again to check it) or format raises
+        ValueError, before *destination* is touched.
+        """
+        if format not in ("nt", "nq", "json-ld"):
+            raise ValueError(f"Cannot write format {format!r}; use 'nt', 'nq' or 'json-ld'")
+        if self.dataset is not None and format != "nq":
+            raise ValueError(f"Named graphs (partition={self.partition!r}) need format 'nq'")
+        if checkpoint is not None:
+            if format == "json-ld":
+                raise ValueError("Checkpoints need format 'nt' or 'nq'")
+            if not isinstance(self.data, RecordStream):
+                raise ValueError("Checkpoints need `data` read as a jrt.reader.RecordStream")
+            self._resume(checkpoint, destination, format)
+        if format == "json-ld":
+            self._write_to(JsonLdWriter(destination, self.jsonld_context()), flush_every=1)
+        else:
+            self._write_to(NTriplesWriter(destination, background=background))
+        return self._written
+
+    def write_stats(self) -> OutputStats:
+        """Convert ``data`` like :meth:`write`, but return aggregates of the triples instead.
+
+        The triples are counted and dropped every ``FLUSH_EVERY`` top-level
+        records (see :mod:`jrt.stats`), so the graph is never held whole.
+        """
+        sink = StatsSink(str(self.base_uri) if self.base_uri else "")
+        hits, misses = self.link_hits, self.link_misses
+        self._write_to(sink, flush_every=FLUSH_EVERY)
+        sink.stats.link_hits = self.link_hits - hits
+        sink.stats.link_misses = self.link_misses - misses
+        return sink.stats
+
+    def _write_to(self, sink: Any, flush_every: int = 0) -> None:
+        """Build into *sink*, flushing every *flush_every* top-level records (0: as needed)."""
+        self._sink = sink
+        self._flush_every = flush_every
+        if isinstance(self.data, Pipeline):
+            self._sink = self.data.writer(self._sink)
+            self._flush_every = self._flush_every or self.data.flush_every
+        try:
+            self.build()
+            self._flush()
+            self._sink.close()
+        finally:
+            if isinstance(self._sink, PipelineWriter):
+                self._sink.stop()
+            self._sink = None
+            self._flush_every = self._unflushed_records = 0
+            self._checkpoint = self._checkpoint_state = self._input_digest = None
+            if isinstance(self.label_index, LabelJournal):
+                self.label_index = self.label_index.index
+            if isinstance(self.label_index, LabelIndex):
+                self.label_index.close()
+
+    def jsonld_context(self) -> dict:
+        """The JSON-LD context of :meth:`write`: the base URI and namespace prefixes.
+
+        Besides the namespaces bound on every graph, prefixes of the ontologies
+        are kept when they name the namespace of some term they define.
+        """
+        namespaces = self._namespace_bindings()
+        for onto in self.ontologies or ():
+            defined = {str(s) for s in onto.graph.subjects() if isinstance(s, URIRef)}
+            for prefix, namespace in onto.graph.namespaces():
+                if any(term.startswith(namespace) for term in defined):
+                    namespaces.append((prefix, namespace))
+        return jsonld_context(self.base_uri, namespaces)
 
     @staticmethod
     def search_public_namespaces(term: str) -> URIRef | None:
@@ -70,10 +315,18 @@ class GraphBuilder:
         return None
 
     def add_rule(
-        self, key: str, value_or_callable: URIRef | Literal | Callable[[str, Any], URIRef | Literal]
+        self,
+        key: str,
+        value_or_callable: URIRef | Literal | BatchRule | Callable[[str, Any], URIRef | Literal],
     ) -> None:
-        """Attach a rule to a specific JSON key, overriding its value."""
+        """Attach a rule to a specific JSON key, overriding its value.
+
+        A :class:`~jrt.rules.BatchRule` receives the values of many resources
+        in one call; ``rule_stats[key]`` counts what each rule did and how long
+        it took.
+        """
         self.rules[key.lower()] = value_or_callable
+        self.rule_stats.setdefault(key.lower(), RuleStats())
 
     def __build_base_uri(self, base_uri: Any) -> Namespace:
         if isinstance(base_uri, str) or isinstance(base_uri, URIRef):
@@ -88,88 +341,605 @@ class GraphBuilder:
         node: Any,
         parent: URIRef | None = None,
         key: str | None = None,
+        plan: PathNode | None = None,
+        domain: URIRef | None = None,
+        path: str | None = None,
+        record: bool = False,
     ) -> URIRef | None:
-        """Recursively convert *node* and attach it to *parent* if provided."""
-        if key:
-            rule = self.rules.get(key.lower())
-            if callable(rule):
-                # rule handles dict/list/primitive: must return (key, object) or a triple list
-                result = rule(key, node)
-                if result is not None:
-                    if isinstance(result, tuple) and len(result) == 2:
-                        if parent is not None:
-                            predicate = self._predicate_uri(result[0])
-                            self.graph.add((parent, predicate, result[1]))
-                    elif isinstance(result, list):
-                        for triple in result:
-                            self.graph.add(triple)
-                    return parent
+        """Recursively convert *node* and attach it to *parent* if provided.
 
-            elif isinstance(rule, (URIRef, Literal)) and parent is not None:
-                predicate = self._predicate_uri(key)
-                self.graph.add((parent, predicate, rule))
+        *plan* is the node of the compiled mapping trie matching *node*'s path,
+        *domain* the class of *parent* (only tracked when the resolver knows
+        the ontology hierarchy). *path* is the JSON path of *node* (only
+        tracked when partitioning by path) and *record* tells whether *node*
+        is a top-level record.
+        """
+        path_rule: PathRule | None = plan.value if plan is not None else None
+        if path_rule is not None and path_rule.skip:
+            return parent
+
+        if key and self.rules:
+            rule = self.rules.get(key.lower())
+            if rule is not None and self._apply_rule(rule, key, node, parent):
                 return parent
 
         # -------- dict => resource --------------------------------------
         if isinstance(node, Mapping):
+            shape_plan = self._shapes.get(tuple(node)) if self._shapes is not None else None
+            if shape_plan is not None:
+                subject = self._materialize_shape(node, shape_plan, record)
+                if parent is not None and key is not None:
+                    self.graph.add((parent, self._predicate_uri(key), subject))
+                return subject
             subject = self._subject_uri(node)
             if parent is not None and key is not None:
-                self.graph.add((parent, self._predicate_uri(key), subject))
+                self.graph.add((parent, self._path_predicate(key, path_rule, domain), subject))
+            # the resource's own triples go to its partition
+            previous = None
+            if path is not None:
+                previous = self._use_graph(self._path_graph(path))
+            elif record and self.partition == "record":
+                previous = self._use_graph(self._record_graph(subject))
+            if path_rule is not None and path_rule.rdf_type is not None:
+                self.graph.add((subject, RDF.type, path_rule.rdf_type))
 
+            node_class = self._node_class(node) if self.resolver.hierarchy else None
             for k, v in node.items():
-                self._materialize(v, parent=subject, key=k)
+                self._materialize(
+                    v,
+                    parent=subject,
+                    key=k,
+                    plan=plan.child(k) if plan else None,
+                    domain=node_class,
+                    path=f"{path}{format_segment(k)}" if path is not None else None,
+                )
 
             # add to label index if a label has been set on this resource
             label = self._extract_label(node)
             if label:
                 self.label_index.setdefault(label.lower(), subject)
 
+            if previous is not None:
+                self._use_graph(previous)
+            self._maybe_flush()
             return subject
 
         # -------- list ---------------------------------------------------
         if isinstance(node, list):
+            item_plan = plan.items if plan is not None else None
+            item_path = self._item_path(path)
+            columns = record_columns(node) if self.tabular else None
+            if columns is not None:
+                subjects = self._materialize_table(node, columns, item_plan, record, item_path)
+                if parent is not None and key is not None:
+                    predicate = self._path_predicate(key, path_rule, domain)
+                    for child in subjects:
+                        self.graph.add((parent, predicate, child))
+                    return parent
+                return parent or URIRef(f"{self.base_uri}{uuid4()}")
+
             if parent is not None and key is not None:
-                predicate = self._predicate_uri(key)
+                predicate = self._path_predicate(key, path_rule, domain)
+                item_rule = item_plan.value if item_plan is not None else None
                 for item in node:
                     if isinstance(item, Mapping):
-                        child = self._materialize(item)
+                        child = self._materialize(item, plan=item_plan, path=item_path)
                         if child is not None:
                             self.graph.add((parent, predicate, child))
-                    else:
+                    elif item_rule is None or not item_rule.skip:
                         # primitive element -> literal or linked resource
-                        obj = self._literal_or_link(item, predicate)
+                        obj = self._literal_or_link(item, predicate, item_rule)
                         self.graph.add((parent, predicate, obj))
                 return parent
             # top‑level list (rare): just iterate
             for item in node:
-                self._materialize(item, parent=parent, key=key)
+                self._materialize(
+                    item, parent=parent, key=key, plan=item_plan, path=item_path, record=record
+                )
+                self._maybe_flush(record_end=True)
             return parent or URIRef(f"{self.base_uri}{uuid4()}")
 
         # -------- primitive ---------------------------------------------
         if parent is not None and key is not None:
-            predicate = self._predicate_uri(key)
+            predicate = self._path_predicate(key, path_rule, domain)
             if predicate == RDF.type and isinstance(node, str):
-                class_uri = self.resolver.resolve(node) or self._search_class_namespaces(node)
+                class_uri = self._class_uri(node)
                 self.graph.add((parent, predicate, class_uri if class_uri else Literal(node)))
             else:
                 if str(node) not in ["None", None, ""]:
-                    obj = self._literal_or_link(node, predicate)
+                    obj = self._literal_or_link(node, predicate, path_rule)
                     self.graph.add((parent, predicate, obj))
         return parent or URIRef(f"{self.base_uri}{uuid4()}")
 
+    def _shape_plans(self, streaming: bool) -> Dict[tuple, tuple] | None:
+        """Compile the schema (inferred from a sample first, if asked) into per-shape plans.
+
+        Mapping specs, the class hierarchy and path partitions make the
+        conversion of an object depend on more than its keys; the schema is
+        not used with them.
+        """
+        if self.plan is not None or self.resolver.hierarchy or self.partition == "path":
+            return None
+        if self.schema is None and self.infer_schema:
+            if streaming:
+                records = iter(self.data)
+                sample = list(islice(records, SAMPLE_SIZE))
+                if records is self.data:  # a one-shot iterator: put the sample back
+                    self.data = chain(sample, records)
+                self.schema = infer_schema(sample)
+            else:
+                self.schema = infer_schema(self.data)
+        if self.schema is None:
+            return None
+        return {keys: self._shape_plan(shape) for keys, shape in self.schema.shapes.items()}
+
+    def _shape_plan(self, shape: ObjectShape) -> tuple:
+        """The id key, label keys and per-key predicate, rule and literal cache of *shape*."""
+        fields = []
+        for key in shape.keys:
+            predicate = self._predicate_uri(key)
+            fields.append(
+                (
+                    key,
+                    self.rules.get(key.lower()),
+                    predicate,
+                    predicate == RDF.type,
+                    self.resolver.is_object_property(predicate),
+                    {},
+                )
+            )
+        return shape.id_key, shape.label_keys, fields
+
+    def _materialize_shape(
+        self, node: Mapping[str, Any], plan: tuple, record: bool = False
+    ) -> URIRef:
+        """Convert *node*, an object of a known shape, with the shape's *plan*; return its subject.
+
+        Produces the same triples as :meth:`_materialize`. Keys with a rule
+        and arrays go through the generic path.
+        """
+        id_key, label_keys, fields = plan
+        if id_key is not None:
+            subject = URIRef(f"{self.base_uri}{uuid5(NAMESPACE_DNS, str(node[id_key]))}")
+        else:
+            subject = URIRef(f"{self.base_uri}{uuid4()}")
+        previous = None
+        if record and self.partition == "record":
+            previous = self._use_graph(self._record_graph(subject))
+        add = self.graph.add
+        for (key, rule, predicate, is_type, is_link, cache), value in zip(fields, node.values()):
+            if rule is not None or isinstance(value, list):
+                self._materialize(value, parent=subject, key=key)
+                add = self.graph.add
+            elif isinstance(value, Mapping):
+                child_plan = self._shapes.get(tuple(value))
+                if child_plan is None:
+                    self._materialize(value, parent=subject, key=key)
+                    add = self.graph.add
+                else:
+                    child = self._materialize_shape(value, child_plan)
+                    add = self.graph.add
+                    add((subject, predicate, child))
+            elif is_type and isinstance(value, str):
+                obj = cache.get(value)
+                if obj is None:
+                    class_uri = self._class_uri(value)
+                    obj = cache[value] = class_uri if class_uri else Literal(value)
+                add((subject, predicate, obj))
+            elif str(value) not in ("None", ""):
+                if is_link and isinstance(value, str):
+                    obj = self._literal_or_link(value, predicate)
+                else:
+                    # keyed by type too: 1, 1.0 and True are equal dict keys
+                    cache_key = (type(value), value)
+                    obj = cache.get(cache_key)
+                    if obj is None:
+                        if len(cache) >= CACHE_SIZE:
+                            cache.clear()
+                        obj = cache[cache_key] = self._literal_or_link(value, predicate)
+                add((subject, predicate, obj))
+
+        label = next((node[k] for k in label_keys if isinstance(node[k], str)), None)
+        if label:
+            self.label_index.setdefault(label.lower(), subject)
+        if previous is not None:
+            self._use_graph(previous)
+        self._maybe_flush()
+        return subject
+
+    def _resume(self, checkpoint: Checkpoint, destination: IO[bytes], format: str) -> None:
+        """Start checkpointing, from the state saved in *checkpoint* if any."""
+        path = self.data.path
+        identity = (path.stat().st_size, fingerprint(path), format)
+        digest = hashlib.sha256()
+        state = checkpoint.state
+        if state is not None:
+            saved = (state.input_size, state.input_fingerprint, state.format)
+            if saved[:2] != identity[:2]:
+                raise ValueError(f"Checkpoint {checkpoint.path} was saved for another input")
+            if saved[2] != format:
+                raise ValueError(
+                    f"Checkpoint {checkpoint.path} was saved for format {saved[2]!r}, "
+                    f"not {format!r}"
+                )
+            hash_range(digest, path, 0, state.offset)
+            if digest.hexdigest() != state.input_digest:
+                raise ValueError(f"Checkpoint {checkpoint.path} was saved for another input")
+            destination.seek(state.output_size)
+            destination.truncate()
+            for label, uri in checkpoint.labels():
+                self.label_index[label] = uri
+            self._written = state.triples
+            self.data = RecordStream(path, self.data.plan, state.offset)
+        else:
+            hash_range(digest, path, 0, self.data.start)
+        self._input_digest = digest
+        self._checkpoint = checkpoint
+        self._checkpoint_state = state or CheckpointState(
+            offset=self.data.start,
+            input_size=identity[0],
+            input_fingerprint=identity[1],
+            format=format,
+            input_digest=digest.hexdigest(),
+        )
+        self.label_index = LabelJournal(self.label_index)
+
+    def _next_checkpoint(self) -> None:
+        """Count a converted record; every ``checkpoint.every`` records, save a checkpoint."""
+        state = self._checkpoint_state
+        state.records += 1
+        if state.records % self._checkpoint.every:
+            return
+        self._flush()
+        self._sink.flush()
+        stream = self._sink.stream
+        stream.flush()
+        try:
+            os.fsync(stream.fileno())
+        except OSError:  # not a file (io.UnsupportedOperation is an OSError)
+            pass
+        offset = self.data.offset
+        hash_range(self._input_digest, self.data.path, state.offset, offset)
+        state.offset = offset
+        state.input_digest = self._input_digest.hexdigest()
+        state.output_size = stream.tell()
+        state.triples = self._written
+        self._checkpoint.save(state, self.label_index.added)
+        self.label_index.added.clear()
+
+    def _maybe_flush(self, record_end: bool = False) -> bool:
+        """While writing, flush at the end of every ``_flush_every`` top-level records,
+        or once over ``max_memory``; True if the graph was replaced."""
+        if self._sink is None:
+            return False
+        if record_end and self._flush_every:
+            self._unflushed_records += 1
+            if self._unflushed_records >= self._flush_every:
+                self._flush()
+                return True
+        return self.max_memory is not None and self._check_budget()
+
+    def _check_budget(self) -> bool:
+        """Flush (and spill labels) once over ``max_memory``; True if the graph was replaced."""
+        labels = self.label_index.in_memory * LABEL_COST
+        output = self.dataset if self.dataset is not None else self.graph
+        if len(output) * TRIPLE_COST + labels < self.max_memory:
+            return False
+        if labels >= self.max_memory // 2:
+            self.label_index.spill()
+            self.spills += 1
+        self._flush()
+        return True
+
+    def _flush(self) -> None:
+        """Write the triples built so far to the sink and start an empty graph."""
+        self._unflushed_records = 0
+        # queued values belong to the graph about to be written
+        self._run_batches()
+        if self.dataset is not None:
+            written = 0
+            for context in self.dataset.store.contexts():
+                self._sink.write_graph(context)
+                written += len(context)
+            if not written:
+                return
+            self._written += written
+            self.flushes += 1
+            current = self.graph.identifier
+            self.dataset = Dataset()
+            self._graphs.clear()
+            self._use_graph(current)
+            return
+        if not len(self.graph):
+            return
+        self._sink.write(self.graph)
+        self._written += len(self.graph)
+        self.flushes += 1
+        # sinks do not use the graph's prefixes, and binding them costs more
+        # than converting a small record
+        self.graph = Graph(bind_namespaces="none")
+
+    def _use_graph(self, name: URIRef) -> URIRef:
+        """Add the triples that follow to the named graph *name*; return the previous name."""
+        previous = self.graph.identifier
+        graph = self._graphs.get(name)
+        if graph is None:
+            graph = self._graphs[name] = self.dataset.graph(name)
+        self.graph = graph
+        return previous
+
+    def _graph_name(self, local: str) -> URIRef:
+        return URIRef(f"{self.base_uri}graph/{local}")
+
+    def _record_graph(self, subject: URIRef) -> URIRef:
+        """The graph of a top-level record: named after its resource, so stable given an id."""
+        return self._graph_name(subject[len(self.base_uri) :])
+
+    def _path_graph(self, path: str) -> URIRef:
+        return self._graph_name(quote(path, safe="$.*"))
+
+    def _file_graph(self) -> URIRef:
+        """The graph named after ``source``: as is when it is an IRI (e.g. a file: URI)."""
+        if ":" in self.source:
+            return URIRef(self.source)
+        return self._graph_name(quote(self.source, safe=""))
+
+    def _root_path(self) -> str | None:
+        """JSON path of the document root, tracked only when partitioning by path."""
+        return "$" if self.partition == "path" else None
+
+    @staticmethod
+    def _item_path(path: str | None) -> str | None:
+        return f"{path}{ANY_ITEM}" if path is not None else None
+
+    def _path_predicate(
+        self, key: str, path_rule: PathRule | None, domain: URIRef | None = None
+    ) -> URIRef:
+        if path_rule is not None and path_rule.predicate is not None:
+            return path_rule.predicate
+        return self._predicate_uri(key, domain)
+
+    def _node_class(self, node: Mapping[str, Any]) -> URIRef | None:
+        """Class named by the type key of *node*, used to pick domain-matching predicates."""
+        for k, v in node.items():
+            if k.lower() in TYPE_KEYS and isinstance(v, str):
+                return self._class_uri(v)
+        return None
+
+    def _class_uri(self, value: str) -> URIRef | None:
+        if self.memo is not None:
+            return self.memo.lookup(CLASS, value, self._resolve_class, value)
+        return self._resolve_class(value)
+
+    def _resolve_class(self, value: str) -> URIRef | None:
+        return self.resolver.resolve(value) or self._search_class_namespaces(value)
+
+    def _apply_rule(self, rule: Any, key: str, node: Any, parent: URIRef | None) -> bool:
+        """Apply *rule* to *node*; return True if the rule fully handled it."""
+        if isinstance(rule, BatchRule):
+            if parent is None:
+                return False
+            name = key.lower()
+            batch = self._batches.setdefault(name, [])
+            batch.append((self.graph, parent, node))
+            if len(batch) >= rule.batch_size:
+                self._run_batch(name)
+            return True
+
+        if callable(rule):
+            stats = self.rule_stats.setdefault(key.lower(), RuleStats())
+            start = time.perf_counter()
+            # rule handles dict/list/primitive: must return (key, object) or a triple list
+            result = rule(key, node)
+            stats.calls += 1
+            if result is None:
+                stats.seconds += time.perf_counter() - start
+                return False
+            stats.values += 1
+            if isinstance(result, tuple) and len(result) == 2:
+                if parent is not None:
+                    predicate = self._predicate_uri(result[0])
+                    self.graph.add((parent, predicate, result[1]))
+                    stats.triples += 1
+            elif isinstance(result, list):
+                for triple in result:
+                    self.graph.add(triple)
+                stats.triples += len(result)
+            stats.seconds += time.perf_counter() - start
+            return True
+
+        if isinstance(rule, (URIRef, Literal)) and parent is not None:
+            predicate = self._predicate_uri(key)
+            self.graph.add((parent, predicate, rule))
+            stats = self.rule_stats.setdefault(key.lower(), RuleStats())
+            stats.values += 1
+            stats.triples += 1
+            return True
+        return False
+
+    def _run_batch(self, name: str) -> None:
+        """Call the batch rule of key *name* on its queued values and add the triples."""
+        items = self._batches.pop(name, None)
+        if not items:
+            return
+        rule, stats = self.rules[name], self.rule_stats.setdefault(name, RuleStats())
+        predicates: Dict[str, URIRef] = {}
+        start = time.perf_counter()
+        # one call per run of values bound for the same (named) graph
+        for graph, run in groupby(items, key=lambda item: item[0]):
+            add = graph.add
+            values = [(subject, value) for _, subject, value in run]
+            stats.calls += 1
+            stats.values += len(values)
+            for s, p, o in rule.func(name, values):
+                if not isinstance(p, URIRef):
+                    predicate = predicates.get(p)
+                    if predicate is None:
+                        predicate = predicates[p] = self._predicate_uri(p)
+                    p = predicate
+                add((s, p, o))
+                stats.triples += 1
+        stats.seconds += time.perf_counter() - start
+
+    def _run_batches(self) -> None:
+        for name in list(self._batches):
+            self._run_batch(name)
+
+    def _materialize_table(
+        self,
+        rows: List[Mapping[str, Any]],
+        columns: List[str],
+        plan: PathNode | None = None,
+        records: bool = False,
+        path: str | None = None,
+    ) -> List[URIRef]:
+        """Convert a table of flat records column-wise; return one subject per row.
+
+        Produces the same triples as materializing each row on its own, but
+        predicates, rules, class lookups and datatypes are resolved once per
+        column (and once per distinct value) rather than once per cell.
+        Rows are top-level records when *records* is set; *path* is the JSON
+        path of the rows (see :meth:`_materialize`).
+        """
+        id_key = next((k for k in columns if k.lower() in ID_KEYS), None)
+        label_keys = [k for k in columns if k.lower() in LABEL_KEYS]
+
+        row_rule: PathRule | None = plan.value if plan is not None else None
+        if row_rule is not None and row_rule.skip:
+            return []
+        row_type = row_rule.rdf_type if row_rule is not None else None
+
+        def column_plans(domain: URIRef | None) -> list:
+            plans = []
+            for column in columns:
+                column_plan = plan.child(column) if plan is not None else None
+                column_rule = column_plan.value if column_plan is not None else None
+                if column_rule is not None and column_rule.skip:
+                    continue
+                predicate = self._path_predicate(column, column_rule, domain)
+                plans.append(
+                    (
+                        column,
+                        self.rules.get(column.lower()),
+                        predicate,
+                        predicate == RDF.type,
+                        self.resolver.is_object_property(predicate),
+                        column_rule.datatype if column_rule is not None else None,
+                        {},
+                    )
+                )
+            return plans
+
+        # with the hierarchy loaded, predicates depend on each row's class
+        type_key = next((k for k in columns if k.lower() in TYPE_KEYS), None)
+        by_class = self.resolver.hierarchy and type_key is not None
+        default_plans = plans = column_plans(None)
+        plans_by_class: dict = {}
+
+        # datatypes of the distinct strings of each plain column, detected as one batch
+        detected: Dict[str, Dict[str, URIRef | None]] = {}
+        if self.detect_datatypes:
+            for column, _, _, is_type, is_link, datatype, _ in default_plans:
+                if not (is_type or is_link or datatype is not None):
+                    values = list({row[column] for row in rows if isinstance(row[column], str)})
+                    if values:
+                        detected[column] = dict(zip(values, detect_datatypes(values)))
+
+        subjects: List[URIRef] = []
+        by_record = records and self.partition == "record"
+        previous = None
+        if path is not None:
+            previous = self._use_graph(self._path_graph(path))
+        elif by_record:
+            previous = self.graph.identifier
+        add = self.graph.add
+        for row in rows:
+            if id_key is not None:
+                subject = URIRef(f"{self.base_uri}{uuid5(NAMESPACE_DNS, str(row[id_key]))}")
+            else:
+                subject = URIRef(f"{self.base_uri}{uuid4()}")
+            subjects.append(subject)
+            if by_record:
+                self._use_graph(self._record_graph(subject))
+                add = self.graph.add
+            if row_type is not None:
+                add((subject, RDF.type, row_type))
+            if by_class:
+                row_class = row[type_key]
+                if row_class not in plans_by_class:
+                    domain = self._class_uri(row_class) if isinstance(row_class, str) else None
+                    plans_by_class[row_class] = column_plans(domain) if domain else default_plans
+                plans = plans_by_class[row_class]
+
+            for column, rule, predicate, is_type, is_link, datatype, cache in plans:
+                value = row[column]
+                if rule is not None and self._apply_rule(rule, column, value, subject):
+                    continue
+                if is_type and isinstance(value, str):
+                    obj = cache.get(value)
+                    if obj is None:
+                        class_uri = self._class_uri(value)
+                        obj = cache[value] = class_uri if class_uri else Literal(value)
+                    add((subject, predicate, obj))
+                elif str(value) not in ("None", ""):
+                    if datatype is not None:
+                        obj = Literal(value, datatype=datatype)
+                    elif is_link and isinstance(value, str):
+                        obj = self._literal_or_link(value, predicate)
+                    else:
+                        # keyed by type too: 1, 1.0 and True are equal dict keys
+                        cache_key = (type(value), value)
+                        obj = cache.get(cache_key)
+                        if obj is None:
+                            obj = cache[cache_key] = self._literal_or_link(
+                                value, predicate, datatypes=detected.get(column)
+                            )
+                    add((subject, predicate, obj))
+
+            label = next((row[k] for k in label_keys if isinstance(row[k], str)), None)
+            if label:
+                self.label_index.setdefault(label.lower(), subject)
+            if self._maybe_flush(record_end=records):
+                add = self.graph.add
+        if previous is not None:
+            self._use_graph(previous)
+        return subjects
+
     def _literal_or_link(
         self,
         value: Any,
         predicate: URIRef,
+        path_rule: PathRule | None = None,
+        datatypes: Mapping[str, URIRef | None] | None = None,
     ) -> URIRef | Literal:
-        """Return a Literal or link to an existing resource if predicate is object-property."""
+        """Return a Literal or link to an existing resource if predicate is object-property.
+
+        *datatypes* maps string values to their already detected datatypes
+        (see :func:`jrt.datatypes.detect_datatypes`).
+        """
+        if path_rule is not None and path_rule.datatype is not None:
+            return Literal(value, datatype=path_rule.datatype)
         if isinstance(value, str) and self.resolver.is_object_property(predicate):
             linked = self.label_index.get(value.lower())
-            if linked is None:
+            if linked is not None:
+                self.link_hits += 1
+            else:
+                self.link_misses += 1
                 linked = URIRef(f"{self.base_uri}{uuid4()}")
                 self.graph.add((linked, RDFS.label, Literal(value)))
                 self.label_index[value.lower()] = linked
             return linked
+        datatype = self.resolver.datatype_range(predicate)
+        if datatype is not None:
+            literal = Literal(value, datatype=datatype)
+            # a value that does not fit the declared range keeps the heuristics
+            if not literal.ill_typed:
+                return literal
+        if self.detect_datatypes and isinstance(value, str):
+            if datatypes is not None and value in datatypes:
+                return Literal(value, datatype=datatypes[value])
+            if self.memo is not None:
+                return Literal(value, datatype=self.memo.datatype(value))
         return to_literal(value, self.detect_datatypes)
 
     def _subject_uri(self, obj: Mapping[str, Any]) -> URIRef:
@@ -181,7 +951,13 @@ class GraphBuilder:
             uid = uuid4()
         return URIRef(f"{self.base_uri}{uid}")
 
-    def _predicate_uri(self, key: str) -> URIRef:
+    def _predicate_uri(self, key: str, domain: URIRef | None = None) -> URIRef:
+        if self.memo is not None:
+            memo_key = f"{key}\x1f{domain}" if domain is not None else key
+            return self.memo.lookup(PREDICATE, memo_key, self._resolve_predicate, key, domain)
+        return self._resolve_predicate(key, domain)
+
+    def _resolve_predicate(self, key: str, domain: URIRef | None = None) -> URIRef:
         lkey = key.lower()
         if lkey in LABEL_KEYS:
             return RDFS.label
@@ -191,8 +967,8 @@ class GraphBuilder:
             return RDF.type
 
         # Ontology first (object OR datatype properties)
-        onto_uri = self.resolver.resolve(key)
-        if onto_uri is not None and self.resolver.is_property(onto_uri):
+        onto_uri = self.resolver.resolve_property(key, domain)
+        if onto_uri is not None:
             return onto_uri
 
         # Public namespace fallback (sans XSD)
@@ -200,6 +976,16 @@ class GraphBuilder:
         if ns_uri is not None:
             return ns_uri
 
+        # Same lookups with the spelling of the closest known term
+        if self.key_matcher is not None:
+            term = self.key_matcher.match(key)
+            if term is not None:
+                uri = self.resolver.resolve_property(term, domain)
+                if uri is None:
+                    uri = self._search_predicate_namespaces(term)
+                if uri is not None:
+                    return uri
+
         # Base namespace fallback
         return URIRef(f"{self.base_uri}{lkey}")
 
@@ -210,6 +996,14 @@ class GraphBuilder:
                 return mapping[k]
         return None
 
+    def _predicate_terms(self) -> List[str]:
+        """Spellings `_predicate_uri` resolves: ontology property labels, namespace properties."""
+        terms = [label for label in self.resolver.labels() if self.resolver.resolve_property(label)]
+        for ns in PREDICATE_NAMESPACES:
+            # by convention property names start lowercase, class names uppercase
+            terms.extend(t for t in getattr(ns, "__annotations__", {}) if t[:1].islower())
+        return terms
+
     @staticmethod
     def _search_predicate_namespaces(term: str) -> URIRef | None:
         for ns in PREDICATE_NAMESPACES:
@@ -225,14 +1019,20 @@ class GraphBuilder:
                 return getattr(ns, term)
         return None
 
+    def _namespace_bindings(self) -> List[tuple]:
+        return [
+            ("rdf", RDF),
+            ("rdfs", RDFS),
+            ("owl", OWL),
+            ("foaf", FOAF),
+            ("skos", SKOS),
+            ("dcterms", DCTERMS),
+            ("dc", DC),
+            ("xsd", XSD),
+            ("ex", self.base_uri),
+        ]
+
     def _bind_namespaces(self) -> None:
         nm = self.graph.namespace_manager
-        nm.bind("rdf", RDF)
-        nm.bind("rdfs", RDFS)
-        nm.bind("owl", OWL)
-        nm.bind("foaf", FOAF)
-        nm.bind("skos", SKOS)
-        nm.bind("dcterms", DCTERMS)
-        nm.bind("dc", DC)
-        nm.bind("xsd", XSD)
-        nm.bind("ex", self.base_uri)
+        for prefix, namespace in self._namespace_bindings():
+            nm.bind(prefix, namespace)
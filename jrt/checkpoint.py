@@ -0,0 +1,169 @@
+"""Checkpoints of long streamed conversions, to resume them after a crash.
+
+Every :attr:`Checkpoint.every` top-level records,
+:meth:`jrt.builder.GraphBuilder.write` flushes the triples built so far to
+the output, syncs it to disk, then saves to a SQLite file, in one
+transaction:
+
+- the size and :func:`~jrt.reader.fingerprint` of the input, and the
+  output format, so a resume refuses a replaced input or another format;
+- the input offset just past the last converted record, and a sha256 hash
+  of the input before it, so a resume also refuses an edit anywhere in the
+  records already converted;
+- the size of the output at that point;
+- the label index entries added since the previous checkpoint.
+
+A resumed run truncates the output to the saved size, reloads the label
+index and reads the input from the saved offset. So it links labels and
+flushes at exactly the points an uninterrupted run would, and writes the
+same output. Resources without an id get random URIs in any run.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, MutableMapping, Optional, Tuple
+
+from rdflib import URIRef
+
+# Top-level records converted between two checkpoints
+CHECKPOINT_EVERY = 10000
+
+# Appended to the output path to name its checkpoint file
+SUFFIX = ".checkpoint"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    records INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    output_size INTEGER NOT NULL,
+    triples INTEGER NOT NULL,
+    input_size INTEGER NOT NULL,
+    input_fingerprint TEXT NOT NULL,
+    format TEXT NOT NULL,
+    input_digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS labels (label TEXT PRIMARY KEY, uri TEXT NOT NULL);
+"""
+
+
+@dataclass
+class CheckpointState:
+    """Where a conversion stood at its last checkpoint."""
+
+    records: int = 0  # top-level records converted
+    offset: int = 0  # input byte offset just past the last of them
+    output_size: int = 0  # output bytes written for them
+    triples: int = 0  # triples written for them
+    input_size: int = 0  # size of the input converted
+    input_fingerprint: str = ""  # jrt.reader.fingerprint of the input
+    format: str = ""  # output format
+    input_digest: str = ""  # sha256 of the input bytes before offset
+
+
+class Checkpoint:
+    """The checkpoint file at *path*, saved every *every* records.
+
+    Unless *resume* is set, any checkpoint already at *path* is discarded.
+    """
+
+    def __init__(self, path: Path, every: int = CHECKPOINT_EVERY, resume: bool = False):
+        if every < 1:
+            raise ValueError("Checkpoints must be at least 1 record apart")
+        if not resume and path.exists():
+            path.unlink()
+        self.path = path
+        self.every = every
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self) -> Checkpoint:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def state(self) -> Optional[CheckpointState]:
+        """The last saved state, or ``None`` before the first checkpoint."""
+        row = self._db.execute(
+            "SELECT records, offset, output_size, triples, input_size, input_fingerprint, "
+            "format, input_digest FROM state WHERE id = 0"
+        ).fetchone()
+        return CheckpointState(*row) if row is not None else None
+
+    def labels(self) -> Iterator[Tuple[str, URIRef]]:
+        """The label index entries saved so far."""
+        for label, uri in self._db.execute("SELECT label, uri FROM labels"):
+            yield label, URIRef(uri)
+
+    def save(self, state: CheckpointState, labels: Iterable[Tuple[str, URIRef]]) -> None:
+        """Save *state* and the label index entries added since the last save, atomically."""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO labels VALUES (?, ?)",
+                ((label, str(uri)) for label, uri in labels),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO state VALUES (0, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    state.records,
+                    state.offset,
+                    state.output_size,
+                    state.triples,
+                    state.input_size,
+                    state.input_fingerprint,
+                    state.format,
+                    state.input_digest,
+                ),
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+    def remove(self) -> None:
+        """Close and delete the checkpoint file, once the conversion is complete."""
+        self.close()
+        os.unlink(self.path)
+
+
+class LabelJournal(MutableMapping[str, URIRef]):
+    """A label index that also records the entries added to it, for the next checkpoint."""
+
+    def __init__(self, index: MutableMapping[str, URIRef]):
+        self.index = index
+        self.added: List[Tuple[str, URIRef]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        # in_memory, spill, ... of a LabelIndex
+        return getattr(self.index, name)
+
+    def get(self, label: str, default: Any = None) -> Any:
+        return self.index.get(label, default)
+
+    def setdefault(self, label: str, uri: URIRef) -> URIRef:
+        existing = self.index.get(label)
+        if existing is not None:
+            return existing
+        self[label] = uri
+        return uri
+
+    def __getitem__(self, label: str) -> URIRef:
+        return self.index[label]
+
+    def __setitem__(self, label: str, uri: URIRef) -> None:
+        self.index[label] = uri
+        self.added.append((label, uri))
+
+    def __delitem__(self, label: str) -> None:
+        del self.index[label]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
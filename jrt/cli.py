@@ -1,7 +1,7 @@
 import json
 import logging
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
 
 try:
     import typer
@@ -11,42 +11,233 @@ except ImportError as exc:  # pragma: no cover
         "Install it with: pip install 'jrt[cli]'"
     ) from exc
 
-from .builder import GraphBuilder
-from .ontology import Ontology, OntologyLoader
+# Only lightweight modules are imported here. Anything pulling in rdflib
+# (builder, mapping, ontology) is imported inside the command that needs it,
+# so `jrt version` and `jrt sort` start without that cost.
+from .offsets import SUFFIX as INDEX_SUFFIX
+from .offsets import RecordIndex, index_records
+from .pipeline import NDJSON_SUFFIXES, Pipeline
+from .reader import RecordStream, is_array_document, iter_records, load_json
+from .sort import parse_size, sort_ntriples
+from .tabular import TABLE_SUFFIXES, read_table
 
 app = typer.Typer(help="JSON to RDF Transformer (JRT)", pretty_exceptions_enable=False)
 
 
 def build_format(fmt: str):
-    if fmt in ["xml", "ttl", "nt", "json-ld"]:
+    if fmt in ["xml", "ttl", "nt", "nq", "trig", "json-ld", "jrtb"]:
         return fmt
     else:
         typer.echo(f"WARNING - Output format `{fmt}` is not recognized, using xml.")
         return "xml"
 
 
+def parse_memory(value: str) -> int:
+    try:
+        return parse_size(value)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
+def parse_range(value: str) -> Tuple[Optional[int], Optional[int]]:
+    start, sep, stop = value.partition(":")
+    try:
+        if not sep:
+            raise ValueError
+        return int(start) if start else None, int(stop) if stop else None
+    except ValueError:
+        raise typer.BadParameter(f"Invalid range `{value}`: expected START:STOP") from None
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    i, sep, n = value.partition("/")
+    try:
+        if not sep:
+            raise ValueError
+        return int(i), int(n)
+    except ValueError:
+        raise typer.BadParameter(f"Invalid shard `{value}`: expected I/N") from None
+
+
 @app.command()
 def convert(
-    input: Path = typer.Argument(..., help="JSON input file"),
+    input: Path = typer.Argument(..., help="JSON input file (or a CSV/TSV/Parquet table)"),
     output: Path = typer.Option("dist/output.xml", help="RDF output file"),
     base_uri: str = typer.Option("http://example.org/resource/", help="Base URI for RDF resources"),
     ontology: Path = typer.Option(
         None, help="RDF/OWL ontology to enrich mapping - could be a file or a directory"
     ),
     format: str = typer.Option(
-        "xml", help="RDF serialization format (e.g., xml, ttl, nt, json-ld)"
+        "xml",
+        help="RDF serialization format (e.g., xml, ttl, nt, nq, trig, json-ld, jrtb for binary)",
     ),
     detect_datatypes: bool = typer.Option(
         True,
         "--detect-datatypes/--no-detect-datatypes",
         help="Infer XSD datatypes (date, dateTime, boolean, anyURI) from string values",
     ),
+    ontology_index: Path = typer.Option(
+        None,
+        help="Compiled ontology index (see `jrt compile-ontology`) used to resolve terms",
+    ),
+    hierarchy: bool = typer.Option(
+        False,
+        help="Use subClassOf/subPropertyOf, domain/range and OWL property characteristics",
+    ),
+    normalize_keys: bool = typer.Option(
+        False, help="Match keys like first_name or first-name to terms like firstName"
+    ),
+    match_threshold: float = typer.Option(
+        None,
+        min=0.0,
+        max=1.0,
+        help="Also map keys to the most similar term scoring at least this (0-1], e.g. 0.8",
+    ),
+    singular_keys: bool = typer.Option(
+        False, help="Strip plural endings when matching keys (addresses -> address)"
+    ),
+    mapping: Path = typer.Option(
+        None, help="YAML/JSON mapping spec with per-path predicate, class and datatype overrides"
+    ),
+    include: List[str] = typer.Option(
+        None,
+        help="Only convert the subtrees at this JSON path (repeatable), e.g. $.items[*].author",
+    ),
+    exclude: List[str] = typer.Option(
+        None, help="Skip the subtrees at this JSON path (repeatable)"
+    ),
+    sort: bool = typer.Option(False, help="Write N-Triples output in canonical sorted order"),
+    dedupe: bool = typer.Option(False, help="Drop duplicate N-Triples lines (implies --sort)"),
+    max_memory: str = typer.Option(
+        "64M", help="Memory budget of the sort stage before spilling to disk (e.g. 512M, 2G)"
+    ),
+    partition: str = typer.Option(
+        None,
+        help="Put triples in a named graph per input file, top-level record or JSON path "
+        "(file, record or path); requires --format nq or trig",
+    ),
+    memory_limit: str = typer.Option(
+        None,
+        help="Memory budget of the conversion (e.g. 512M): triples are flushed to the "
+        "output and labels spilled to disk when reached; requires --format nt, nq or json-ld",
+    ),
+    infer_schema: bool = typer.Option(
+        False,
+        help="Infer the object shapes from a sample of the input and convert objects of "
+        "those shapes with precomputed plans",
+    ),
+    checkpoint_every: int = typer.Option(
+        None,
+        min=1,
+        help="Save a checkpoint every N top-level records, so an interrupted conversion can "
+        "be resumed with --resume; requires --format nt or nq and a JSON array input",
+    ),
+    resume: bool = typer.Option(
+        False,
+        help="Continue an interrupted conversion from its last checkpoint (the output path "
+        "plus '.checkpoint'), with the same options",
+    ),
+    pipeline: bool = typer.Option(
+        False,
+        help="Read, parse, convert and write the records in overlapping stages (threads "
+        "connected by bounded queues); requires --format nt, nq or json-ld and a JSON array "
+        "or NDJSON (.ndjson, .jsonl) input",
+    ),
+    parse_workers: int = typer.Option(
+        1, min=1, help="Threads parsing NDJSON records with --pipeline"
+    ),
+    profile: bool = typer.Option(
+        False, help="Print how busy each --pipeline stage was, to spot the bottleneck"
+    ),
+    memo: Path = typer.Option(
+        None,
+        help="Memo file of resolved predicates, classes and datatypes, reused and updated "
+        "across runs; reset when the ontologies or options change",
+    ),
+    stats_only: bool = typer.Option(
+        False,
+        help="Convert without writing the output, and print the triples per predicate and "
+        "class, the datatypes, the unresolved keys and how many values linked by label",
+    ),
+    record_range: str = typer.Option(
+        None,
+        "--range",
+        help="Convert only the items START:STOP (from 0, STOP excluded) of a JSON array "
+        "indexed with `jrt index`",
+    ),
+    shard: str = typer.Option(
+        None,
+        help="Convert only shard I/N (I from 0) of the items of a JSON array indexed with "
+        "`jrt index`, split in N ranges of equal counts",
+    ),
+    record_index: Path = typer.Option(
+        None, help="Record index for --range and --shard (defaults to the input path plus .jrtx)"
+    ),
 ):
     """
     Convert a JSON in RDF/XML.
     """
+    from .builder import GraphBuilder
+    from .mapping import MappingSpec
+    from .ontology import Ontology, OntologyLoader, OntologyResolver
 
+    if hierarchy and ontology_index is not None:
+        raise typer.BadParameter(
+            "--hierarchy cannot be combined with --ontology-index: a compiled index holds "
+            "no class hierarchy or property domains; use --ontology instead"
+        )
     fmt = build_format(format)
+    if (sort or dedupe) and fmt != "nt":
+        raise typer.BadParameter("--sort and --dedupe require --format nt")
+    sort_memory = parse_memory(max_memory)
+    if memory_limit is not None and fmt not in ("nt", "nq", "json-ld"):
+        raise typer.BadParameter("--memory-limit requires --format nt, nq or json-ld")
+    if partition is not None and fmt not in ("nq", "trig"):
+        raise typer.BadParameter("--partition requires --format nq or trig")
+    build_memory = parse_memory(memory_limit) if memory_limit is not None else None
+    checkpoints = checkpoint_every is not None or resume
+    if checkpoints and fmt not in ("nt", "nq"):
+        raise typer.BadParameter("--checkpoint-every and --resume require --format nt or nq")
+    if checkpoints and (input.suffix.lower() in TABLE_SUFFIXES or not is_array_document(input)):
+        raise typer.BadParameter("--checkpoint-every and --resume require a JSON array input")
+    if stats_only and (sort or dedupe or checkpoints):
+        raise typer.BadParameter("--stats-only writes no output to sort, dedupe or checkpoint")
+    if profile and not pipeline:
+        raise typer.BadParameter("--profile requires --pipeline")
+    if pipeline:
+        if fmt not in ("nt", "nq", "json-ld") and not stats_only:
+            raise typer.BadParameter("--pipeline requires --format nt, nq or json-ld")
+        if checkpoints:
+            raise typer.BadParameter("--pipeline cannot be combined with checkpoints")
+        suffix = input.suffix.lower()
+        if suffix in TABLE_SUFFIXES or (
+            suffix not in NDJSON_SUFFIXES and not is_array_document(input)
+        ):
+            raise typer.BadParameter("--pipeline requires a JSON array or NDJSON input")
+    index = None
+    if record_range is not None or shard is not None:
+        if record_range is not None and shard is not None:
+            raise typer.BadParameter("Give either --range or --shard")
+        if pipeline or checkpoints:
+            raise typer.BadParameter(
+                "--range and --shard cannot be combined with --pipeline or checkpoints"
+            )
+        if input.suffix.lower() in TABLE_SUFFIXES:
+            raise typer.BadParameter("--range and --shard require a JSON array input")
+        selection = parse_shard(shard) if shard is not None else parse_range(record_range)
+        index_path = record_index or input.with_name(input.name + INDEX_SUFFIX)
+        if not index_path.exists():
+            raise typer.BadParameter(f"No record index at {index_path}: run `jrt index` first")
+        try:
+            index = RecordIndex(input, index_path)
+            if shard is not None:
+                start, stop = index.shard(*selection)
+            else:
+                start, stop, _ = slice(*selection).indices(len(index))
+        except ValueError as exc:
+            if index is not None:
+                index.close()
+            raise typer.BadParameter(str(exc)) from exc
     loader = OntologyLoader()
     ontologies: Union[Ontology, List[Ontology]] = []
     if ontology:
@@ -56,18 +247,314 @@ def convert(
         else:
             typer.echo(f"Loaded ontology from file {ontology.resolve()}")
 
-    with input.open() as f:
-        data = json.load(f)
+    spec = MappingSpec.load(mapping) if mapping else None
+    if input.suffix.lower() in TABLE_SUFFIXES:
+        data = read_table(input)
+    elif index is not None:
+        # only the selected items are read, from the end of the one before them
+        plan = (spec or MappingSpec()).compile(include=include or (), exclude=exclude or ())
+        with index:
+            typer.echo(f"Converting items {start} to {max(start, stop)} of {len(index)}")
+            data = index.records(start, stop, plan)
+    elif pipeline:
+        plan = (spec or MappingSpec()).compile(include=include or (), exclude=exclude or ())
+        data = Pipeline(input, plan, parse_workers=parse_workers)
+    elif checkpoints:
+        # re-readable from any record, for resuming
+        plan = (spec or MappingSpec()).compile(include=include or (), exclude=exclude or ())
+        data = RecordStream(input, plan)
+    elif (build_memory is not None or fmt == "json-ld" or stats_only) and is_array_document(input):
+        # records are parsed one at a time, as the builder asks for them
+        plan = (spec or MappingSpec()).compile(include=include or (), exclude=exclude or ())
+        data = iter_records(input, plan)
+    elif include or exclude:
+        # prune filtered-out subtrees while parsing instead of after
+        plan = (spec or MappingSpec()).compile(include=include, exclude=exclude)
+        data = load_json(input, plan)
+    else:
+        with input.open() as f:
+            data = json.load(f)
+
+    memo_file = None
+    if memo is not None:
+        from .memo import Memo
+
+        memo_file = Memo(memo)
+    try:
+        builder = GraphBuilder(
+            data=data,
+            ontologies=ontologies,
+            base_uri=base_uri,
+            detect_datatypes=detect_datatypes,
+            resolver=OntologyResolver.open(ontology_index) if ontology_index else None,
+            hierarchy=hierarchy,
+            normalize_keys=normalize_keys,
+            match_threshold=match_threshold,
+            singular_keys=singular_keys,
+            mapping=spec,
+            include=include,
+            exclude=exclude,
+            max_memory=build_memory,
+            partition=partition,
+            source=input.resolve().as_uri(),
+            infer_schema=infer_schema,
+            memo=memo_file,
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    if stats_only:
+        typer.echo(builder.write_stats())
+    elif checkpoints:
+        from .checkpoint import CHECKPOINT_EVERY, SUFFIX, Checkpoint
+
+        checkpoint = Checkpoint(
+            output.with_name(output.name + SUFFIX),
+            every=checkpoint_every or CHECKPOINT_EVERY,
+            resume=resume,
+        )
+        state = checkpoint.state
+        if state is not None:
+            typer.echo(f"Resuming after {state.records} records ({state.triples} triples)")
+        try:
+            f = output.open("r+b" if state is not None else "wb")
+        except FileNotFoundError:
+            checkpoint.close()
+            raise typer.BadParameter(
+                f"Cannot resume: {output.name} is missing; convert again without --resume"
+            ) from None
+        with f:
+            try:
+                count = builder.write(f, format=fmt, checkpoint=checkpoint)
+            except ValueError as exc:
+                checkpoint.close()
+                raise typer.BadParameter(str(exc)) from exc
+        checkpoint.remove()
+        typer.echo(f"Wrote {count} triples")
+    elif pipeline:
+        with output.open("wb") as f:
+            count = builder.write(f, format=fmt)
+        typer.echo(f"Wrote {count} triples in {builder.flushes} flushes")
+    elif build_memory is not None:
+        from .memory import peak_rss
 
-    builder = GraphBuilder(
-        data=data,
+        with output.open("wb") as f:
+            count = builder.write(f, format=fmt)
+        typer.echo(
+            f"Wrote {count} triples in {builder.flushes} flushes "
+            f"(peak RSS {peak_rss() / 2**20:.1f} MiB)"
+        )
+    elif fmt == "nt":
+        from .ntriples import NTriplesWriter
+
+        graph = builder.build()
+        with output.open("wb") as f, NTriplesWriter(f) as writer:
+            writer.write(graph)
+    elif fmt in ("json-ld", "nq"):
+        # JSON-LD is streamed record by record, with one shared context
+        with output.open("wb") as f:
+            builder.write(f, format=fmt)
+    elif fmt == "jrtb":
+        from .binary import write_binary
+
+        write_binary(builder.build(), output)
+    else:
+        graph = builder.build()
+        graph.serialize(destination=output, format=fmt)
+    if profile:
+        for name, stats in data.stats.items():
+            typer.echo(f"  {name:<6} {stats}")
+    if sort or dedupe:
+        sort_ntriples(output, output, dedupe=dedupe, max_memory=sort_memory)
+    if memo_file is not None:
+        memo_file.close()
+        typer.echo(f"Memo: {memo_file.reused} results reused, {memo_file.added} added")
+
+
+@app.command("compile-ontology")
+def compile_ontology(
+    ontology: Path = typer.Argument(..., help="RDF/OWL ontology file or directory"),
+    output: Path = typer.Option("dist/ontology.jrti", help="Compiled index file"),
+    hierarchy: bool = typer.Option(
+        False, help="Store kinds and ranges inferred from the class/property hierarchy"
+    ),
+):
+    """
+    Compile ontologies into a memory-mapped index for `jrt convert --ontology-index`.
+    """
+    from .compiled import write_index
+    from .ontology import OntologyLoader, OntologyResolver
+
+    loaded = OntologyLoader().load(ontology)
+    ontologies = loaded if isinstance(loaded, list) else [loaded]
+    resolver = OntologyResolver([o.graph for o in ontologies], hierarchy=hierarchy)
+    write_index(resolver, output)
+    typer.echo(
+        f"Compiled {len(resolver.labels())} labels from {len(ontologies)} ontologies "
+        f"into {output.resolve()}"
+    )
+
+
+@app.command("index")
+def index_command(
+    input: Path = typer.Argument(..., help="JSON array input file"),
+    output: Path = typer.Option(None, help="Index file (defaults to the input path plus .jrtx)"),
+):
+    """
+    Index the items of a JSON array by byte offset, for `jrt convert --range/--shard`.
+    """
+    try:
+        count = index_records(input, output)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    typer.echo(f"Indexed {count} items of {input}")
+
+
+@app.command("ontology-prune")
+def ontology_prune(
+    ontology: Path = typer.Argument(..., help="RDF/OWL ontology file or directory"),
+    sample: List[Path] = typer.Option(
+        None, help="JSON (or CSV/TSV/Parquet) input whose keys and types to keep (repeatable)"
+    ),
+    key: List[str] = typer.Option(None, help="Key to resolve as a property (repeatable)"),
+    type: List[str] = typer.Option(None, help="Type value to resolve as a class (repeatable)"),
+    output: Path = typer.Option("dist/ontology.ttl", help="Pruned ontology file"),
+    format: str = typer.Option("ttl", help="RDF serialization format (e.g., ttl, xml, nt)"),
+    hierarchy: bool = typer.Option(
+        False, help="Also state the property kinds inferred from the whole hierarchy"
+    ),
+):
+    """
+    Write the part of ontologies that some inputs use, for faster later conversions.
+    """
+    from .ontology import OntologyLoader
+    from .prune import prune_ontology, used_terms
+
+    if not (sample or key or type):
+        raise typer.BadParameter("Give at least one --sample, --key or --type")
+    keys, types = set(key or ()), set(type or ())
+    for path in sample or ():
+        if path.suffix.lower() in TABLE_SUFFIXES:
+            data = read_table(path)
+        else:
+            with path.open() as f:
+                data = json.load(f)
+        sample_keys, sample_types = used_terms(data)
+        keys |= sample_keys
+        types |= sample_types
+
+    loaded = OntologyLoader().load(ontology)
+    graphs = [o.graph for o in (loaded if isinstance(loaded, list) else [loaded])]
+    pruned = prune_ontology(graphs, keys, types, hierarchy=hierarchy)
+    pruned.serialize(destination=output, format=build_format(format))
+    total = sum(len(g) for g in graphs)
+    typer.echo(
+        f"Kept {len(pruned)} of {total} triples for {len(keys)} keys and {len(types)} types "
+        f"in {output.resolve()}"
+    )
+
+
+@app.command("sort")
+def sort_command(
+    input: Path = typer.Argument(..., help="N-Triples or N-Quads input file"),
+    output: Path = typer.Option(None, help="Output file (defaults to sorting the input in place)"),
+    dedupe: bool = typer.Option(False, help="Drop duplicate lines"),
+    max_memory: str = typer.Option(
+        "64M", help="Memory budget before sorted runs are spilled to disk (e.g. 512M, 2G)"
+    ),
+    tmp_dir: Path = typer.Option(None, help="Directory for spill files (defaults to the system's)"),
+):
+    """
+    Sort an N-Triples file canonically with an external merge sort.
+    """
+    count = sort_ntriples(
+        input,
+        output or input,
+        dedupe=dedupe,
+        max_memory=parse_memory(max_memory),
+        tmp_dir=tmp_dir,
+    )
+    typer.echo(f"Wrote {count} sorted lines to {(output or input).resolve()}")
+
+
+@app.command()
+def serve(
+    ontology: Path = typer.Option(
+        None, help="RDF/OWL ontology loaded once for all requests - a file or a directory"
+    ),
+    ontology_index: Path = typer.Option(
+        None, help="Compiled ontology index (see `jrt compile-ontology`) used to resolve terms"
+    ),
+    hierarchy: bool = typer.Option(
+        False,
+        help="Use subClassOf/subPropertyOf, domain/range and OWL property characteristics",
+    ),
+    mapping: Path = typer.Option(None, help="YAML/JSON mapping spec applied to every request"),
+    base_uri: str = typer.Option("http://example.org/resource/", help="Base URI for RDF resources"),
+    detect_datatypes: bool = typer.Option(
+        True,
+        "--detect-datatypes/--no-detect-datatypes",
+        help="Infer XSD datatypes (date, dateTime, boolean, anyURI) from string values",
+    ),
+    format: str = typer.Option(
+        "ttl", help="Output format when a request asks for none (xml, ttl, nt, json-ld)"
+    ),
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+    port: int = typer.Option(8000, help="TCP port to listen on"),
+    socket: Path = typer.Option(None, help="Listen on this Unix socket instead of TCP"),
+    workers: int = typer.Option(4, min=1, help="Number of worker threads serving connections"),
+    max_body: str = typer.Option(
+        "64M",
+        help="Largest request body accepted (e.g. 512K, 64M); larger ones get a 413. Bodies "
+        "are buffered whole, so each worker may hold this much",
+    ),
+):
+    """
+    Serve conversions over HTTP with ontologies loaded once.
+    """
+    from .mapping import MappingSpec
+    from .ontology import OntologyLoader, OntologyResolver
+    from .server import MEDIA_TYPES, ConversionService, make_server
+
+    if hierarchy and ontology_index is not None:
+        raise typer.BadParameter(
+            "--hierarchy cannot be combined with --ontology-index: a compiled index holds "
+            "no class hierarchy or property domains; use --ontology instead"
+        )
+    fmt = build_format(format)
+    if fmt not in MEDIA_TYPES:
+        raise typer.BadParameter(
+            f"jrt serve cannot answer in format {fmt}; use one of {sorted(MEDIA_TYPES)}"
+        )
+
+    ontologies = []
+    if ontology:
+        loaded = OntologyLoader().load(ontology)
+        ontologies = loaded if isinstance(loaded, list) else [loaded]
+    service = ConversionService(
         ontologies=ontologies,
+        resolver=OntologyResolver.open(ontology_index) if ontology_index else None,
         base_uri=base_uri,
         detect_datatypes=detect_datatypes,
+        hierarchy=hierarchy,
+        mapping=MappingSpec.load(mapping) if mapping else None,
     )
-    graph = builder.build()
-
-    graph.serialize(destination=output, format=fmt)
+    server = make_server(
+        service,
+        host=host,
+        port=port,
+        socket_path=socket,
+        workers=workers,
+        default_format=fmt,
+        max_body=parse_memory(max_body),
+    )
+    where = socket.resolve() if socket else f"http://{host}:{server.server_address[1]}"
+    typer.echo(f"Serving conversions on {where} with {workers} workers (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 @app.command()
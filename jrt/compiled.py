@@ -0,0 +1,245 @@
+"""Compact, read-only ontology index files opened through ``mmap``.
+
+:func:`write_index` serializes the lookup tables of an
+:class:`~jrt.ontology.OntologyResolver` to a binary file;
+:meth:`OntologyResolver.open <jrt.ontology.OntologyResolver.open>` maps it
+back into a :class:`MappedOntologyResolver`. Opening is near-instant, since
+nothing is parsed or indexed, and every process mapping the same file shares
+its pages through the OS page cache.
+
+File layout (little-endian, ``u32`` unless stated)::
+
+    header        magic (8 bytes), version, uri count N, label count M
+    uri offsets   N + 1 offsets into the URI blob
+    label offsets M + 1 offsets into the label blob
+    label targets M indexes into the URI table
+    ranges        N indexes into the URI table: XSD range of each property,
+                  or 0xFFFFFFFF for none
+    kind bitmaps  3 x ceil(N / 8) bytes: class, object property, datatype property
+    uri blob      UTF-8 URIs, sorted
+    label blob    UTF-8 lowercased labels, sorted
+
+Both string tables are sorted by their UTF-8 bytes so lookups are binary
+searches over the mapped file. Each label points at the URI
+:meth:`~jrt.ontology.OntologyResolver.resolve` would return for it.
+
+Kinds and ranges inferred from the class/property hierarchy are stored as
+computed; the domain-aware choice among properties sharing a label is not.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Sequence
+
+from rdflib import URIRef
+
+from .ontology import OntologyResolver
+
+MAGIC = b"JRTONTO\x00"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sIII")
+_U32 = struct.Struct("<I")
+_NO_RANGE = 0xFFFFFFFF
+
+# Bit position of each kind bitmap, in file order
+_CLASS, _OBJECT_PROPERTY, _DATATYPE_PROPERTY = range(3)
+
+
+def write_index(resolver: OntologyResolver, path: Path) -> None:
+    """Write the lookup tables of *resolver* to the index file at *path*."""
+    targets = {label: resolver.resolve(label) for label in resolver.labels()}
+    kinds = (resolver.classes(), resolver.object_properties(), resolver.datatype_properties())
+    properties = {*kinds[1], *kinds[2]}
+    ranges = {
+        str(prop): str(datatype)
+        for prop in properties
+        if (datatype := resolver.datatype_range(prop)) is not None
+    }
+
+    uris = sorted(
+        {str(uri) for uri in targets.values()}
+        .union(*({str(u) for u in kind} for kind in kinds))
+        .union(ranges.values()),
+        key=lambda uri: uri.encode("utf-8"),
+    )
+    uri_ids = {uri: i for i, uri in enumerate(uris)}
+    labels = sorted(targets, key=lambda label: label.encode("utf-8"))
+
+    bitmap_size = (len(uris) + 7) // 8
+    bitmaps = [bytearray(bitmap_size) for _ in kinds]
+    for bitmap, kind in zip(bitmaps, kinds):
+        for uri in kind:
+            i = uri_ids[str(uri)]
+            bitmap[i >> 3] |= 1 << (i & 7)
+
+    uri_offsets, uri_blob = _string_table(uris)
+    label_offsets, label_blob = _string_table(labels)
+    label_targets = [uri_ids[str(targets[label])] for label in labels]
+    range_targets = [uri_ids[ranges[uri]] if uri in ranges else _NO_RANGE for uri in uris]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(uris), len(labels)))
+        for table in (uri_offsets, label_offsets, label_targets, range_targets):
+            f.write(struct.pack(f"<{len(table)}I", *table))
+        for bitmap in bitmaps:
+            f.write(bitmap)
+        f.write(uri_blob)
+        f.write(label_blob)
+
+
+def _string_table(strings: Sequence[str]) -> tuple[List[int], bytes]:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return offsets, b"".join(encoded)
+
+
+class MappedOntologyResolver(OntologyResolver):
+    """:class:`OntologyResolver` answering lookups from a memory-mapped index file.
+
+    Results are memoized per key: JSON keys are low-cardinality, so each
+    distinct key pays for its binary search once.
+    """
+
+    def __init__(self, path: Path):
+        self.source = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self._uri_count, self._label_count = _HEADER.unpack_from(self._mm)
+        except struct.error:
+            self._mm.close()
+            raise ValueError(f"{path} is not a compiled ontology index") from None
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a compiled ontology index (version {VERSION})")
+
+        n, m = self._uri_count, self._label_count
+        self._uri_offsets = _HEADER.size
+        self._label_offsets = self._uri_offsets + 4 * (n + 1)
+        self._label_targets = self._label_offsets + 4 * (m + 1)
+        self._ranges = self._label_targets + 4 * m
+        self._bitmaps = self._ranges + 4 * n
+        self._bitmap_size = (n + 7) // 8
+        self._uri_blob = self._bitmaps + 3 * self._bitmap_size
+        self._label_blob = self._uri_blob + self._u32(self._uri_offsets + 4 * n)
+
+        self.hierarchy = False
+        self._resolved: Dict[str, Optional[URIRef]] = {}
+        self._uri_kinds: Dict[URIRef, int] = {}
+        self._uri_ranges: Dict[URIRef, Optional[URIRef]] = {}
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def fingerprint(self) -> str:
+        # the file holds the lookup tables and nothing else
+        return hashlib.sha256(self._mm).hexdigest()
+
+    def resolve(self, label: str) -> URIRef | None:
+        key = label.lower()
+        if key not in self._resolved:
+            i = self._search(
+                key.encode("utf-8"), self._label_offsets, self._label_blob, self._label_count
+            )
+            self._resolved[key] = (
+                None if i is None else self._uri(self._u32(self._label_targets + 4 * i))
+            )
+        return self._resolved[key]
+
+    def is_class(self, uri: URIRef) -> bool:
+        return bool(self._kinds(uri) & (1 << _CLASS))
+
+    def is_object_property(self, uri: URIRef) -> bool:
+        return bool(self._kinds(uri) & (1 << _OBJECT_PROPERTY))
+
+    def is_datatype_property(self, uri: URIRef) -> bool:
+        return bool(self._kinds(uri) & (1 << _DATATYPE_PROPERTY))
+
+    def is_property(self, uri: URIRef) -> bool:
+        return bool(self._kinds(uri) & (1 << _OBJECT_PROPERTY | 1 << _DATATYPE_PROPERTY))
+
+    def superclasses(self, uri: URIRef) -> FrozenSet[URIRef]:
+        return frozenset()
+
+    def domains(self, uri: URIRef) -> FrozenSet[URIRef]:
+        return frozenset()
+
+    def datatype_range(self, uri: URIRef) -> URIRef | None:
+        if uri not in self._uri_ranges:
+            i = self._search(
+                str(uri).encode("utf-8"), self._uri_offsets, self._uri_blob, self._uri_count
+            )
+            target = _NO_RANGE if i is None else self._u32(self._ranges + 4 * i)
+            self._uri_ranges[uri] = None if target == _NO_RANGE else self._uri(target)
+        return self._uri_ranges[uri]
+
+    def labels(self) -> List[str]:
+        return [
+            self._string(self._label_offsets, self._label_blob, i) for i in range(self._label_count)
+        ]
+
+    def classes(self) -> List[URIRef]:
+        return self._members(_CLASS)
+
+    def object_properties(self) -> List[URIRef]:
+        return self._members(_OBJECT_PROPERTY)
+
+    def datatype_properties(self) -> List[URIRef]:
+        return self._members(_DATATYPE_PROPERTY)
+
+    def _kinds(self, uri: URIRef) -> int:
+        kinds = self._uri_kinds.get(uri)
+        if kinds is None:
+            kinds = 0
+            i = self._search(
+                str(uri).encode("utf-8"), self._uri_offsets, self._uri_blob, self._uri_count
+            )
+            if i is not None:
+                for bit in (_CLASS, _OBJECT_PROPERTY, _DATATYPE_PROPERTY):
+                    if self._bit(bit, i):
+                        kinds |= 1 << bit
+            self._uri_kinds[uri] = kinds
+        return kinds
+
+    def _members(self, bit: int) -> List[URIRef]:
+        return [self._uri(i) for i in range(self._uri_count) if self._bit(bit, i)]
+
+    def _bit(self, bitmap: int, i: int) -> bool:
+        return bool(
+            self._mm[self._bitmaps + bitmap * self._bitmap_size + (i >> 3)] & (1 << (i & 7))
+        )
+
+    def _u32(self, offset: int) -> int:
+        return _U32.unpack_from(self._mm, offset)[0]
+
+    def _uri(self, i: int) -> URIRef:
+        return URIRef(self._string(self._uri_offsets, self._uri_blob, i))
+
+    def _string(self, offsets: int, blob: int, i: int) -> str:
+        start = self._u32(offsets + 4 * i)
+        end = self._u32(offsets + 4 * (i + 1))
+        return self._mm[blob + start : blob + end].decode("utf-8")
+
+    def _search(self, needle: bytes, offsets: int, blob: int, count: int) -> Optional[int]:
+        """Binary search *needle* in a sorted string table; return its index."""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self._u32(offsets + 4 * mid)
+            end = self._u32(offsets + 4 * (mid + 1))
+            candidate = self._mm[blob + start : blob + end]
+            if candidate < needle:
+                lo = mid + 1
+            elif candidate > needle:
+                hi = mid
+            else:
+                return mid
+        return None
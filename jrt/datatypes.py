@@ -11,18 +11,32 @@ plain ``xsd:string`` to avoid silently corrupting data.
 from __future__ import annotations
 
 import re
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from urllib.parse import urlparse
 
 from rdflib import Literal, URIRef
 from rdflib.namespace import XSD
 
+try:
+    # private: the lexical-to-value converters behind Literal.value
+    from rdflib.term import _toPythonMapping
+except ImportError:  # pragma: no cover - validated through Literal instead
+    _toPythonMapping = {}
+
 # Anchored, structural patterns. Range/semantic validity (e.g. month <= 12) is
 # then confirmed by rdflib itself, so the emitted lexical form is always valid.
 _DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 _DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})?$")
 _URI_SCHEMES = {"http", "https"}
 
+# The same checks as one pattern for batches: the named group that matched
+# says which datatype to confirm, so each value is scanned once
+_CANDIDATE_RE = re.compile(
+    r"(?P<boolean>true|false)\Z"
+    r"|(?P<dateTime>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})?)$"
+    r"|(?P<date>\d{4}-\d{2}-\d{2})$"
+)
+
 
 def _is_valid(value: str, datatype: URIRef) -> bool:
     """True if *value* is a valid lexical form for *datatype* (per rdflib)."""
@@ -50,6 +64,62 @@ def detect_datatype(value: str) -> Optional[URIRef]:
     return None
 
 
+def may_have_datatype(value: str) -> bool:
+    """False for strings :func:`detect_datatype` certainly leaves plain (one regex match)."""
+    # a URI needs a scheme, and so a colon
+    return ":" in value or _CANDIDATE_RE.match(value) is not None
+
+
+def _converter(datatype: URIRef):
+    """The lexical-to-value function rdflib applies to *datatype* literals."""
+    convert = _toPythonMapping.get(datatype)
+    if convert is None:  # the mapping moved in rdflib: build the literal
+        return lambda value: _is_valid(value, datatype)
+
+    def is_valid(value: str) -> bool:
+        # what Literal(value, datatype=datatype).value would give, without
+        # building the literal or logging the failures
+        try:
+            return convert(value) is not None
+        except Exception:
+            return False
+
+    return is_valid
+
+
+def detect_datatypes(values: Iterable[str]) -> List[Optional[URIRef]]:
+    """Return :func:`detect_datatype` of each of *values*, classifying a batch at once.
+
+    Each distinct value is classified once, with a single combined pattern
+    choosing the datatype to confirm, and date-like values are validated
+    with rdflib's converters directly instead of through a Literal.
+    """
+    checks = {
+        "boolean": (XSD.boolean, None),
+        "dateTime": (XSD.dateTime, _converter(XSD.dateTime)),
+        "date": (XSD.date, _converter(XSD.date)),
+    }
+    match = _CANDIDATE_RE.match
+    seen: Dict[str, Optional[URIRef]] = {}
+    results: List[Optional[URIRef]] = []
+    append = results.append
+    for value in values:
+        datatype = seen.get(value, False)
+        if datatype is False:
+            datatype = None
+            m = match(value)
+            if m is not None:
+                candidate, is_valid = checks[m.lastgroup]
+                if is_valid is None or is_valid(value):
+                    datatype = candidate
+            # a URI needs a scheme, and so a colon
+            if datatype is None and ":" in value and _is_uri(value):
+                datatype = XSD.anyURI
+            seen[value] = datatype
+        append(datatype)
+    return results
+
+
 def to_literal(value: Any, detect: bool = True) -> Literal:
     """Wrap *value* in a Literal, inferring an XSD datatype for typed strings."""
     if detect and isinstance(value, str):
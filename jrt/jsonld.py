@@ -0,0 +1,206 @@
+"""Streaming compact JSON-LD writer.
+
+rdflib's JSON-LD serializer builds the whole (expanded) document in memory
+before writing it. :class:`JsonLdWriter` writes the ``@context`` once, up
+front, then one compact node object per subject of each batch of triples it
+is given, so a converter flushing after every record keeps only that record
+in memory.
+
+The context maps ``@base`` and ``@vocab`` to the base URI (resource ids and
+the predicates built from JSON keys shorten to the key itself) and declares
+the namespace prefixes, so every other IRI shortens to ``prefix:name``.
+Since the context is fixed before the first triple is seen, it holds no
+per-term definitions; values carry their own ``@type`` / ``@language``.
+Integers and booleans in canonical form are written as native JSON values.
+
+A subject written in two batches gives two node objects with the same
+``@id``, which JSON-LD processors merge.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import IO, Any, Dict, Iterable, List, Mapping, Tuple
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF, XSD
+
+from .ntriples import CACHE_SIZE, DEFAULT_BUFFER_SIZE, _graph_triples
+
+# Terms and relative IRIs are written bare only when they cannot be mistaken
+# for a keyword, a compact IRI, an absolute IRI or a dot segment
+_BARE = re.compile(r"[A-Za-z0-9_][\w.\-~%]*")
+_RELATIVE = re.compile(r"[A-Za-z0-9_][\w.\-~%]*(?:/[A-Za-z0-9_][\w.\-~%]*)*")
+
+# Prefixes only compact IRIs when their namespace ends with a gen-delim
+_GEN_DELIMS = ":/?#[]@"
+
+# JSON-LD reads integral JSON numbers this large as xsd:double
+_MAX_NATIVE_INTEGER = 10**21
+
+
+def jsonld_context(base_uri: str, namespaces: Iterable[Tuple[str, Any]]) -> Dict[str, str]:
+    """A context with *base_uri* as ``@base``/``@vocab`` and the usable *namespaces* prefixes."""
+    context = {"@base": str(base_uri), "@vocab": str(base_uri)}
+    seen = {str(base_uri)}
+    for prefix, namespace in namespaces:
+        namespace = str(namespace)
+        if (
+            prefix in context
+            or namespace in seen
+            or not _BARE.fullmatch(prefix or "")
+            or prefix == "_"
+            or namespace[-1:] not in _GEN_DELIMS
+        ):
+            continue
+        context[prefix] = namespace
+        seen.add(namespace)
+    return context
+
+
+class JsonLdWriter:
+    """Write triples to a binary *stream* as one compact JSON-LD document."""
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        context: Mapping[str, str],
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        self.stream = stream
+        self.context = dict(context)
+        self.buffer_size = buffer_size
+        self.written = 0  # bytes handed to the stream
+        base = self.context.get("@base", "")
+        # a relative path only resolves to base + path against a directory-like base
+        self._base = base if base.endswith("/") and "?" not in base and "#" not in base else ""
+        self._vocab = self.context.get("@vocab", "")
+        # longest namespace first, so the most specific prefix wins
+        self._prefixes = sorted(
+            ((ns, p) for p, ns in self.context.items() if not p.startswith("@")),
+            key=lambda item: -len(item[0]),
+        )
+        self._terms = {p for p in self.context if not p.startswith("@")}
+        self._keys: Dict[URIRef, str] = {}
+        self._ids: Dict[URIRef, str] = {}
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        self._parts: List[str] = []
+        self._buffered = 0
+        self._started = False
+        self._first_node = True
+
+    def __enter__(self) -> JsonLdWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, triples: Iterable[Tuple[Any, Any, Any]]) -> None:
+        """Write one node object per subject of *triples* (a graph or an iterable)."""
+        if isinstance(triples, Graph):
+            triples = _graph_triples(triples)
+        nodes: Dict[Any, Dict[str, Any]] = {}
+        for s, p, o in triples:
+            node = nodes.get(s)
+            if node is None:
+                node = nodes[s] = {"@id": self._id(s)}
+            if p == RDF.type and type(o) is URIRef:
+                key, value = "@type", self._vocab_term(o)
+            else:
+                key, value = self._key(p), self._value(o)
+            values = node.get(key)
+            if values is None:
+                node[key] = value
+            elif type(values) is list:
+                values.append(value)
+            else:
+                node[key] = [values, value]
+        for node in nodes.values():
+            self._append(node)
+
+    def flush(self) -> None:
+        """Hand everything buffered so far to the stream."""
+        self._start()
+        self._send()
+
+    def close(self) -> None:
+        """Finish the document; the stream itself is left open."""
+        self._start()
+        self._parts.append("\n]}\n")
+        self._send()
+
+    def _start(self) -> None:
+        if not self._started:
+            self._started = True
+            self._parts.append(f'{{"@context":{self._encode(self.context)},\n"@graph":[')
+
+    def _append(self, node: Dict[str, Any]) -> None:
+        self._start()
+        text = ("\n" if self._first_node else ",\n") + self._encode(node)
+        self._first_node = False
+        self._parts.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self._send()
+
+    def _send(self) -> None:
+        if self._parts:
+            data = "".join(self._parts).encode("utf-8")
+            self._parts.clear()
+            self._buffered = 0
+            self.written += len(data)
+            self.stream.write(data)
+
+    def _key(self, predicate: URIRef) -> str:
+        key = self._keys.get(predicate)
+        if key is None:
+            key = self._keys[predicate] = self._vocab_term(predicate)
+        return key
+
+    def _id(self, node: Any) -> str:
+        if isinstance(node, BNode):
+            return f"_:{node}"
+        text = self._ids.get(node)
+        if text is None:
+            iri = str(node)
+            relative = iri[len(self._base) :] if self._base and iri.startswith(self._base) else ""
+            text = relative if _RELATIVE.fullmatch(relative) else self._compact(iri)
+            if len(self._ids) >= CACHE_SIZE:
+                self._ids.clear()
+            self._ids[node] = text
+        return text
+
+    def _vocab_term(self, iri: URIRef) -> str:
+        text = str(iri)
+        if self._vocab and text.startswith(self._vocab):
+            term = text[len(self._vocab) :]
+            if _BARE.fullmatch(term) and term not in self._terms:
+                return term
+        return self._compact(text)
+
+    def _compact(self, iri: str) -> str:
+        for namespace, prefix in self._prefixes:
+            if iri.startswith(namespace):
+                suffix = iri[len(namespace) :]
+                if suffix and not suffix.startswith("//"):
+                    return f"{prefix}:{suffix}"
+        return iri
+
+    def _value(self, term: Any) -> Any:
+        if not isinstance(term, Literal):
+            return {"@id": self._id(term)}
+        text = str(term)
+        if term.language:
+            return {"@value": text, "@language": term.language}
+        datatype = term.datatype
+        if datatype is None:
+            return text
+        if datatype == XSD.integer:
+            if text.isascii() and text.lstrip("-").isdigit() and text == str(int(text)):
+                number = int(text)
+                if abs(number) < _MAX_NATIVE_INTEGER:
+                    return number
+        elif datatype == XSD.boolean and text in ("true", "false"):
+            return text == "true"
+        return {"@value": text, "@type": self._vocab_term(datatype)}
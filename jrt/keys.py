@@ -0,0 +1,121 @@
+"""Normalized and approximate matching of JSON keys against vocabulary terms.
+
+Exact resolution only finds ``firstName`` for a key spelled ``firstname``
+(in any case). :class:`KeyMatcher` closes the gap for the other usual
+spellings -- ``first_name``, ``first-name``, ``First Name`` -- by comparing
+:func:`normalize_key` forms, and, given a threshold, falls back to the most
+similar term through a character-trigram index built once per vocabulary.
+
+Each distinct key is matched once and the result cached: keys repeat across
+every record, so the per-record cost is a dict lookup.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+# Separators between words, then lower->upper and acronym->word transitions
+# inside a camelCase / PascalCase chunk
+_SEPARATOR_RE = re.compile(r"[\W_]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def key_tokens(key: str, singularize: bool = False) -> List[str]:
+    """Split *key* into lowercase words, whatever its case convention."""
+    tokens = []
+    for chunk in _SEPARATOR_RE.split(key):
+        # camelCase boundaries are only told apart for ASCII words
+        words = _CAMEL_RE.findall(chunk) if chunk.isascii() else [chunk]
+        tokens.extend(word.lower() for word in words)
+    if singularize and tokens:
+        tokens[-1] = _singular(tokens[-1])
+    return tokens
+
+
+def normalize_key(key: str, singularize: bool = False) -> str:
+    """Canonical form of *key*: ``first_name``, ``firstName`` and ``First-Name`` agree."""
+    return "".join(key_tokens(key, singularize))
+
+
+def _singular(word: str) -> str:
+    """Strip a regular English plural ending; deliberately conservative."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("sses", "xes", "zes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    padded = f"  {text} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+class KeyMatcher:
+    """Map JSON keys onto the spelling of a known term.
+
+    *terms* are the spellings the caller can resolve (ontology labels, local
+    names of public vocabularies). :meth:`match` returns the term whose
+    normalized form equals the key's, or -- with *threshold* set -- the most
+    similar one scoring at least *threshold* (Dice coefficient of character
+    trigrams, between 0 and 1). Ties go to the lexicographically smallest
+    term, so results are reproducible.
+    """
+
+    def __init__(
+        self,
+        terms: Iterable[str],
+        threshold: Optional[float] = None,
+        singularize: bool = False,
+    ):
+        if threshold is not None and not 0 < threshold <= 1:
+            raise ValueError(f"Match threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.singularize = singularize
+        self._normalized: Dict[str, str] = {}
+        for term in sorted(set(terms)):
+            norm = normalize_key(term, singularize)
+            if norm:
+                self._normalized.setdefault(norm, term)
+
+        self._trigrams: Dict[str, FrozenSet[str]] = {}
+        self._index: Dict[str, Set[str]] = defaultdict(set)
+        if threshold is not None:
+            for norm in self._normalized:
+                grams = self._trigrams[norm] = _trigrams(norm)
+                for gram in grams:
+                    self._index[gram].add(norm)
+        self._cache: Dict[str, Optional[str]] = {}
+
+    def match(self, key: str) -> str | None:
+        """Return the term matching *key*, or ``None``."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        norm = normalize_key(key, self.singularize)
+        term = self._normalized.get(norm)
+        if term is None and self.threshold is not None and norm:
+            term = self._closest(norm)
+        self._cache[key] = term
+        return term
+
+    def _closest(self, norm: str) -> str | None:
+        grams = _trigrams(norm)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self._index.get(gram, ()):
+                shared[candidate] += 1
+
+        best, best_score = None, 0.0
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + len(self._trigrams[candidate]))
+            if score > best_score or (score == best_score and candidate < best):
+                best, best_score = candidate, score
+        if best is None or best_score < self.threshold:
+            return None
+        return self._normalized[best]
@@ -0,0 +1,184 @@
+"""A persistent memo of resolution results, shared by conversion runs.
+
+Runs over similar inputs resolve the same keys to predicates and the same
+type values to classes, and detect the datatypes of the same strings (enum
+values, dates), day after day. Given a :class:`Memo`,
+:class:`~jrt.builder.GraphBuilder` looks these results up in a SQLite file
+first and records the new ones there, so later runs and batch workers start
+warm:
+
+- ``predicate``: the predicate of a JSON key (and subject class);
+- ``class``: the class of a type value;
+- ``datatype``: the XSD datatype detected for a string value that may
+  have one (see :func:`~jrt.datatypes.may_have_datatype`).
+
+Entries only hold for the ontologies and options they were computed with.
+:meth:`Memo.bind` takes their fingerprint (see
+:meth:`OntologyResolver.fingerprint
+<jrt.ontology.OntologyResolver.fingerprint>`) and drops every entry when it
+changed. Each save is a new generation: entries used in the run move to it,
+and beyond :attr:`Memo.max_entries` the entries left unused for the most
+generations are evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from rdflib import URIRef
+
+from .datatypes import detect_datatype, may_have_datatype
+
+# Entries kept in a memo file
+MAX_ENTRIES = 100000
+
+# Kinds of results memoized
+PREDICATE = "predicate"
+CLASS = "class"
+DATATYPE = "datatype"
+KINDS = (PREDICATE, CLASS, DATATYPE)
+
+# Part of every fingerprint: bumped when resolution itself changes
+VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS entries_generation ON entries (generation);
+"""
+
+_MISSING = object()
+
+
+class Memo:
+    """The memo file at *path*, holding up to *max_entries* results."""
+
+    def __init__(self, path: Path, max_entries: int = MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("A memo must hold at least 1 entry")
+        self.path = path
+        self.max_entries = max_entries
+        self.fingerprint: Optional[str] = None
+        self.loaded = 0  # entries read from the file
+        self.reused = 0  # of which used in this run
+        self.added = 0  # results computed in this run
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        # results used in this run, and results of the file not used yet
+        self._used: Dict[str, Dict[str, Any]] = {kind: {} for kind in KINDS}
+        self._stored: Dict[str, Dict[str, Any]] = {kind: {} for kind in KINDS}
+        # what to write on the next save
+        self._new: Dict[str, List[str]] = {kind: [] for kind in KINDS}
+        self._touched: Dict[str, List[str]] = {kind: [] for kind in KINDS}
+
+    def __enter__(self) -> Memo:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def bind(self, *parts: Any) -> bool:
+        """Use the entries computed for the same *parts* (fingerprints, options), drop others.
+
+        Return True if entries were kept: a warm start.
+        """
+        fingerprint = hashlib.sha256(repr((VERSION, *parts)).encode("utf-8")).hexdigest()
+        if fingerprint == self.fingerprint:
+            return bool(self.loaded)
+        self.fingerprint = fingerprint
+        for tables in (self._used, self._stored, self._new, self._touched):
+            for table in tables.values():
+                table.clear()
+        self.loaded = self.reused = self.added = 0
+        with self._db:
+            if self._stored_fingerprint() != fingerprint:
+                self._db.execute("DELETE FROM entries")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,)
+                )
+                return False
+        for kind, key, value in self._db.execute("SELECT kind, key, value FROM entries"):
+            self._stored[kind][key] = URIRef(value) if value else None
+            self.loaded += 1
+        return bool(self.loaded)
+
+    def lookup(self, kind: str, key: str, compute: Callable[..., Any], *args: Any) -> Any:
+        """The result memoized for *key*, else ``compute(*args)``, memoized."""
+        used = self._used[kind]
+        value = used.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._stored[kind].pop(key, _MISSING)
+            if value is not _MISSING:
+                self._touched[kind].append(key)
+                self.reused += 1
+            else:
+                value = compute(*args)
+                self._new[kind].append(key)
+                self.added += 1
+            used[key] = value
+        return value
+
+    def datatype(self, value: str) -> Optional[URIRef]:
+        """:func:`~jrt.datatypes.detect_datatype` of *value*, memoized when it may have one."""
+        if not may_have_datatype(value):
+            return None
+        return self.lookup(DATATYPE, value, detect_datatype, value)
+
+    def save(self) -> None:
+        """Write the results used since the last save as a new generation, then evict."""
+        if self.fingerprint is None:
+            raise ValueError("Bind the memo to a fingerprint before saving it")
+        with self._db:
+            # another run rebound the file to other ontologies: these results are stale there
+            if self._stored_fingerprint() != self.fingerprint:
+                return
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+            generation = int(row[0]) + 1 if row is not None else 1
+            for kind in KINDS:
+                used = self._used[kind]
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    ((kind, key, _encode(used[key]), generation) for key in self._new[kind]),
+                )
+                self._db.executemany(
+                    "UPDATE entries SET generation = ? WHERE kind = ? AND key = ?",
+                    ((generation, kind, key) for key in self._touched[kind]),
+                )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM entries WHERE rowid IN "
+                    "(SELECT rowid FROM entries ORDER BY generation LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (str(generation),)
+            )
+        for kind in KINDS:
+            self._new[kind].clear()
+            self._touched[kind].clear()
+
+    def close(self) -> None:
+        """Save, if bound, and close the file."""
+        try:
+            if self.fingerprint is not None:
+                self.save()
+        finally:
+            self._db.close()
+
+    def _stored_fingerprint(self) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        return row[0] if row is not None else None
+
+
+def _encode(value: Optional[URIRef]) -> str:
+    return str(value) if value is not None else ""
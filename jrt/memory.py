@@ -0,0 +1,119 @@
+"""Memory accounting helpers for bounded conversions.
+
+Measuring the process size on every triple would cost more than building
+it, and RSS never shrinks once the allocator has grown the heap. The builder
+therefore estimates its footprint from counts it already has -- triples in
+the graph, entries in the label index -- weighted by the per-item costs
+below, and compares that to its budget.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, MutableMapping, Optional
+
+from rdflib import URIRef
+
+# Approximate bytes held per triple in rdflib's Memory store (three indexes
+# plus the term objects) and per label index entry, measured with tracemalloc
+TRIPLE_COST = 1700
+LABEL_COST = 260
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes, or 0 where unknown."""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kibibytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LabelIndex(MutableMapping[str, URIRef]):
+    """Label -> resource mapping that can move its entries to an on-disk table.
+
+    Entries live in a dict until :meth:`spill` writes them to a temporary
+    SQLite database and empties it; lookups check the dict first, then the
+    database. Only the entries added since the last spill count against the
+    memory budget.
+    """
+
+    def __init__(self, tmp_dir: Optional[Path] = None):
+        self.tmp_dir = tmp_dir
+        self._memory: Dict[str, URIRef] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._path: Optional[str] = None
+
+    @property
+    def in_memory(self) -> int:
+        """Number of entries held in memory."""
+        return len(self._memory)
+
+    @property
+    def spilled(self) -> bool:
+        return self._db is not None
+
+    def spill(self) -> None:
+        """Move every in-memory entry to disk."""
+        if not self._memory:
+            return
+        if self._db is None:
+            fd, self._path = tempfile.mkstemp(prefix="jrt-labels-", suffix=".db", dir=self.tmp_dir)
+            os.close(fd)
+            self._db = sqlite3.connect(self._path, check_same_thread=False)
+            # a scratch table: durability is not needed, speed is
+            self._db.execute("PRAGMA journal_mode=OFF")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute("CREATE TABLE labels (label TEXT PRIMARY KEY, uri TEXT NOT NULL)")
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO labels VALUES (?, ?)",
+                ((label, str(uri)) for label, uri in self._memory.items()),
+            )
+        self._memory.clear()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            os.unlink(self._path)
+
+    def __getitem__(self, label: str) -> URIRef:
+        try:
+            return self._memory[label]
+        except KeyError:
+            if self._db is None:
+                raise
+        row = self._db.execute("SELECT uri FROM labels WHERE label = ?", (label,)).fetchone()
+        if row is None:
+            raise KeyError(label)
+        return URIRef(row[0])
+
+    def __setitem__(self, label: str, uri: URIRef) -> None:
+        self._memory[label] = uri
+
+    def __delitem__(self, label: str) -> None:
+        found = self._memory.pop(label, None) is not None
+        if self._db is not None:
+            with self._db:
+                found |= (
+                    self._db.execute("DELETE FROM labels WHERE label = ?", (label,)).rowcount > 0
+                )
+        if not found:
+            raise KeyError(label)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._memory
+        if self._db is not None:
+            for (label,) in self._db.execute("SELECT label FROM labels"):
+                if label not in self._memory:
+                    yield label
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -0,0 +1,231 @@
+"""Direct N-Triples / N-Quads writer, byte-for-byte compatible with rdflib.
+
+``graph.serialize(format="nt")`` formats every term of every triple with
+``n3()`` and writes each line to the stream on its own. :class:`NTriplesWriter`
+produces the same bytes in the same order, but formats each distinct
+non-literal term once (subjects, predicates and linked resources repeat on
+nearly every line), reads the triples of in-memory graphs straight from the
+store instead of through the generic pattern-matching ``triples()``, and
+writes large encoded chunks. With ``background=True``
+the chunks are written by a separate thread, so file I/O overlaps with
+formatting the next ones.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import IO, Dict, Iterable, List, Optional, Set, Tuple
+
+from rdflib import ConjunctiveGraph, Graph, Literal, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.plugins.stores.memory import Memory
+from rdflib.term import Node
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+# Formatted URIs kept before the cache is reset; bounds its memory on
+# documents with many distinct resources
+CACHE_SIZE = 1 << 16
+
+# Lines formatted before they are joined and encoded in one go
+_LINES_PER_ENCODE = 4096
+
+# Chunks allowed to queue up for the background thread before the producer waits
+_QUEUE_DEPTH = 8
+
+
+def _quote(text: str) -> str:
+    """Escape a literal's lexical form exactly like rdflib's N-Triples serializer."""
+    # most values need no escaping: four scans beat always rewriting the string
+    if "\\" in text or "\n" in text or '"' in text or "\r" in text:
+        text = text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        text = text.replace("\r", "\\r")
+    return f'"{text}"'
+
+
+def _graph_triples(graph: Graph) -> Iterable[Tuple[Node, Node, Node]]:
+    """The triples of *graph*, in the order ``graph.serialize`` writes them."""
+    triples = _memory_triples(graph)
+    return triples if triples is not None else graph
+
+
+def _memory_triples(graph: Graph) -> Optional[Set[Tuple[Node, Node, Node]]]:
+    """The triples of *graph* read from rdflib's ``Memory`` store, or None.
+
+    This is the set ``Memory.triples()`` walks for an all-wildcard pattern,
+    minus its per-triple context lookups. It is copied like ``triples()``
+    copies it, which also fixes the iteration order. None means *graph* is in
+    another store, or the store's private attributes changed; the tests check
+    that the rdflib versions allowed by pyproject.toml still have them.
+    """
+    store = graph.store
+    if not isinstance(store, Memory) or isinstance(graph, ConjunctiveGraph):
+        return None
+    try:
+        key = store._Memory__ctx_to_str(graph)
+        return store._Memory__contextTriples.get(key, set()).copy()
+    except AttributeError:
+        return None
+
+
+class NTriplesWriter:
+    """Write triples (or quads) to a binary *stream* as N-Triples (N-Quads)."""
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        background: bool = False,
+    ):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.written = 0  # bytes handed to the stream (or its writer thread)
+        self._uris: Dict[str, str] = {}
+        self._datatypes: Dict[URIRef, str] = {}
+        self._lines: List[str] = []
+        self._chunks: List[bytes] = []
+        self._buffered = 0
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        if background:
+            self._queue = queue.Queue(_QUEUE_DEPTH)
+            self._thread = threading.Thread(target=self._drain, name="jrt-nt-writer", daemon=True)
+            self._thread.start()
+
+    def __enter__(self) -> NTriplesWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, triples: Iterable[Tuple[Node, Node, Node]]) -> None:
+        """Write N-Triples lines for *triples*; a graph gives ``graph.serialize(format="nt")``."""
+        if isinstance(triples, Graph):
+            triples = _graph_triples(triples)
+        self._write_lines(triples, " .\n")
+
+    def write_dataset(self, dataset: Graph) -> None:
+        """Write every graph of *dataset*, as ``dataset.serialize(format="nquads")`` would."""
+        for context in dataset.store.contexts():
+            self.write_graph(context)
+        self._lines.append("\n")
+        self._collect(errors="replace")
+
+    def write_graph(self, graph: Graph) -> None:
+        """Write the triples of one graph of a dataset as N-Quads lines naming it."""
+        identifier = graph.identifier
+        name = identifier.n3() if identifier and identifier != DATASET_DEFAULT_GRAPH_ID else ""
+        self._write_lines(_graph_triples(graph), f" {name} .\n", errors="replace")
+
+    def flush(self) -> None:
+        """Hand everything buffered so far to the stream."""
+        self._collect()
+        self._send()
+        if self._queue is not None:
+            self._queue.join()
+            self._raise()
+
+    def close(self) -> None:
+        """Flush, and stop the background thread; the stream itself is left open."""
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+        self._raise()
+
+    def _write_lines(
+        self, triples: Iterable[Tuple[Node, Node, Node]], end: str, errors: str = "strict"
+    ) -> None:
+        uris, term, literal, suffixes = self._uris, self._term, self._literal, self._datatypes
+        lines, append = self._lines, self._lines.append
+        for s, p, o in triples:
+            subject = uris.get(s) or term(s)
+            predicate = uris.get(p) or term(p)
+            if type(o) is Literal:
+                # inlined common case of _literal: no language tag, known datatype
+                text = str(o)
+                if "\\" in text or "\n" in text or '"' in text or "\r" in text or o._language:
+                    obj = literal(o)
+                else:
+                    datatype = o._datatype
+                    if datatype is None:
+                        obj = f'"{text}"'
+                    else:
+                        suffix = suffixes.get(datatype)
+                        obj = f'"{text}"{suffix}' if suffix is not None else literal(o)
+            elif isinstance(o, Literal):
+                obj = literal(o)
+            else:
+                obj = uris.get(o) or term(o)
+            append(f"{subject} {predicate} {obj}{end}")
+            if len(lines) >= _LINES_PER_ENCODE:
+                self._collect(errors)
+
+    def _term(self, node: Node) -> str:
+        """``n3()`` of a URI (cached) or blank node."""
+        text = node.n3()
+        if type(node) is URIRef:
+            if len(self._uris) >= CACHE_SIZE:
+                self._uris.clear()
+            self._uris[node] = text
+        return text
+
+    def _literal(self, literal: Literal) -> str:
+        # the slots behind the language/datatype properties, read directly
+        language, datatype = literal._language, literal._datatype
+        if language:
+            if datatype:
+                raise Exception("Literal has datatype AND language!")
+            return f"{_quote(str(literal))}@{language}"
+        if datatype:
+            suffix = self._datatypes.get(datatype)
+            if suffix is None:
+                suffix = self._datatypes[datatype] = f"^^<{str(datatype)}>"
+            return _quote(str(literal)) + suffix
+        return _quote(str(literal))
+
+    def _collect(self, errors: str = "strict") -> None:
+        """Encode the pending lines into the chunk, sending it once it is full."""
+        if self._lines:
+            data = "".join(self._lines).encode("utf-8", errors)
+            self._lines.clear()
+            self._chunks.append(data)
+            self._buffered += len(data)
+            if self._buffered >= self.buffer_size:
+                self._send()
+
+    def _send(self) -> None:
+        if not self._chunks:
+            return
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._buffered = 0
+        self.written += len(data)
+        if self._queue is None:
+            self.stream.write(data)
+        else:
+            self._raise()
+            self._queue.put(data)
+
+    def _drain(self) -> None:
+        while True:
+            data = self._queue.get()
+            try:
+                if data is None:
+                    return
+                if self._error is None:
+                    self.stream.write(data)
+            except BaseException as exc:  # reported to the producer on its next call
+                self._error = exc
+            finally:
+                self._queue.task_done()
+
+    def _raise(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -0,0 +1,147 @@
+"""Byte-offset indexes of large JSON arrays, to convert any range of their items.
+
+:func:`index_records` scans a top-level JSON array once and writes the byte
+offset at which each item ends to an index file. :class:`RecordIndex` maps
+that file back through ``mmap`` and yields the items of a range (or of one
+shard of *n*) by reading the array from the end of the item before it, like
+a resumed :class:`~jrt.reader.RecordStream`: items before the range are
+neither read nor parsed, so machines can split one huge file between them.
+
+File layout (little-endian)::
+
+    header   magic (8 bytes), version (u32), reserved (u32), source size (u64),
+             source fingerprint (32 bytes), item count N (u64)
+    offsets  N x u64: byte offset of the end of each item
+
+The source size and :func:`~jrt.reader.fingerprint` (a hash of its first
+and last blocks) tell an index out of date with its array. An edit in the
+middle that keeps the size goes unnoticed: hashing the whole array would
+read it all on every open, which ranges exist to avoid. Such an edit only
+breaks the index if it moves item ends, and then decoding fails or yields
+wrong items, so index the array again after editing it. The modification
+time is not used, so a copied array keeps its index.
+
+Labels only link to resources of the records converted in the same run, so
+a range gets new resources for labels of records outside it.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+from .paths import PathNode
+from .reader import RecordStream, fingerprint, is_array_document
+
+MAGIC = b"JRTRECS\x00"
+VERSION = 2
+
+# Appended to the input path to name its index file
+SUFFIX = ".jrtx"
+
+_HEADER = struct.Struct("<8sIIQ32sQ")
+_U64 = struct.Struct("<Q")
+
+
+def index_records(source: Path, path: Optional[Path] = None) -> int:
+    """Write the offsets index of the JSON array at *source*; return its item count.
+
+    The index goes to *path*, by default the source path plus :data:`SUFFIX`.
+    """
+    if not is_array_document(source):
+        raise ValueError(f"{source} is not a JSON array")
+    size, digest = source.stat().st_size, bytes.fromhex(fingerprint(source))
+    stream = _OffsetScan(source)
+    ends = array("Q", (stream.offset for _ in stream))
+    if sys.byteorder == "big":
+        ends.byteswap()
+    with (path or _default_path(source)).open("wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, size, digest, len(ends)))
+        ends.tofile(f)
+    return len(ends)
+
+
+class RecordIndex:
+    """The offsets index at *path* (by default the *source* path plus :data:`SUFFIX`)."""
+
+    def __init__(self, source: Path, path: Optional[Path] = None):
+        self.source = source
+        self.path = path or _default_path(source)
+        with self.path.open("rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < _HEADER.size:
+                raise ValueError(f"{self.path} is not a JRT record index")
+            magic, version, _, size, digest, count = _HEADER.unpack_from(self._map)
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a JRT record index")
+            if version != VERSION:
+                raise ValueError(f"{self.path} has index version {version}, expected {VERSION}")
+            if len(self._map) != _HEADER.size + count * _U64.size:
+                raise ValueError(f"{self.path} is truncated")
+            if source.stat().st_size != size or fingerprint(source) != digest.hex():
+                raise ValueError(f"{self.path} is out of date with {source}: index it again")
+        except ValueError:
+            self._map.close()
+            raise
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def offset(self, i: int) -> int:
+        """Byte offset to read item *i* from: the end of item ``i - 1``, or 0."""
+        if i == 0:
+            return 0
+        return _U64.unpack_from(self._map, _HEADER.size + (i - 1) * _U64.size)[0]
+
+    def records(self, start: int, stop: int, plan: Optional[PathNode] = None) -> Iterator[Any]:
+        """Yield items *start* to *stop* (excluded) of the array, decoded along *plan*."""
+        start, stop, _ = slice(start, stop).indices(self._count)
+        if start >= stop:
+            return iter(())
+        return islice(RecordStream(self.source, plan, self.offset(start)), stop - start)
+
+    def shard(self, i: int, n: int) -> Tuple[int, int]:
+        """The (start, stop) range of shard *i* of *n* (from 0) of equal item counts."""
+        if not 0 <= i < n:
+            raise ValueError(f"Shard {i}/{n} does not exist: expected 0 <= i < n")
+        return self._count * i // n, self._count * (i + 1) // n
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> RecordIndex:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _OffsetScan(RecordStream):
+    """A :class:`~jrt.reader.RecordStream` reading the file as Latin-1.
+
+    Each byte is then one character, so offsets are positions in the text:
+    nothing is encoded back to count bytes. JSON delimiters are ASCII, and the
+    bytes of multibyte UTF-8 characters are not, so items end where they do
+    in the UTF-8 text.
+    """
+
+    @property
+    def offset(self) -> int:
+        return self._base + self._end
+
+    def _open(self):
+        return self.path.open(encoding="latin-1", newline="")
+
+    def _byte_length(self, text: str) -> int:
+        return len(text)
+
+
+def _default_path(source: Path) -> Path:
+    return source.with_name(source.name + SUFFIX)
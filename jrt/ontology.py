@@ -1,14 +1,27 @@
+import hashlib
 import logging
 from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Union
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
 
 from rdflib import Graph, Literal, URIRef
-from rdflib.namespace import OWL, RDF, RDFS
+from rdflib.namespace import OWL, RDF, RDFS, XSD
+from rdflib.plugins.stores.memory import Memory
+from rdflib.term import Node
 
 logger = logging.getLogger(__name__)
 
+# OWL property characteristics that only apply to object properties
+OBJECT_PROPERTY_CHARACTERISTICS = (
+    OWL.InverseFunctionalProperty,
+    OWL.TransitiveProperty,
+    OWL.SymmetricProperty,
+    OWL.AsymmetricProperty,
+    OWL.ReflexiveProperty,
+    OWL.IrreflexiveProperty,
+)
+
 # File extensions recognized when loading ontologies from a directory
 ONTOLOGY_SUFFIXES = {".rdf", ".owl", ".xml", ".ttl"}
 
@@ -64,14 +77,37 @@ class OntologyLoader:
 
 
 class OntologyResolver:
-    """Index and query OWL/RDFS ontologies for classes & properties."""
+    """Index and query OWL/RDFS ontologies for classes & properties.
+
+    With ``hierarchy=True`` the resolver also reads ``rdfs:subClassOf``,
+    ``rdfs:subPropertyOf``, ``rdfs:domain``, ``rdfs:range`` and the OWL
+    property characteristics. Their transitive closures are computed once
+    here and folded into the lookup tables, so every query stays a dict or
+    set lookup at conversion time.
+    """
 
-    def __init__(self, graphs: Iterable[Graph]):
+    def __init__(self, graphs: Iterable[Graph], hierarchy: bool = False):
+        graphs = list(graphs)
+        self.hierarchy = hierarchy
         self._label_to_uri: Dict[str, Set[URIRef]] = defaultdict(set)
         self._classes: Set[URIRef] = set()
         self._object_props: Set[URIRef] = set()
         self._datatype_props: Set[URIRef] = set()
+        self._superclasses: Dict[URIRef, FrozenSet[URIRef]] = {}
+        self._domains: Dict[URIRef, FrozenSet[URIRef]] = {}
+        self._datatype_ranges: Dict[URIRef, URIRef] = {}
+        self._label_to_properties: Dict[str, Tuple[URIRef, ...]] = {}
+        self._property_cache: Dict[Tuple[str, Optional[URIRef]], Optional[URIRef]] = {}
         self._build_index(graphs)
+        if hierarchy:
+            self._build_hierarchy(graphs)
+
+    @classmethod
+    def open(cls, path: Path) -> "OntologyResolver":
+        """Open a compiled index file (see ``jrt compile-ontology``) through mmap."""
+        from .compiled import MappedOntologyResolver
+
+        return MappedOntologyResolver(path)
 
     def resolve(self, label: str) -> URIRef | None:
         """Return first URI whose label/localname matches *label* (case-insensitive)."""
@@ -82,6 +118,41 @@ class OntologyResolver:
             return min(uris)
         return None
 
+    def resolve_property(self, label: str, domain: URIRef | None = None) -> URIRef | None:
+        """Return the property matching *label*, or ``None``.
+
+        With the hierarchy loaded, a label shared by several properties
+        resolves to one whose ``rdfs:domain`` covers *domain* (the class of
+        the subject, or one of its superclasses) when there is one.
+        """
+        if not self.hierarchy:
+            uri = self.resolve(label)
+            return uri if uri is not None and self.is_property(uri) else None
+
+        cache_key = (label.lower(), domain)
+        if cache_key not in self._property_cache:
+            candidates = self._label_to_properties.get(cache_key[0], ())
+            chosen = candidates[0] if candidates else None
+            if domain is not None and len(candidates) > 1:
+                classes = self.superclasses(domain) | {domain}
+                chosen = next(
+                    (p for p in candidates if self._domains.get(p, set()) & classes), chosen
+                )
+            self._property_cache[cache_key] = chosen
+        return self._property_cache[cache_key]
+
+    def superclasses(self, uri: URIRef) -> FrozenSet[URIRef]:
+        """All (transitive) superclasses of *uri*; empty without the hierarchy."""
+        return self._superclasses.get(uri, frozenset())
+
+    def domains(self, uri: URIRef) -> FrozenSet[URIRef]:
+        """Classes declared (or inherited through subPropertyOf) as domain of *uri*."""
+        return self._domains.get(uri, frozenset())
+
+    def datatype_range(self, uri: URIRef) -> URIRef | None:
+        """The XSD datatype declared (or inherited) as range of property *uri*."""
+        return self._datatype_ranges.get(uri)
+
     def is_class(self, uri: URIRef) -> bool:
         return uri in self._classes
 
@@ -95,33 +166,167 @@ class OntologyResolver:
         """True if *uri* is any kind of known property (object or datatype)."""
         return uri in self._object_props or uri in self._datatype_props
 
+    def labels(self) -> List[str]:
+        """All indexed (lowercased) labels and local names."""
+        return list(self._label_to_uri)
+
+    def classes(self) -> List[URIRef]:
+        return list(self._classes)
+
+    def object_properties(self) -> List[URIRef]:
+        return list(self._object_props)
+
+    def datatype_properties(self) -> List[URIRef]:
+        return list(self._datatype_props)
+
+    def fingerprint(self) -> str:
+        """A digest of the lookup tables: equal for ontologies resolving every term alike."""
+        digest = hashlib.sha256()
+
+        def add(*parts: str) -> None:
+            digest.update("\x1f".join(parts).encode("utf-8") + b"\x1e")
+
+        add("hierarchy" if self.hierarchy else "flat")
+        for label in sorted(self._label_to_uri):
+            add(label, *sorted(self._label_to_uri[label]))
+        for members in (self._classes, self._object_props, self._datatype_props):
+            add(*sorted(members))
+        for table in (self._superclasses, self._domains):
+            for uri in sorted(table):
+                add(uri, *sorted(table[uri]))
+        for uri in sorted(self._datatype_ranges):
+            add(uri, self._datatype_ranges[uri])
+        return digest.hexdigest()
+
     def _build_index(self, graphs: Iterable[Graph]) -> None:
+        kinds = (
+            (OWL.Class, self._classes),
+            (OWL.ObjectProperty, self._object_props),
+            (OWL.DatatypeProperty, self._datatype_props),
+            # plain rdf:Property with no OWL typing -> treat as datatype
+            (RDF.Property, self._datatype_props),
+        )
         for g in graphs:
-            for s, p, o in g:
+            typed, labels, subjects = self._scan(g, [kind for kind, _ in kinds])
+
+            # 1) class / property typology
+            for (_, target), members in zip(kinds, typed):
                 # only URIRef subjects are referenceable in the output graph
-                if not isinstance(s, URIRef):
-                    continue
+                target.update(s for s in members if isinstance(s, URIRef))
+
+            # 2) rdfs:label mapping, lowercased once per distinct label
+            for label, members in labels:
+                if isinstance(label, Literal):
+                    uris = self._label_to_uri[str(label).lower()]
+                    uris.update(s for s in members if isinstance(s, URIRef))
 
-                # 1) rdfs:label mapping
-                if p == RDFS.label and isinstance(o, Literal):
-                    self._label_to_uri[str(o).lower()].add(s)
-
-                # 2) keep localname as label too
-                localname = self._local_name(s)
-                if localname:
-                    self._label_to_uri[localname.lower()].add(s)
-
-                # 3) class / property typology
-                if p == RDF.type:
-                    if o == OWL.Class:
-                        self._classes.add(s)
-                    elif o == OWL.ObjectProperty:
-                        self._object_props.add(s)
-                    elif o == OWL.DatatypeProperty:
-                        self._datatype_props.add(s)
-                    elif o == RDF.Property:
-                        # plain rdf:Property with no OWL typing -> treat as datatype
-                        self._datatype_props.add(s)
+            # 3) keep localname as label too, computed once per distinct subject
+            for s in subjects:
+                if isinstance(s, URIRef):
+                    localname = self._local_name(s)
+                    if localname:
+                        self._label_to_uri[localname.lower()].add(s)
+
+    def _build_hierarchy(self, graphs: List[Graph]) -> None:
+        subclass_of: Dict[URIRef, Set[URIRef]] = defaultdict(set)
+        subproperty_of: Dict[URIRef, Set[URIRef]] = defaultdict(set)
+        domains: Dict[URIRef, Set[URIRef]] = defaultdict(set)
+        ranges: Dict[URIRef, Set[URIRef]] = defaultdict(set)
+        untyped_props: Set[URIRef] = set()
+
+        for g in graphs:
+            for edges, predicate in (
+                (subclass_of, RDFS.subClassOf),
+                (subproperty_of, RDFS.subPropertyOf),
+                (domains, RDFS.domain),
+                (ranges, RDFS.range),
+            ):
+                for s, o in g.subject_objects(predicate):
+                    if isinstance(s, URIRef) and isinstance(o, URIRef):
+                        edges[s].add(o)
+            for kind in OBJECT_PROPERTY_CHARACTERISTICS:
+                self._object_props.update(
+                    s for s in g.subjects(RDF.type, kind) if isinstance(s, URIRef)
+                )
+            for kind in (OWL.FunctionalProperty, RDF.Property, OWL.AnnotationProperty):
+                untyped_props.update(s for s in g.subjects(RDF.type, kind) if isinstance(s, URIRef))
+            for kind in (RDFS.Class, OWL.Class):
+                self._classes.update(s for s in g.subjects(RDF.type, kind) if isinstance(s, URIRef))
+
+        # 1) closures, computed once
+        self._superclasses = _transitive_closure(subclass_of)
+        superproperties = _transitive_closure(subproperty_of)
+        self._classes.update(subclass_of, *subclass_of.values())
+
+        # 2) domain / range are inherited from super-properties
+        properties = set(subproperty_of).union(*subproperty_of.values(), domains, ranges)
+        for prop in properties:
+            lineage = {prop} | superproperties.get(prop, frozenset())
+            inherited_domains = set().union(*(domains.get(p, ()) for p in lineage))
+            if inherited_domains:
+                self._domains[prop] = frozenset(inherited_domains)
+            inherited_ranges = set().union(*(ranges.get(p, ()) for p in lineage))
+            datatypes = sorted(r for r in inherited_ranges if _is_datatype(r))
+            # only a specific XSD type is worth stamping on literals
+            typed = [r for r in datatypes if r.startswith(str(XSD)) and r != XSD.string]
+            if typed:
+                self._datatype_ranges[prop] = typed[0]
+            if inherited_ranges and not datatypes:
+                # a range that is a class makes it a link between resources
+                self._object_props.add(prop)
+                self._classes.update(inherited_ranges)
+            elif datatypes and prop not in self._object_props:
+                self._datatype_props.add(prop)
+            self._classes.update(inherited_domains)
+
+        # 3) sub-properties take the kind of their super-properties
+        for prop, supers in superproperties.items():
+            if supers & self._object_props:
+                self._object_props.add(prop)
+            elif supers & self._datatype_props:
+                self._datatype_props.add(prop)
+
+        # anything else used as a property defaults to datatype, like rdf:Property,
+        # and a default never overrides an inferred object property
+        untyped_props |= properties
+        self._datatype_props |= untyped_props - self._object_props
+        self._datatype_props -= untyped_props & self._object_props
+
+        # 4) properties per label, for domain-aware predicate choice
+        for label, uris in self._label_to_uri.items():
+            props = sorted(u for u in uris if self.is_property(u))
+            if props:
+                self._label_to_properties[label] = tuple(props)
+
+    @staticmethod
+    def _scan(
+        g: Graph, kinds: List[URIRef]
+    ) -> Tuple[List[Iterable[Node]], Iterable[Tuple[Node, Iterable[Node]]], Iterable[Node]]:
+        """Return the subjects typed with each of *kinds*, the subjects of each
+        ``rdfs:label`` value, and the distinct subjects of *g*.
+
+        Only these patterns are queried, instead of visiting every triple.
+        """
+        # rdflib's default in-memory store: read its indexes directly
+        indexes = _memory_indexes(g)
+        if indexes is not None:
+            spo, pos = indexes
+            types = pos.get(RDF.type, {})
+            return (
+                [types.get(kind, ()) for kind in kinds],
+                pos.get(RDFS.label, {}).items(),
+                # removals leave empty entries behind
+                [s for s, po in spo.items() if any(po.values())],
+            )
+
+        labels: Dict[Node, List[Node]] = defaultdict(list)
+        for s, o in g.subject_objects(RDFS.label):
+            labels[o].append(s)
+        return (
+            [list(g.subjects(RDF.type, kind)) for kind in kinds],
+            labels.items(),
+            set(g.subjects(unique=True)),
+        )
 
     @staticmethod
     def _local_name(uri: URIRef) -> str | None:
@@ -130,3 +335,47 @@ class OntologyResolver:
         if "/" in uri:
             return uri.rsplit("/", 1)[-1]
         return None
+
+
+def _memory_indexes(g: Graph) -> Optional[Tuple[Dict, Dict]]:
+    """The (s) and (p, o) indexes of *g* in rdflib's ``Memory`` store, or None.
+
+    None as well when the store is shared with other graphs (e.g. a Dataset),
+    and so holds triples that are not part of *g*, or when the store's private
+    attributes changed; the tests check that the rdflib versions allowed by
+    pyproject.toml still have them.
+    """
+    store = g.store
+    if not isinstance(store, Memory) or len(store) != len(g):
+        return None
+    spo = getattr(store, "_Memory__spo", None)
+    pos = getattr(store, "_Memory__pos", None)
+    if spo is None or pos is None:
+        return None
+    return spo, pos
+
+
+def _is_datatype(uri: URIRef) -> bool:
+    """True for ranges denoting literal values rather than resources."""
+    return uri.startswith(str(XSD)) or uri in (RDFS.Literal, RDF.langString, RDFS.Datatype)
+
+
+def _transitive_closure(edges: Dict[URIRef, Set[URIRef]]) -> Dict[URIRef, FrozenSet[URIRef]]:
+    """Map every node of *edges* to all nodes reachable from it (cycles allowed)."""
+    closure: Dict[URIRef, FrozenSet[URIRef]] = {}
+    for start in edges:
+        reached: Set[URIRef] = set()
+        pending = list(edges[start])
+        while pending:
+            node = pending.pop()
+            if node in reached:
+                continue
+            reached.add(node)
+            if node in closure:
+                # already complete: no need to walk it again
+                reached |= closure[node]
+            else:
+                pending.extend(edges.get(node, ()))
+        reached.discard(start)
+        closure[start] = frozenset(reached)
+    return closure
@@ -0,0 +1,165 @@
+"""Minimal JSON path expressions and the trie they compile into.
+
+The supported syntax is the subset needed to address nodes of a JSON
+document: ``$`` (the root), ``.key`` or ``['key']`` (an object member),
+``.*`` (any member) and ``[*]`` (any array element), e.g.
+``$.items[*].author``.
+
+Paths are compiled into a :class:`PathNode` trie that is walked alongside the
+document, so matching a node costs one dict lookup per level instead of a
+string comparison against every expression. Include filters are compiled into
+the same trie: every node off the selected paths gets a *pruned* value.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+ANY_KEY = "*"
+ANY_ITEM = "[*]"
+
+_SEGMENT_RE = re.compile(r"\.([^.\[\]]+)|\[\*\]|\[(['\"])(.*?)\2\]")
+
+
+def parse_path(expr: str) -> Tuple[str, ...]:
+    """Split *expr* into segments: member names, :data:`ANY_KEY` or :data:`ANY_ITEM`."""
+    expr = expr.strip()
+    if not expr.startswith("$"):
+        raise ValueError(f"JSON path must start with '$': {expr!r}")
+    segments = []
+    pos = 1
+    while pos < len(expr):
+        match = _SEGMENT_RE.match(expr, pos)
+        if match is None:
+            raise ValueError(f"Invalid JSON path {expr!r} at position {pos}")
+        if match.group(1) is not None:
+            segments.append(match.group(1))
+        elif match.group(3) is not None:
+            segments.append(match.group(3))
+        else:
+            segments.append(ANY_ITEM)
+        pos = match.end()
+    return tuple(segments)
+
+
+def format_segment(key: str) -> str:
+    """The path segment addressing member *key*: ``.key``, or ``['key']`` when needed."""
+    if key and key != ANY_KEY and not any(c in key for c in ".[]'\""):
+        return f".{key}"
+    quote = '"' if "'" in key else "'"
+    return f"[{quote}{key}{quote}]"
+
+
+class PathNode:
+    """One level of a compiled path trie, holding the value attached to that path.
+
+    ``closed`` is only set by include filters: ``True`` on strict ancestors of
+    an included path, ``False`` on the included node itself.
+    """
+
+    __slots__ = ("keys", "any_key", "items", "value", "closed")
+
+    def __init__(self) -> None:
+        self.keys: Dict[str, PathNode] = {}
+        self.any_key: Optional[PathNode] = None
+        self.items: Optional[PathNode] = None
+        self.value: Any = None
+        self.closed: Optional[bool] = None
+
+    def child(self, key: str) -> Optional[PathNode]:
+        """Node for object member *key*, falling back to the ``.*`` wildcard."""
+        return self.keys.get(key, self.any_key)
+
+    def insert(self, segments: Tuple[str, ...]) -> PathNode:
+        node = self
+        for segment in segments:
+            if segment == ANY_ITEM:
+                node.items = node.items or PathNode()
+                node = node.items
+            elif segment == ANY_KEY:
+                node.any_key = node.any_key or PathNode()
+                node = node.any_key
+            else:
+                node = node.keys.setdefault(segment, PathNode())
+        return node
+
+
+def build_trie(
+    entries: Iterable[Tuple[str, Any]],
+    merge: Callable[[Any, Any], Any] = lambda exact, wildcard: exact,
+    include: Iterable[str] = (),
+    pruned: Any = None,
+) -> PathNode:
+    """Compile ``(path expression, value)`` pairs into a trie.
+
+    Wildcard subtrees are grafted onto their sibling named members, so a
+    lookup never has to consult both; *merge* combines a value set on the
+    exact path with the one inherited from the wildcard (or with another
+    entry for the same path).
+
+    When *include* paths are given, any node that is neither on nor below one
+    of them receives the *pruned* value, including members and items that no
+    entry mentions.
+    """
+    root = PathNode()
+    for expr, value in entries:
+        node = root.insert(parse_path(expr))
+        node.value = value if node.value is None else merge(value, node.value)
+    selected = False
+    for expr in include:
+        _select(root, parse_path(expr))
+        selected = True
+    _propagate_wildcards(root, merge)
+    if selected:
+        _prune(root, pruned, merge)
+    return root
+
+
+def _select(root: PathNode, segments: Tuple[str, ...]) -> None:
+    node = root
+    for segment in segments:
+        if node.closed is None:
+            node.closed = True
+        node = node.insert((segment,))
+    node.closed = False
+
+
+def _prune(node: PathNode, pruned: Any, merge: Callable[[Any, Any], Any]) -> None:
+    if node.closed:
+        if node.any_key is None:
+            node.any_key = PathNode()
+        if node.items is None:
+            node.items = PathNode()
+        for child in (*node.keys.values(), node.any_key, node.items):
+            if child.closed is None:
+                child.value = pruned if child.value is None else merge(pruned, child.value)
+    for child in (*node.keys.values(), node.any_key, node.items):
+        if child is not None and child.closed is not None:
+            _prune(child, pruned, merge)
+
+
+def _propagate_wildcards(node: PathNode, merge: Callable[[Any, Any], Any]) -> None:
+    if node.any_key is not None:
+        for child in node.keys.values():
+            _graft(child, node.any_key, merge)
+    for child in node.keys.values():
+        _propagate_wildcards(child, merge)
+    for child in (node.any_key, node.items):
+        if child is not None:
+            _propagate_wildcards(child, merge)
+
+
+def _graft(target: PathNode, source: PathNode, merge: Callable[[Any, Any], Any]) -> None:
+    if target.closed is None:
+        target.closed = source.closed
+    if source.value is not None:
+        target.value = source.value if target.value is None else merge(target.value, source.value)
+    for key, child in source.keys.items():
+        _graft(target.keys.setdefault(key, PathNode()), child, merge)
+    if source.any_key is not None:
+        target.any_key = target.any_key or PathNode()
+        _graft(target.any_key, source.any_key, merge)
+    if source.items is not None:
+        target.items = target.items or PathNode()
+        _graft(target.items, source.items, merge)
@@ -0,0 +1,408 @@
+"""Pipelined conversion of record files: reading, parsing, building and writing overlap.
+
+A :class:`Pipeline` yields the records of a JSON array or NDJSON file (one
+JSON value per line) through stages running in threads of their own,
+connected by bounded queues:
+
+- ``read``: reads the file in blocks (NDJSON: in batches of lines);
+- ``parse``: decodes the records, with :attr:`Pipeline.parse_workers`
+  threads for NDJSON lines; the items of an array are decoded in order by
+  one thread, as only decoding an item tells where the next one starts;
+- ``build``: the thread iterating the pipeline, i.e.
+  :meth:`jrt.builder.GraphBuilder.write` converting the records one after
+  the other (records link to the labels of earlier ones);
+- ``write``: formats and writes each graph the builder flushes, every
+  :attr:`Pipeline.flush_every` records (see :meth:`Pipeline.writer`).
+
+Each stage counts the time it spends working rather than waiting on its
+neighbours (:attr:`Pipeline.stats`): the stage near 100% is the bottleneck.
+The threads share the interpreter lock, so the stages mostly gain by
+overlapping file I/O with computation; several parse workers only decode
+in parallel on interpreters running threads in parallel.
+"""
+
+from __future__ import annotations
+
+import io
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .paths import PathNode
+from .reader import READ_SIZE, RecordStream, _is_pruned, loads
+
+# Inputs read as NDJSON, one JSON value per line
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+# Batches (blocks, lines, records, graphs) queued between two stages
+QUEUE_SIZE = 16
+
+# Records per batch handed from one stage to the next
+BATCH_SIZE = 256
+
+# Records built between two graphs handed to the writer
+FLUSH_EVERY = 1000
+
+STAGES = ("read", "parse", "build", "write")
+
+# Seconds between two checks of the stop signal by a blocked stage
+_POLL = 0.1
+
+
+@dataclass
+class StageStats:
+    """What one stage of a pipeline did."""
+
+    workers: int = 1  # threads running the stage
+    items: int = 0  # blocks read, records parsed or built, graphs written
+    seconds: float = 0.0  # time spent working, summed over workers
+    elapsed: float = 0.0  # time the pipeline ran
+
+    @property
+    def utilization(self) -> float:
+        """The share of its workers' time the stage spent working, from 0 to 1."""
+        if not self.elapsed:
+            return 0.0
+        return min(self.seconds / (self.elapsed * self.workers), 1.0)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.items} items, {self.workers} workers, {self.seconds:.3f}s busy "
+            f"in {self.elapsed:.3f}s ({self.utilization:.0%})"
+        )
+
+
+class _Failure:
+    """An exception raised in a stage, passed downstream to the building thread."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Pipeline:
+    """The records of the JSON array or NDJSON file at *path*, read in stages.
+
+    *plan* prunes the records like :func:`jrt.reader.iter_records`. The file
+    is read as NDJSON when its suffix is one of :data:`NDJSON_SUFFIXES`,
+    unless *ndjson* says otherwise. Each iteration reads the file again.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        plan: Optional[PathNode] = None,
+        parse_workers: int = 1,
+        queue_size: int = QUEUE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        flush_every: int = FLUSH_EVERY,
+        ndjson: Optional[bool] = None,
+    ):
+        if parse_workers < 1 or queue_size < 1 or batch_size < 1 or flush_every < 1:
+            raise ValueError("Pipeline workers, queue, batch and flush sizes must be at least 1")
+        self.path = path
+        self.plan = plan
+        self.ndjson = path.suffix.lower() in NDJSON_SUFFIXES if ndjson is None else ndjson
+        # array items are only delimited by decoding them, in order
+        self.parse_workers = parse_workers if self.ndjson else 1
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_every = flush_every
+        self.stats: Dict[str, StageStats] = {name: StageStats() for name in STAGES}
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._waited = 0.0  # time the building thread spent blocked on the other stages
+
+    def __iter__(self) -> Iterator[Any]:
+        for name in STAGES[:3]:
+            self.stats[name] = StageStats()
+        self.stats["parse"].workers = self.parse_workers
+        self._stop.clear()
+        self._waited = 0.0
+        started = time.perf_counter()
+        records: "queue.Queue[Any]" = queue.Queue(self.queue_size)
+        if self.ndjson:
+            lines: "queue.Queue[Any]" = queue.Queue(self.queue_size)
+            self._start("read", self._read_lines, lines, records)
+            lock = threading.Lock()
+            for _ in range(self.parse_workers):
+                self._start("parse", self._parse_lines, lines, records, lock)
+            batches = self._in_order(records)
+        else:
+            blocks: "queue.Queue[Any]" = queue.Queue(self.queue_size)
+            self._start("read", self._read_blocks, blocks, records)
+            self._start("parse", self._parse_items, blocks, records)
+            batches = self._batches(records)
+        build = self.stats["build"]
+        try:
+            for batch in batches:
+                build.items += len(batch)
+                yield from batch
+        finally:
+            self._stop.set()
+            for thread in self._threads:
+                thread.join()
+            self._threads.clear()
+            elapsed = time.perf_counter() - started
+            for name in STAGES[:3]:
+                self.stats[name].elapsed = elapsed
+            build.seconds = max(elapsed - self._waited, 0.0)
+
+    def writer(self, sink: Any) -> PipelineWriter:
+        """A sink handing the graphs written to it to *sink* from the ``write`` stage's thread."""
+        self.stats["write"] = StageStats()
+        return PipelineWriter(sink, self)
+
+    # -------- stages --------------------------------------------------
+
+    def _start(self, name: str, target: Callable[..., None], *args: Any) -> None:
+        """Run *target* in a thread; stages take their input queue, then the records queue."""
+
+        def run() -> None:
+            try:
+                target(*args)
+            except BaseException as exc:  # re-raised by the building thread
+                self._put(args[1], _Failure(exc))
+
+        thread = threading.Thread(target=run, name=f"jrt-{name}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _read_lines(self, lines: queue.Queue, records: queue.Queue) -> None:
+        stats = self.stats["read"]
+        seq = 0
+        with self.path.open("rb") as f:
+            while True:
+                started = time.perf_counter()
+                block = f.readlines(READ_SIZE)
+                stats.seconds += time.perf_counter() - started
+                if not block:
+                    break
+                for i in range(0, len(block), self.batch_size):
+                    stats.items += 1
+                    if not self._put(lines, (seq, block[i : i + self.batch_size])):
+                        return
+                    seq += 1
+        for _ in range(self.parse_workers):
+            self._put(lines, None)
+
+    def _parse_lines(self, lines: queue.Queue, records: queue.Queue, lock: threading.Lock) -> None:
+        stats = self.stats["parse"]
+        items = self.plan.items if self.plan is not None else None
+        pruned = _is_pruned(items)
+        while True:
+            task = self._take(lines)
+            if task is None:
+                self._put(records, None)
+                return
+            seq, batch = task
+            started = time.perf_counter()
+            decoded = [loads(line.decode("utf-8"), items) for line in batch if line.strip()]
+            seconds = time.perf_counter() - started
+            with lock:
+                stats.seconds += seconds
+                stats.items += len(decoded)
+            if not self._put(records, (seq, [] if pruned else decoded)):
+                return
+
+    def _read_blocks(self, blocks: queue.Queue, records: queue.Queue) -> None:
+        stats = self.stats["read"]
+        with self.path.open("rb") as f:
+            while True:
+                started = time.perf_counter()
+                block = f.read(READ_SIZE)
+                stats.seconds += time.perf_counter() - started
+                if not block:
+                    break
+                stats.items += 1
+                if not self._put(blocks, block):
+                    return
+        self._put(blocks, None)
+
+    def _parse_items(self, blocks: queue.Queue, records: queue.Queue) -> None:
+        stats = self.stats["parse"]
+        source = _QueueReader(self, blocks)
+        stream = _QueuedRecordStream(self.path, self.plan, source)
+        batch: List[Any] = []
+        started = time.perf_counter()
+        for record in stream:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                stats.seconds += time.perf_counter() - started - source.waited
+                stats.items += len(batch)
+                if not self._put(records, batch):
+                    return
+                batch = []
+                source.waited = 0.0
+                started = time.perf_counter()
+        stats.seconds += time.perf_counter() - started - source.waited
+        stats.items += len(batch)
+        if batch and not self._put(records, batch):
+            return
+        self._put(records, None)
+
+    # -------- the building thread's side --------------------------------
+
+    def _batches(self, records: queue.Queue) -> Iterator[List[Any]]:
+        while True:
+            batch = self._get(records)
+            if batch is None:
+                return
+            yield batch
+
+    def _in_order(self, records: queue.Queue) -> Iterator[List[Any]]:
+        """The batches of the parse workers, put back in the order they were read."""
+        pending: Dict[int, List[Any]] = {}
+        expected = 0
+        running = self.parse_workers
+        while running:
+            task = self._get(records)
+            if task is None:
+                running -= 1
+                continue
+            pending[task[0]] = task[1]
+            while expected in pending:
+                yield pending.pop(expected)
+                expected += 1
+
+    def _get(self, source: queue.Queue) -> Any:
+        started = time.perf_counter()
+        item = source.get()
+        self._waited += time.perf_counter() - started
+        if isinstance(item, _Failure):
+            raise item.error
+        return item
+
+    # -------- queues shared with a stop signal --------------------------
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """Queue *item*, unless the pipeline stops first; True if queued."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _take(self, source: queue.Queue) -> Any:
+        """The next item of *source*; ``None`` once the pipeline stops."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=_POLL)
+            except queue.Empty:
+                pass
+        return None
+
+
+class _QueueReader(io.RawIOBase):
+    """A binary file reading the blocks queued by the ``read`` stage."""
+
+    def __init__(self, pipeline: Pipeline, blocks: queue.Queue):
+        self.pipeline = pipeline
+        self.blocks = blocks
+        self.waited = 0.0  # time spent waiting for blocks
+        self._block = memoryview(b"")
+        self._pos = 0
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        if self._pos >= len(self._block):
+            if self._eof:
+                return 0
+            started = time.perf_counter()
+            block = self.pipeline._take(self.blocks)
+            self.waited += time.perf_counter() - started
+            if block is None:
+                self._eof = True
+                return 0
+            self._block, self._pos = memoryview(block), 0
+        size = min(len(buffer), len(self._block) - self._pos)
+        buffer[:size] = self._block[self._pos : self._pos + size]
+        self._pos += size
+        return size
+
+
+class _QueuedRecordStream(RecordStream):
+    """A :class:`~jrt.reader.RecordStream` decoding the blocks of a :class:`_QueueReader`."""
+
+    def __init__(self, path: Path, plan: Optional[PathNode], source: _QueueReader):
+        super().__init__(path, plan)
+        self.source = source
+
+    def _open(self):
+        return io.TextIOWrapper(io.BufferedReader(self.source), encoding="utf-8")
+
+
+class PipelineWriter:
+    """A sink passing the graphs written to it to *sink*, from a thread of its own.
+
+    The graphs must not change once written: :meth:`GraphBuilder.write
+    <jrt.builder.GraphBuilder.write>` starts a new graph after each flush.
+    """
+
+    def __init__(self, sink: Any, pipeline: Pipeline):
+        self.sink = sink
+        self.pipeline = pipeline
+        self._queue: "queue.Queue[Any]" = queue.Queue(pipeline.queue_size)
+        self._error: Optional[BaseException] = None
+        self._started = time.perf_counter()
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._drain, name="jrt-write", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, graph: Any) -> None:
+        self._send(lambda: self.sink.write(graph))
+
+    def write_graph(self, graph: Any) -> None:
+        self._send(lambda: self.sink.write_graph(graph))
+
+    def close(self) -> None:
+        """Close *sink* once everything queued is written, and stop the thread."""
+        try:
+            self._send(self.sink.close)
+        finally:
+            self.stop()
+        self._raise()
+
+    def stop(self) -> None:
+        """Stop the thread once what is queued is written, without closing *sink*."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self.pipeline.stats["write"].elapsed = time.perf_counter() - self._started
+
+    def _send(self, task: Callable[[], None]) -> None:
+        self._raise()
+        started = time.perf_counter()
+        self._queue.put(task)
+        self.pipeline._waited += time.perf_counter() - started
+
+    def _drain(self) -> None:
+        stats = self.pipeline.stats["write"]
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            if self._error is not None:
+                continue
+            started = time.perf_counter()
+            try:
+                task()
+            except BaseException as exc:  # reported to the building thread on its next call
+                self._error = exc
+            stats.seconds += time.perf_counter() - started
+            stats.items += 1
+
+    def _raise(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -0,0 +1,115 @@
+"""Extract the part of large ontologies that a conversion actually uses.
+
+:class:`~jrt.ontology.OntologyResolver` indexes every term of the ontologies
+it is given, and :meth:`~jrt.builder.GraphBuilder.build` merges them whole
+into the output. :func:`prune_ontology` keeps only the terms that JSON keys
+and type values resolve to, plus what their resolution depends on:
+
+- every term sharing one of those labels or local names, so that a label
+  still resolves to the same term;
+- the description of each kept term, following blank nodes (restrictions,
+  lists);
+- the classes and properties reached from kept terms through
+  ``rdfs:subClassOf``, ``rdfs:subPropertyOf``, ``rdfs:domain`` and
+  ``rdfs:range``, transitively;
+- the ontology headers.
+
+Keys and type values not seen in the samples resolve to nothing in the
+pruned ontology. Fuzzy key matching (``normalize_keys``,
+``match_threshold``) may also pick other terms.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Mapping, Set, Tuple
+
+from rdflib import BNode, Graph, URIRef
+from rdflib.namespace import OWL, RDF, RDFS
+
+from .constants import COMMENT_KEYS, LABEL_KEYS, TYPE_KEYS
+from .ontology import OntologyResolver, _is_datatype
+
+# Links from a kept term to the terms its meaning depends on
+CLOSURE_PREDICATES = (RDFS.subClassOf, RDFS.subPropertyOf, RDFS.domain, RDFS.range)
+
+# Keys the builder maps to fixed predicates, never looked up in ontologies
+_FIXED_KEYS = LABEL_KEYS | COMMENT_KEYS | TYPE_KEYS
+
+
+def used_terms(data: Any) -> Tuple[Set[str], Set[str]]:
+    """The keys resolved as properties and the type values resolved as classes in *data*."""
+    keys: Set[str] = set()
+    types: Set[str] = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Mapping):
+            for key, value in node.items():
+                lkey = key.lower()
+                if lkey in TYPE_KEYS and isinstance(value, str):
+                    types.add(value)
+                elif lkey not in _FIXED_KEYS:
+                    keys.add(key)
+                if isinstance(value, (Mapping, list)):
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return keys, types
+
+
+def prune_ontology(
+    graphs: Iterable[Graph],
+    keys: Iterable[str] = (),
+    types: Iterable[str] = (),
+    hierarchy: bool = False,
+) -> Graph:
+    """Return the part of *graphs* that *keys* (properties) and *types* (classes) use.
+
+    With *hierarchy*, the kind of each kept property inferred from the whole
+    ontologies (object or datatype property) is also stated explicitly, as
+    the pruned part may lack the sub-properties it was inferred from.
+    """
+    graphs = list(graphs)
+    resolver = OntologyResolver(graphs, hierarchy=hierarchy)
+
+    kept: Set[URIRef] = set()
+    for label in [*keys, *types]:
+        kept.update(resolver._label_to_uri.get(label.lower(), ()))
+    pending = list(kept)
+    while pending:
+        term = pending.pop()
+        for g in graphs:
+            for predicate in CLOSURE_PREDICATES:
+                for target in g.objects(term, predicate):
+                    if isinstance(target, URIRef) and not _is_datatype(target):
+                        if target not in kept:
+                            kept.add(target)
+                            pending.append(target)
+
+    pruned = Graph()
+    for g in graphs:
+        for prefix, namespace in g.namespaces():
+            pruned.bind(prefix, namespace, override=False)
+        headers = [s for s in g.subjects(RDF.type, OWL.Ontology)]
+        for subject in [*headers, *kept]:
+            _describe(g, subject, pruned)
+    if hierarchy:
+        for term in kept:
+            if resolver.is_object_property(term):
+                pruned.add((term, RDF.type, OWL.ObjectProperty))
+            elif resolver.is_datatype_property(term):
+                pruned.add((term, RDF.type, OWL.DatatypeProperty))
+    return pruned
+
+
+def _describe(g: Graph, subject: Any, target: Graph) -> None:
+    """Copy the triples of *subject* in *g* to *target*, with the blank nodes they reach."""
+    pending: List[Any] = [subject]
+    seen = {subject}
+    while pending:
+        node = pending.pop()
+        for p, o in g.predicate_objects(node):
+            target.add((node, p, o))
+            if isinstance(o, BNode) and o not in seen:
+                seen.add(o)
+                pending.append(o)
@@ -0,0 +1,280 @@
+"""Plan-aware JSON loading that keeps only the subtrees a conversion will use.
+
+:func:`load_json` walks the document alongside a compiled mapping trie (see
+:meth:`jrt.mapping.MappingSpec.compile`). Subtrees without any rule below them
+are handed to the C decoder in one call; pruned subtrees (``skip`` rules,
+include/exclude filters) are decoded and dropped straight away, so they are
+never part of the loaded document and never reach the builder.
+
+Identity keys (see :mod:`jrt.constants`) of pruned members are kept: the
+builder needs them to mint stable subject URIs and to index labels, exactly
+as it would when filtering an unpruned document.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import re
+from json.decoder import JSONDecodeError, scanstring
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+from .constants import ID_KEYS, LABEL_KEYS
+from .paths import PathNode
+
+# Characters read from the file whenever the buffered text runs out
+READ_SIZE = 1 << 20
+
+# Bytes hashed at each end of a file by fingerprint()
+FINGERPRINT_BLOCK = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WS_RE = re.compile(r"[ \t\n\r]*")
+_IDENTITY_KEYS = ID_KEYS | LABEL_KEYS
+
+
+def load_json(path: Path, plan: Optional[PathNode] = None) -> Any:
+    """Load the JSON document at *path*, dropping subtrees pruned by *plan*."""
+    return loads(path.read_text(encoding="utf-8"), plan)
+
+
+def loads(text: str, plan: Optional[PathNode] = None) -> Any:
+    """Decode *text*, dropping subtrees pruned by *plan*."""
+    if plan is None:
+        return json.loads(text)
+    try:
+        value, end = _decode(text, _skip_ws(text, 0), plan)
+    except IndexError:
+        raise JSONDecodeError("Unexpected end of document", text, len(text)) from None
+    end = _skip_ws(text, end)
+    if end != len(text):
+        raise JSONDecodeError("Extra data", text, end)
+    return value
+
+
+def iter_records(path: Path, plan: Optional[PathNode] = None) -> Iterator[Any]:
+    """Yield the items of the top-level JSON array at *path* one at a time.
+
+    The file is read in blocks only as the consumer asks for items, so memory
+    holds one item (plus a read block) rather than the whole document, and a
+    consumer that stops to flush its output holds back the reading too. A
+    document that is not an array is yielded whole, as a single record.
+    """
+    return iter(RecordStream(path, plan))
+
+
+class RecordStream:
+    """The items of the top-level JSON array at *path*, read like :func:`iter_records`.
+
+    Each iteration reads the file again, from byte offset *start*, which must
+    be the end of an item (a previous stream's :attr:`offset`).
+    """
+
+    def __init__(self, path: Path, plan: Optional[PathNode] = None, start: int = 0):
+        self.path = path
+        self.plan = plan
+        self.start = start
+        # the last item yielded ends at character _end of _text, which starts
+        # at byte _base of the file
+        self._text = ""
+        self._end = 0
+        self._base = start
+
+    @property
+    def offset(self) -> int:
+        """Byte offset in the file of the end of the last item yielded."""
+        return self._base + self._byte_length(self._text[: self._end])
+
+    def __iter__(self) -> Iterator[Any]:
+        items = self.plan.items if self.plan is not None else None
+        with self._open() as f:
+            base = self.start  # byte offset of text[0]
+            text, pos, eof = _refill(f, "", 0)
+            while pos >= len(text) and not eof:
+                base += self._byte_length(text[:pos])
+                text, pos, eof = _refill(f, text, pos)
+            after_item = self.start > 0
+            if not after_item:
+                if not text.startswith("[", pos):
+                    yield loads(text + f.read(), self.plan)
+                    return
+                pos = _skip_ws(text, pos + 1)
+            can_close = True  # false right after a comma
+            while True:
+                # make sure the next delimiter is in the buffer
+                while pos >= len(text) and not eof:
+                    base += self._byte_length(text[:pos])
+                    text, pos, eof = _refill(f, text, pos)
+                if after_item:
+                    after_item = False
+                    if pos < len(text) and text[pos] == ",":
+                        pos = _skip_ws(text, pos + 1)
+                        can_close = False
+                        continue
+                    if pos >= len(text) or text[pos] != "]":
+                        raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+                    can_close = True
+                if pos >= len(text):
+                    raise JSONDecodeError("Unexpected end of document", text, pos)
+                if text[pos] == "]":
+                    if not can_close:
+                        raise JSONDecodeError("Expecting value", text, pos)
+                    trailing = text[pos + 1 :] + f.read()
+                    if trailing.strip():
+                        raise JSONDecodeError(
+                            "Extra data", trailing, len(trailing) - len(trailing.lstrip())
+                        )
+                    return
+
+                while True:
+                    try:
+                        item, end = _decode(text, pos, items)
+                        # the item is complete once its delimiter is in the buffer: a
+                        # number cut by the block boundary ("2." of "2.5") decodes fine
+                        after = _skip_ws(text, end)
+                        if eof or (after < len(text) and text[after] in ",]"):
+                            break
+                    except (IndexError, JSONDecodeError):
+                        if eof:
+                            raise JSONDecodeError("Unexpected end of document", text, len(text))
+                    base += self._byte_length(text[:pos])
+                    text, pos, eof = _refill(f, text, pos)
+                if not _is_pruned(items):
+                    self._text, self._end, self._base = text, end, base
+                    yield item
+                pos = after
+                after_item = True
+
+    def _open(self):
+        # newline="": "\r\n" left untranslated, so positions map back to bytes
+        if not self.start:
+            return self.path.open(encoding="utf-8", newline="")
+        f = self.path.open("rb")
+        f.seek(self.start)
+        return io.TextIOWrapper(f, encoding="utf-8", newline="")
+
+    def _byte_length(self, text: str) -> int:
+        """The size in the file of *text*, read from it."""
+        return len(text.encode("utf-8"))
+
+
+def fingerprint(path: Path) -> str:
+    """A cheap content identity of the file at *path*: a hash of its first and last blocks.
+
+    It changes when a file is replaced or edited near either end, not when it
+    is copied, unlike its modification time. Compare sizes as well.
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        digest.update(f.read(FINGERPRINT_BLOCK))
+        size = f.seek(0, io.SEEK_END)
+        f.seek(max(FINGERPRINT_BLOCK, size - FINGERPRINT_BLOCK))
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def hash_range(digest, path: Path, start: int, stop: int) -> None:
+    """Feed bytes *start* to *stop* (excluded) of the file at *path* to the hashlib *digest*."""
+    with path.open("rb") as f:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            block = f.read(min(READ_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+
+
+def is_array_document(path: Path) -> bool:
+    """True if the JSON document at *path* is an array (judged by its first character)."""
+    with path.open(encoding="utf-8") as f:
+        while True:
+            block = f.read(4096)
+            if not block:
+                return False
+            stripped = block.lstrip(" \t\n\r")
+            if stripped:
+                return stripped.startswith("[")
+
+
+def _refill(f, text: str, pos: int) -> Tuple[str, int, bool]:
+    """Drop consumed text and append the next block; return (text, pos, eof).
+
+    *pos* must be at a value or delimiter, so leading whitespace is skipped.
+    """
+    block = f.read(max(READ_SIZE, len(text) - pos))
+    text = text[pos:] + block
+    return text, _skip_ws(text, 0), not block
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    return _WS_RE.match(text, pos).end()
+
+
+def _is_pruned(plan: Optional[PathNode]) -> bool:
+    return plan is not None and plan.value is not None and plan.value.skip
+
+
+def _decode(text: str, pos: int, plan: Optional[PathNode]) -> Tuple[Any, int]:
+    if plan is None or not (plan.keys or plan.any_key or plan.items):
+        return _decoder.raw_decode(text, pos)
+    char = text[pos]
+    if char == "{":
+        return _decode_object(text, pos + 1, plan)
+    if char == "[":
+        return _decode_array(text, pos + 1, plan.items)
+    return _decoder.raw_decode(text, pos)
+
+
+def _decode_object(text: str, pos: int, plan: PathNode) -> Tuple[dict, int]:
+    obj: dict = {}
+    pos = _skip_ws(text, pos)
+    if text[pos] == "}":
+        return obj, pos + 1
+    while True:
+        if text[pos] != '"':
+            raise JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+        key, pos = scanstring(text, pos + 1)
+        pos = _skip_ws(text, pos)
+        if text[pos] != ":":
+            raise JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = _skip_ws(text, pos + 1)
+
+        child = plan.child(key)
+        if _is_pruned(child) and key.lower() not in _IDENTITY_KEYS:
+            _, pos = _decoder.raw_decode(text, pos)
+        else:
+            obj[key], pos = _decode(text, pos, child)
+
+        pos = _skip_ws(text, pos)
+        char = text[pos]
+        if char == "}":
+            return obj, pos + 1
+        if char != ",":
+            raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _skip_ws(text, pos + 1)
+
+
+def _decode_array(text: str, pos: int, plan: Optional[PathNode]) -> Tuple[list, int]:
+    items: list = []
+    pruned = _is_pruned(plan)
+    pos = _skip_ws(text, pos)
+    if text[pos] == "]":
+        return items, pos + 1
+    while True:
+        if pruned:
+            _, pos = _decoder.raw_decode(text, pos)
+        else:
+            item, pos = _decode(text, pos, plan)
+            items.append(item)
+
+        pos = _skip_ws(text, pos)
+        char = text[pos]
+        if char == "]":
+            return items, pos + 1
+        if char != ",":
+            raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _skip_ws(text, pos + 1)
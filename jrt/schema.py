@@ -0,0 +1,102 @@
+"""Schema inference over a sample of the input.
+
+Much of what converting a JSON object costs depends only on its keys: which
+one holds the id, which the label and type, the predicate and rule of every
+key. :func:`infer_schema` walks a sample of the input and records each
+object *shape* (the keys of an object, in order) with the kinds of value
+seen under every key. :class:`~jrt.builder.GraphBuilder` (``schema=`` or
+``infer_schema=True``) compiles each shape once into a conversion plan and
+uses it for every object with exactly those keys; objects of any other shape
+take the generic path.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from .constants import ID_KEYS, LABEL_KEYS, TYPE_KEYS
+
+# Items of each JSON array walked by default
+SAMPLE_SIZE = 100
+
+# Shapes kept at most, for inputs whose objects are keyed by data (e.g. ids)
+MAX_SHAPES = 1024
+
+
+def value_kind(value: Any) -> str:
+    """The JSON kind of *value*: object, array, string, number, boolean or null."""
+    if isinstance(value, Mapping):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, bool):
+        return "boolean"
+    if value is None:
+        return "null"
+    return "number"
+
+
+@dataclass
+class ObjectShape:
+    """Objects with the same keys, in the same order."""
+
+    keys: Tuple[str, ...]
+    count: int = 0  # objects of this shape in the sample
+    kinds: Dict[str, Set[str]] = field(default_factory=dict)  # key -> value kinds seen
+
+    @property
+    def id_key(self) -> Optional[str]:
+        """The key the resource URI is derived from, if any."""
+        return next((k for k in self.keys if k.lower() in ID_KEYS), None)
+
+    @property
+    def label_keys(self) -> List[str]:
+        """Keys a label may be taken from, first match first."""
+        return [k for k in self.keys if k.lower() in LABEL_KEYS]
+
+    @property
+    def type_key(self) -> Optional[str]:
+        return next((k for k in self.keys if k.lower() in TYPE_KEYS), None)
+
+
+@dataclass
+class Schema:
+    """The object shapes found in a sample of JSON data."""
+
+    shapes: Dict[Tuple[str, ...], ObjectShape] = field(default_factory=dict)
+
+    def add(self, data: Any, sample: int = SAMPLE_SIZE) -> None:
+        """Record the shapes of *data*, walking the first *sample* items of each array."""
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node[:sample]))
+            elif isinstance(node, Mapping):
+                keys = tuple(node)
+                shape = self.shapes.get(keys)
+                if shape is None:
+                    if len(self.shapes) >= MAX_SHAPES:
+                        continue
+                    shape = self.shapes[keys] = ObjectShape(keys)
+                shape.count += 1
+                for key, value in node.items():
+                    shape.kinds.setdefault(key, set()).add(value_kind(value))
+                    if isinstance(value, (Mapping, list)):
+                        stack.append(value)
+
+    def __contains__(self, keys: Tuple[str, ...]) -> bool:
+        return keys in self.shapes
+
+    def __len__(self) -> int:
+        return len(self.shapes)
+
+
+def infer_schema(data: Any, sample: int = SAMPLE_SIZE) -> Schema:
+    """Infer the schema of *data* from the first *sample* items of each of its arrays."""
+    schema = Schema()
+    schema.add(data, sample)
+    return schema
@@ -0,0 +1,435 @@
+"""Long-running conversion server behind ``jrt serve``.
+
+Loading ontologies and importing rdflib dominate the run time of a single
+``jrt convert`` on a small document. :class:`ConversionService` does both
+once; the server then answers every request with the warm resolver::
+
+    POST /convert?format=ttl   JSON body -> RDF body
+    GET  /metrics              Prometheus text: latency histogram, throughput
+    GET  /health               "ok"
+
+It speaks HTTP/1.1 on a TCP port or a Unix socket, using only the standard
+library. Request bodies may be sent with ``Transfer-Encoding: chunked`` and
+responses are always streamed back chunked, so neither side needs to know
+the size up front. Request bodies are still read whole, up to ``max_body``
+bytes, before they are parsed: invalid JSON is answered with a 400 instead of
+a cut response, and each worker may hold one body. Connections are served by
+a fixed pool of worker threads.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import socket
+import socketserver
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import IO, Any, List, Optional, Sequence, Set, Union
+from urllib.parse import parse_qs, urlsplit
+
+from rdflib import Namespace, URIRef
+
+from .builder import GraphBuilder
+from .mapping import MappingSpec
+from .ontology import Ontology, OntologyResolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+
+# Output formats accepted by ``?format=`` and their media types; an Accept
+# header naming one of these media types works too
+MEDIA_TYPES = {
+    "xml": "application/rdf+xml",
+    "ttl": "text/turtle",
+    "nt": "application/n-triples",
+    "json-ld": "application/ld+json",
+}
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Size of the chunks a streamed response is written in
+CHUNK_SIZE = 64 * 1024
+
+# Largest request body accepted, in bytes; larger ones are answered 413. Bodies
+# are buffered whole, so the server may hold this much per worker thread
+MAX_BODY = 64 * 1024 * 1024
+
+_CONTENT_LENGTH_RE = re.compile(r"[0-9]+\Z")
+_CHUNK_SIZE_RE = re.compile(rb"[0-9A-Fa-f]+\Z")
+# Longest chunk-size or trailer line read, as http.server bounds header lines
+_MAX_LINE = 65536
+
+
+class _BodyError(Exception):
+    """A request body that cannot be read: answered with *status* and the message."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ConversionService:
+    """Converts JSON documents with ontologies and resolver loaded once, up front."""
+
+    def __init__(
+        self,
+        ontologies: Optional[List[Ontology]] = None,
+        resolver: Optional[OntologyResolver] = None,
+        base_uri: Union[str, URIRef, Namespace] = "http://example.org/resource/",
+        detect_datatypes: bool = True,
+        hierarchy: bool = False,
+        mapping: Optional[MappingSpec] = None,
+    ):
+        self.ontologies = ontologies or []
+        if resolver is None:
+            resolver = OntologyResolver([o.graph for o in self.ontologies], hierarchy=hierarchy)
+        self.resolver = resolver
+        self.base_uri = base_uri
+        self.detect_datatypes = detect_datatypes
+        self.mapping = mapping
+
+    def convert(self, data: Any, fmt: str, destination: IO[bytes]) -> None:
+        """Convert *data* and serialize the graph in *fmt* to *destination*."""
+        builder = GraphBuilder(
+            data=data,
+            ontologies=self.ontologies,
+            base_uri=self.base_uri,
+            detect_datatypes=self.detect_datatypes,
+            mapping=self.mapping,
+            resolver=self.resolver,
+        )
+        if fmt in ("nt", "json-ld"):
+            builder.write(destination, format=fmt)
+        else:
+            builder.build().serialize(destination=destination, format=fmt, encoding="utf-8")
+
+
+class Metrics:
+    """Thread-safe request counters, rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._bucket_counts = [0] * len(self.buckets)
+        self._latency_sum = 0.0
+        self._responses: Counter = Counter()
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._in_flight = 0
+
+    def started_request(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def observe(self, status: int, seconds: float, bytes_in: int, bytes_out: int) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._responses[status] += 1
+            self._latency_sum += seconds
+            self._bytes_in += bytes_in
+            self._bytes_out += bytes_out
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self._bucket_counts[i] += 1
+                    break
+
+    def render(self) -> str:
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            total = sum(self._responses.values())
+            lines = [
+                "# TYPE jrt_requests_total counter",
+                *(
+                    f'jrt_requests_total{{status="{status}"}} {count}'
+                    for status, count in sorted(self._responses.items())
+                ),
+                "# TYPE jrt_request_duration_seconds histogram",
+            ]
+            cumulative = 0
+            for bound, count in zip(self.buckets, self._bucket_counts):
+                cumulative += count
+                lines.append(f'jrt_request_duration_seconds_bucket{{le="{bound}"}} {cumulative}')
+            lines += [
+                f'jrt_request_duration_seconds_bucket{{le="+Inf"}} {total}',
+                f"jrt_request_duration_seconds_sum {self._latency_sum:.6f}",
+                f"jrt_request_duration_seconds_count {total}",
+                "# TYPE jrt_request_bytes_total counter",
+                f"jrt_request_bytes_total {self._bytes_in}",
+                "# TYPE jrt_response_bytes_total counter",
+                f"jrt_response_bytes_total {self._bytes_out}",
+                "# TYPE jrt_requests_in_flight gauge",
+                f"jrt_requests_in_flight {self._in_flight}",
+                "# TYPE jrt_uptime_seconds gauge",
+                f"jrt_uptime_seconds {uptime:.3f}",
+                "# TYPE jrt_throughput_requests_per_second gauge",
+                f"jrt_throughput_requests_per_second {total / uptime if uptime else 0.0:.3f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class _ChunkedWriter:
+    """Binary file-like object writing HTTP/1.1 chunks of at least ``CHUNK_SIZE`` bytes."""
+
+    def __init__(self, wfile: IO[bytes]):
+        self._wfile = wfile
+        self._buffer = bytearray()
+        self.written = 0
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        if len(self._buffer) >= CHUNK_SIZE:
+            self._flush_chunk()
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._flush_chunk()
+        self._wfile.write(b"0\r\n\r\n")
+        self._wfile.flush()
+
+    def _flush_chunk(self) -> None:
+        if self._buffer:
+            self._wfile.write(b"%x\r\n%s\r\n" % (len(self._buffer), self._buffer))
+            self.written += len(self._buffer)
+            self._buffer.clear()
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler for the conversion, metrics and health endpoints."""
+
+    protocol_version = "HTTP/1.1"
+    # drop idle keep-alive connections so they do not pin a worker forever
+    timeout = 30
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send_text(200, "ok\n")
+        elif path == "/metrics":
+            self._send_text(200, self.server.metrics.render(), "text/plain; version=0.0.4")
+        else:
+            self._send_text(404, f"Unknown endpoint {path}\n")
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self.close_connection = True  # the unread body would garble the next request
+            self._send_text(404, f"Unknown endpoint {url.path}\n")
+            return
+
+        metrics = self.server.metrics
+        metrics.started_request()
+        start = time.perf_counter()
+        status, bytes_in, bytes_out = 500, 0, 0
+        try:
+            # the body is always consumed first so the connection can be reused
+            try:
+                body = self._read_body()
+            except _BodyError as exc:
+                status = exc.status
+                self.close_connection = True  # the rest of the body is left unread
+                self._send_text(status, f"{exc}\n")
+                return
+            if body is None:
+                status = 411
+                self.close_connection = True
+                self._send_text(status, "Content-Length or chunked transfer encoding required\n")
+                return
+            bytes_in = len(body)
+            fmt = self._output_format(parse_qs(url.query).get("format", [None])[0])
+            if fmt is None:
+                status = 406
+                self._send_text(status, f"Unsupported format; use one of {sorted(MEDIA_TYPES)}\n")
+                return
+            try:
+                data = json.loads(body)
+            except (ValueError, UnicodeDecodeError) as exc:
+                status = 400
+                self._send_text(status, f"Invalid JSON: {exc}\n")
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", f"{MEDIA_TYPES[fmt]}; charset=utf-8")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            writer = _ChunkedWriter(self.wfile)
+            try:
+                self.server.service.convert(data, fmt, writer)
+            except Exception:
+                # headers are already out: all that is left is to cut the stream
+                logger.exception("Conversion failed")
+                self.close_connection = True
+                return
+            writer.close()
+            status, bytes_out = 200, writer.written
+        finally:
+            metrics.observe(status, time.perf_counter() - start, bytes_in, bytes_out)
+
+    def _output_format(self, requested: Optional[str]) -> Optional[str]:
+        if requested is not None:
+            return requested if requested in MEDIA_TYPES else None
+        accept = self.headers.get("Accept", "")
+        for media_range in accept.split(","):
+            media_type = media_range.split(";")[0].strip()
+            for fmt, known in MEDIA_TYPES.items():
+                if media_type == known:
+                    return fmt
+        return self.server.default_format
+
+    def _read_body(self) -> Optional[bytes]:
+        limit = self.server.max_body
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            parts, total = [], 0
+            while True:
+                line = self.rfile.readline(_MAX_LINE).split(b";")[0].strip()
+                if not _CHUNK_SIZE_RE.match(line):
+                    raise _BodyError(400, f"Invalid chunk size {line[:40]!r}")
+                size = int(line, 16)
+                if size == 0:
+                    # skip trailer headers up to the blank line
+                    while self.rfile.readline(_MAX_LINE) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(parts)
+                total += size
+                if total > limit:
+                    raise _BodyError(413, f"Request body larger than {limit} bytes")
+                parts.append(self.rfile.read(size))
+                self.rfile.readline(_MAX_LINE)
+        length = self.headers.get("Content-Length")
+        if length is None:
+            return None
+        if not _CONTENT_LENGTH_RE.match(length.strip()):
+            raise _BodyError(400, f"Invalid Content-Length {length[:40]!r}")
+        if int(length) > limit:
+            raise _BodyError(413, f"Request body larger than {limit} bytes")
+        return self.rfile.read(int(length))
+
+    def _send_text(self, status: int, text: str, content_type: str = "text/plain") -> None:
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class _PooledMixIn(socketserver.ThreadingMixIn):
+    """Serve connections on a fixed-size thread pool instead of a thread each."""
+
+    workers = DEFAULT_WORKERS
+
+    def process_request(self, request, client_address) -> None:
+        if not hasattr(self, "_pool"):
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="jrt-worker")
+            self._connections: Set[socket.socket] = set()
+        self._connections.add(request)
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+    def shutdown_request(self, request) -> None:
+        self._connections.discard(request)
+        super().shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if hasattr(self, "_pool"):
+            # wake workers blocked on idle keep-alive connections
+            for request in list(self._connections):
+                try:
+                    request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self._pool.shutdown(wait=True)
+
+
+class ConversionServer(_PooledMixIn, HTTPServer):
+    """Conversion server listening on a TCP address."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple,
+        service: ConversionService,
+        workers: int = DEFAULT_WORKERS,
+        default_format: str = "ttl",
+        max_body: int = MAX_BODY,
+    ):
+        self.service = service
+        self.metrics = Metrics()
+        self.workers = workers
+        self.default_format = default_format
+        self.max_body = max_body
+        super().__init__(address, ConversionHandler)
+
+
+class UnixConversionServer(_PooledMixIn, socketserver.UnixStreamServer):
+    """Conversion server listening on a Unix domain socket."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: Path,
+        service: ConversionService,
+        workers: int = DEFAULT_WORKERS,
+        default_format: str = "ttl",
+        max_body: int = MAX_BODY,
+    ):
+        self.service = service
+        self.metrics = Metrics()
+        self.workers = workers
+        self.default_format = default_format
+        self.max_body = max_body
+        self.socket_path = Path(path)
+        if self.socket_path.is_socket():
+            # left over by a previous server that did not shut down cleanly
+            self.socket_path.unlink()
+        super().__init__(str(self.socket_path), ConversionHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.socket_path.is_socket():
+            os.unlink(self.socket_path)
+
+
+def make_server(
+    service: ConversionService,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    socket_path: Optional[Path] = None,
+    workers: int = DEFAULT_WORKERS,
+    default_format: str = "ttl",
+    max_body: int = MAX_BODY,
+) -> Union[ConversionServer, UnixConversionServer]:
+    """Bind a server for *service* on a Unix socket if *socket_path* is given, else TCP.
+
+    Request bodies larger than *max_body* bytes are refused with 413.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if default_format not in MEDIA_TYPES:
+        raise ValueError(f"Unsupported default format {default_format!r}")
+    if max_body < 0:
+        raise ValueError(f"max_body must not be negative, got {max_body}")
+    if socket_path is not None:
+        return UnixConversionServer(socket_path, service, workers, default_format, max_body)
+    return ConversionServer((host, port), service, workers, default_format, max_body)
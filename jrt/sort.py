@@ -0,0 +1,119 @@
+"""External merge sort and deduplication of N-Triples / N-Quads output.
+
+An in-memory rdflib graph collapses duplicate triples for free, but its
+serialization order is arbitrary. :func:`sort_lines` produces canonical
+output -- one statement per line, in code point order (identical to the
+UTF-8 byte order used by ``LC_ALL=C sort``) -- for inputs of any size: lines
+are buffered up to a memory budget, each full buffer is sorted and spilled to
+a temporary file, and the runs are then merged lazily.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional
+
+DEFAULT_MAX_MEMORY = 64 * 1024 * 1024
+
+# Approximate per-line cost of a buffered ``str`` on top of its characters:
+# the object header plus its slot in the buffer list
+_LINE_OVERHEAD = sys.getsizeof("") + 8
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+def parse_size(value: str) -> int:
+    """Parse a human-readable byte size such as ``512M`` or ``2GiB``."""
+    match = _SIZE_RE.match(value)
+    if match is None:
+        raise ValueError(f"Invalid size: {value!r}")
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.lower()])
+
+
+def sort_lines(
+    lines: Iterable[str],
+    output: IO[str],
+    dedupe: bool = False,
+    max_memory: int = DEFAULT_MAX_MEMORY,
+    tmp_dir: Optional[Path] = None,
+) -> int:
+    """Write the statements of *lines* to *output* in sorted order.
+
+    Blank lines and ``#`` comments are dropped. With *dedupe*, repeated
+    statements are written once. Returns the number of lines written.
+    """
+    runs: List[IO[str]] = []
+    buffer: List[str] = []
+    used = 0
+    try:
+        for line in lines:
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            if not line.endswith("\n"):
+                line += "\n"
+            buffer.append(line)
+            used += len(line) + _LINE_OVERHEAD
+            if used >= max_memory:
+                runs.append(_spill(buffer, dedupe, tmp_dir))
+                buffer, used = [], 0
+
+        buffer.sort()
+        if not runs:
+            return _write(iter(buffer), output, dedupe)
+        return _write(heapq.merge(buffer, *runs), output, dedupe)
+    finally:
+        for run in runs:
+            run.close()
+
+
+def sort_ntriples(
+    source: Path,
+    destination: Path,
+    dedupe: bool = False,
+    max_memory: int = DEFAULT_MAX_MEMORY,
+    tmp_dir: Optional[Path] = None,
+) -> int:
+    """Sort (and optionally deduplicate) an N-Triples file; *destination* may equal *source*."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=destination.parent, prefix=f".{destination.name}.", suffix=".tmp"
+    )
+    try:
+        with (
+            source.open(encoding="utf-8") as src,
+            os.fdopen(fd, "w", encoding="utf-8", newline="\n") as dst,
+        ):
+            count = sort_lines(src, dst, dedupe=dedupe, max_memory=max_memory, tmp_dir=tmp_dir)
+        os.replace(tmp_name, destination)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return count
+
+
+def _spill(buffer: List[str], dedupe: bool, tmp_dir: Optional[Path]) -> IO[str]:
+    """Sort *buffer* into an anonymous temporary file, rewound for reading."""
+    buffer.sort()
+    run = tempfile.TemporaryFile("w+", encoding="utf-8", newline="\n", dir=tmp_dir)
+    _write(iter(buffer), run, dedupe)
+    run.seek(0)
+    return run
+
+
+def _write(lines: Iterator[str], output: IO[str], dedupe: bool) -> int:
+    count = 0
+    previous = None
+    for line in lines:
+        if dedupe and line == previous:
+            continue
+        output.write(line)
+        previous = line
+        count += 1
+    return count
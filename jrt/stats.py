@@ -0,0 +1,122 @@
+"""Aggregates of a conversion's output, computed while converting.
+
+:meth:`jrt.builder.GraphBuilder.write_stats` converts like
+:meth:`~jrt.builder.GraphBuilder.write`, but flushes the triples to a
+:class:`StatsSink` instead of a serializer. The sink counts them and drops
+them, so the memory held is the counters, plus one flush's triples. That
+makes it cheap to check an output before publishing it, without writing and
+parsing it again.
+
+Triples repeated across flushes (for example, those of a resource shared by
+several records) are counted again, as :meth:`~jrt.builder.GraphBuilder.write`
+writes them again.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable
+
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF, XSD
+
+from .ntriples import _graph_triples
+
+# Top-level records converted between two flushes to the sink
+FLUSH_EVERY = 1000
+
+# Entries of each table printed by str()
+TOP = 20
+
+
+@dataclass
+class OutputStats:
+    """What a conversion produced."""
+
+    base_uri: str = ""
+    triples: int = 0
+    predicates: Counter = field(default_factory=Counter)  # triples per predicate
+    classes: Counter = field(default_factory=Counter)  # rdf:type triples per class
+    # literals per datatype: plain ones count as xsd:string, tagged ones as rdf:langString
+    datatypes: Counter = field(default_factory=Counter)
+    untyped: int = 0  # literals with neither datatype nor language
+    ill_typed: int = 0  # literals whose lexical form does not fit their datatype
+    link_hits: int = 0  # values linked to a resource labelled with them
+    link_misses: int = 0  # values that got a new resource for their label
+
+    @property
+    def unresolved(self) -> Dict[str, int]:
+        """Triples per key that resolved to no term and fell back to a base-URI predicate."""
+        base = self.base_uri
+        return {
+            predicate[len(base) :]: count
+            for predicate, count in self.predicates.items()
+            if base and predicate.startswith(base)
+        }
+
+    @property
+    def link_hit_rate(self) -> float:
+        """The share of object-property values linked to an existing resource."""
+        total = self.link_hits + self.link_misses
+        return self.link_hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.triples} triples, {sum(self.datatypes.values())} literals "
+            f"({self.untyped} untyped, {self.ill_typed} ill-typed)",
+            f"{self.link_hits + self.link_misses} values of object properties, "
+            f"{self.link_hit_rate:.0%} linked to existing resources",
+        ]
+        tables = (
+            ("Predicates", self.predicates),
+            ("Classes", self.classes),
+            ("Datatypes", self.datatypes),
+            ("Unresolved keys", Counter(self.unresolved)),
+        )
+        for title, counts in tables:
+            lines.append(f"{title} ({len(counts)}):")
+            lines.extend(f"  {count:>10}  {term}" for term, count in counts.most_common(TOP))
+            if len(counts) > TOP:
+                lines.append(f"  ... {len(counts) - TOP} more")
+        return "\n".join(lines)
+
+
+class StatsSink:
+    """Count the triples flushed to it into :attr:`stats`, and drop them."""
+
+    def __init__(self, base_uri: str = ""):
+        self.stats = OutputStats(base_uri=base_uri)
+
+    def write(self, triples: Iterable) -> None:
+        """Count *triples* (a graph or an iterable)."""
+        if isinstance(triples, Graph):
+            triples = _graph_triples(triples)
+        stats = self.stats
+        predicates, classes, datatypes = stats.predicates, stats.classes, stats.datatypes
+        for _, p, o in triples:
+            predicates[p] += 1
+            if p == RDF.type:
+                classes[o] += 1
+            elif isinstance(o, Literal):
+                # the slots behind the language/datatype properties, read directly
+                if o._language:
+                    datatypes[RDF.langString] += 1
+                elif o._datatype is None:
+                    datatypes[XSD.string] += 1
+                    stats.untyped += 1
+                else:
+                    datatypes[o._datatype] += 1
+                    if o.ill_typed:
+                        stats.ill_typed += 1
+        stats.triples = sum(predicates.values())
+
+    def write_graph(self, graph: Graph) -> None:
+        """Count the triples of one graph of a dataset."""
+        self.write(graph)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
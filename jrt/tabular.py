@@ -0,0 +1,67 @@
+"""Detection and loading of tabular data (homogeneous arrays of flat records).
+
+A JSON array whose elements are all objects sharing the same keys, with only
+scalar values, is effectively a table. :class:`~jrt.builder.GraphBuilder`
+converts such arrays column by column: predicates, rules and datatypes are
+resolved once per column instead of once per cell. CSV and Parquet files are
+loaded into the same list-of-records shape so they go through that engine too.
+"""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# Below this many rows the per-column setup costs more than it saves
+MIN_TABLE_ROWS = 8
+
+# File extensions loaded as tables by :func:`read_table`
+TABLE_SUFFIXES = {".csv", ".tsv", ".parquet"}
+
+
+def record_columns(rows: Sequence[Any]) -> Optional[List[str]]:
+    """Return the shared column names if *rows* is a table of flat records, else ``None``.
+
+    Every row must be a mapping with the same keys in the same order, and no
+    value may be a nested object or list.
+    """
+    if len(rows) < MIN_TABLE_ROWS or not isinstance(rows[0], Mapping):
+        return None
+    columns = tuple(rows[0])
+    for row in rows:
+        if not isinstance(row, Mapping) or tuple(row) != columns:
+            return None
+        for value in row.values():
+            if isinstance(value, (Mapping, list)):
+                return None
+    return list(columns)
+
+
+def read_csv(path: Path, delimiter: str = ",") -> List[Dict[str, str]]:
+    """Load a CSV file with a header row as a list of records."""
+    with path.open(newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f, delimiter=delimiter))
+
+
+def read_parquet(path: Path) -> List[Dict[str, Any]]:
+    """Load a Parquet file as a list of records (requires ``pyarrow``)."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover
+        raise ImportError(
+            "Reading Parquet files requires 'pyarrow'. Install it with: pip install pyarrow"
+        ) from exc
+    return pq.read_table(path).to_pylist()
+
+
+def read_table(path: Path) -> List[Dict[str, Any]]:
+    """Load a tabular file, choosing the reader from its extension."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return read_csv(path)
+    if suffix == ".tsv":
+        return read_csv(path, delimiter="\t")
+    if suffix == ".parquet":
+        return read_parquet(path)
+    raise ValueError(f"Unsupported tabular file extension: {path.suffix}")
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, RDFS, XSD
+
+from jrt.binary import iter_binary, read_binary, write_binary
+from jrt.builder import GraphBuilder
+
+EX = "http://example.org/"
+
+
+@pytest.fixture
+def graph():
+    g = Graph()
+    for i in range(20):
+        s = URIRef(f"{EX}resource/{i % 7}")
+        g.add((s, RDF.type, URIRef(f"{EX}Thing")))
+        g.add((s, RDFS.label, Literal(f"Thing {i}")))
+        g.add((s, URIRef(f"{EX}rank"), Literal(i)))
+        g.add((s, URIRef(f"{EX}name"), Literal(f"nom {i}", lang="fr")))
+        g.add((s, URIRef(f"{EX}linked"), BNode(f"b{i % 3}")))
+    g.add((BNode("b0"), URIRef(f"{EX}created"), Literal("2021-03-04", datatype=XSD.date)))
+    g.add((URIRef(f"{EX}é"), URIRef(f"{EX}note"), Literal("multi\nline ☃ \U0001f600")))
+    # lexical forms survive as written, even non-canonical or ill-typed ones
+    g.add((URIRef(f"{EX}x"), URIRef(f"{EX}count"), Literal("007", datatype=XSD.integer)))
+    g.add((URIRef(f"{EX}x"), URIRef(f"{EX}count"), Literal("many", datatype=XSD.integer)))
+    return g
+
+
+def dump(graph):
+    buffer = io.BytesIO()
+    write_binary(graph, buffer)
+    return buffer.getvalue()
+
+
+class TestBinary:
+
+    def test_round_trip(self, graph):
+        loaded = read_binary(io.BytesIO(dump(graph)))
+        assert len(loaded) == len(graph)
+        assert set(loaded) == set(graph)
+
+    def test_iterate_and_path(self, graph, tmp_path):
+        path = tmp_path / "graph.jrtb"
+        write_binary(graph, path)
+        assert sorted(iter_binary(path)) == sorted(graph)
+
+    def test_load_into_existing_graph(self, graph):
+        target = Graph()
+        target.add((URIRef(f"{EX}y"), RDFS.label, Literal("kept")))
+        read_binary(io.BytesIO(dump(graph)), target)
+        assert len(target) == len(graph) + 1
+
+    def test_builder_output(self, sample_data, teapot_ontology):
+        built = GraphBuilder(data=sample_data, ontologies=[teapot_ontology]).build()
+        assert isomorphic(read_binary(io.BytesIO(dump(built))), built)
+
+    def test_smaller_than_ntriples(self, graph):
+        assert len(dump(graph)) < len(graph.serialize(format="nt", encoding="utf-8"))
+
+    def test_empty_graph(self):
+        assert len(read_binary(io.BytesIO(dump(Graph())))) == 0
+
+    @pytest.mark.parametrize("data", [b"", b"<rdf/>", b"JRTRDF\x00\x00\x09\x00\x00\x00" + bytes(8)])
+    def test_rejects_other_files(self, data):
+        with pytest.raises(ValueError, match="jrtb"):
+            read_binary(io.BytesIO(data))
+
+    def test_rejects_truncated_file(self, graph):
+        with pytest.raises(ValueError, match="Truncated"):
+            read_binary(io.BytesIO(dump(graph)[:40]))
+
+    def test_rejects_truncated_text(self, graph):
+        with pytest.raises(ValueError, match="Truncated"):
+            read_binary(io.BytesIO(dump(graph)[:-3]))
@@ -1,9 +1,13 @@
+import io
+
 import pytest
-from rdflib import Graph, Literal, URIRef
-from rdflib.namespace import OWL, RDF, RDFS, XSD, Namespace
+from rdflib import Dataset, Graph, Literal, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.namespace import FOAF, OWL, RDF, RDFS, XSD, Namespace
 
 from jrt.builder import GraphBuilder
 from jrt.ontology import Ontology
+from jrt.rules import BatchRule
 
 
 class TestGraphBuilder:
@@ -97,6 +101,73 @@ class TestGraphBuilder:
         # The explicit triple returned by the rule must be present verbatim
         assert (s, p, o) in graph
 
+    def test_batch_rule_receives_values_in_bulk(self, base_uri):
+        data = [{"id": f"i{i}", "tags": [f"t{i % 4}", "x"]} for i in range(10)]
+        lookup = {f"t{i}": URIRef(f"http://custom.org/tag/{i}") for i in range(4)}
+        batches = []
+
+        def tag_table(key, items):
+            batches.append(len(items))
+            for subject, tags in items:
+                for tag in tags:
+                    if tag in lookup:
+                        yield subject, key, lookup[tag]
+
+        builder = GraphBuilder(data=data, base_uri=base_uri, tabular=False)
+        builder.add_rule("tags", BatchRule(tag_table, batch_size=4))
+        graph = builder.build()
+
+        assert batches == [4, 4, 2]
+        tags = list(graph.objects(predicate=URIRef(f"{base_uri}tags")))
+        assert len(tags) == 10 and set(tags) == set(lookup.values())
+        assert Literal("x") not in tags
+        stats = builder.rule_stats["tags"]
+        assert (stats.calls, stats.values, stats.triples) == (3, 10, 10)
+        assert stats.seconds > 0
+
+    def test_batch_rule_on_table_rows_and_partitions(self, base_uri):
+        rows = [{"id": f"r{i}", "code": i} for i in range(8)]
+        rule = BatchRule(lambda key, items: [(s, RDFS.comment, Literal(v * 10)) for s, v in items])
+
+        builder = GraphBuilder(data=rows, base_uri=base_uri)
+        builder.add_rule("code", rule)
+        graph = builder.build()
+        assert {o.toPython() for o in graph.objects(predicate=RDFS.comment)} == {
+            i * 10 for i in range(8)
+        }
+        assert builder.rule_stats["code"].calls == 1
+
+        builder = GraphBuilder(data=rows, base_uri=base_uri, partition="record")
+        builder.add_rule("code", rule)
+        for g in builder.build().store.contexts():
+            # each value lands in its record's graph
+            for s, _, _ in g.triples((None, RDFS.comment, None)):
+                assert (s, RDFS.label, None) in g or (s, URIRef(f"{base_uri}id"), None) in g
+
+    def test_rule_stats(self, sample_data, base_uri):
+        builder = GraphBuilder(data=sample_data, base_uri=base_uri)
+        builder.add_rule("description", Literal("fixed"))
+        builder.add_rule("stuffs", lambda key, value: (key, Literal(len(value))))
+        builder.build()
+        assert builder.rule_stats["description"].triples == 1
+        assert builder.rule_stats["stuffs"].calls == 1
+        assert "1 calls" in str(builder.rule_stats["stuffs"])
+
+    def test_rules_assigned_directly(self, sample_data, base_uri):
+        # `rules` is a plain dict: rules set without add_rule get stats too
+        builder = GraphBuilder(data=sample_data, base_uri=base_uri)
+        builder.rules["description"] = Literal("fixed")
+        builder.rules["stuffs"] = lambda key, value: (key, Literal(len(value)))
+        builder.rules["name"] = BatchRule(lambda key, items: [])
+        builder.build()
+        assert builder.rule_stats["description"].triples == 1
+        assert builder.rule_stats["stuffs"].calls == 1
+        assert builder.rule_stats["name"].calls == 1
+
+    def test_batch_rule_size(self):
+        with pytest.raises(ValueError):
+            BatchRule(lambda key, items: [], batch_size=0)
+
     def test_datatype_property_resolved_from_ontology(self, base_uri):
         EX = Namespace("http://example.org/stuff#")
         onto_graph = Graph()
@@ -150,3 +221,200 @@ class TestGraphBuilder:
 
         obj = next(o for _, _, o in graph if isinstance(o, Literal) and str(o) == "2024-01-15")
         assert obj.datatype is None
+
+    def test_include_and_exclude_filters(self, base_uri):
+        data = {
+            "id": "root",
+            "name": "Root",
+            "internal": {"name": "Hidden"},
+            "items": [
+                {
+                    "id": "b1",
+                    "name": "Dune",
+                    "author": {"id": "a1", "name": "Herbert"},
+                    "pages": 412,
+                },
+            ],
+        }
+        included = GraphBuilder(data=data, base_uri=base_uri, include=["$.items[*].author"]).build()
+        excluded = GraphBuilder(data=data, base_uri=base_uri, exclude=["$.internal"]).build()
+        full = GraphBuilder(data=data, base_uri=base_uri).build()
+
+        # author kept, linked from the same (id-based) item subject as a full run
+        item = next(full.subjects(URIRef(f"{base_uri}pages"), None))
+        author = next(full.objects(item, URIRef(f"{base_uri}author")))
+        assert (item, URIRef(f"{base_uri}author"), author) in included
+        assert (author, RDFS.label, Literal("Herbert")) in included
+        assert not list(included.triples((None, URIRef(f"{base_uri}pages"), None)))
+        assert (None, RDFS.label, Literal("Hidden")) not in included
+
+        assert (None, RDFS.label, Literal("Hidden")) not in excluded
+        assert (None, URIRef(f"{base_uri}pages"), None) in excluded
+
+    def test_hierarchy_links_sub_properties_and_applies_ranges(self, base_uri):
+        EX = Namespace("http://example.org/stuff#")
+        onto = Graph()
+        onto.add((EX.relatedTo, RDF.type, OWL.ObjectProperty))
+        onto.add((EX.friend, RDFS.subPropertyOf, EX.relatedTo))
+        onto.add((EX.born, RDFS.range, XSD.gYear))
+        data = {"id": "p1", "name": "Ann", "friend": "Bob", "born": "1990"}
+
+        flat = GraphBuilder(data=data, ontologies=[Ontology(graph=onto)], base_uri=base_uri)
+        graph = GraphBuilder(
+            data=data, ontologies=[Ontology(graph=onto)], base_uri=base_uri, hierarchy=True
+        ).build()
+
+        friend = next(graph.objects(predicate=EX.friend))
+        assert isinstance(friend, URIRef)
+        assert (friend, RDFS.label, Literal("Bob")) in graph
+        assert (None, EX.born, Literal("1990", datatype=XSD.gYear)) in graph
+        # without the hierarchy, "friend" is an unknown property
+        assert (None, EX.friend, Literal("Bob")) not in flat.build()
+
+    def test_hierarchy_uses_domain_of_subject_class(self, base_uri):
+        EX = Namespace("http://example.org/stuff#")
+        onto = Graph()
+        for prop, domain in ((EX.bookCode, EX.Book), (EX.staffCode, EX.Person)):
+            onto.add((prop, RDF.type, OWL.DatatypeProperty))
+            onto.add((prop, RDFS.label, Literal("code")))
+            onto.add((prop, RDFS.domain, domain))
+        onto.add((EX.Book, RDF.type, OWL.Class))
+        onto.add((EX.Person, RDF.type, OWL.Class))
+        data = {"type": "Person", "code": "E-12", "books": [{"type": "Book", "code": "B-7"}]}
+
+        graph = GraphBuilder(
+            data=data, ontologies=[Ontology(graph=onto)], base_uri=base_uri, hierarchy=True
+        ).build()
+
+        assert (None, EX.staffCode, Literal("E-12")) in graph
+        assert (None, EX.bookCode, Literal("B-7")) in graph
+
+    def test_normalized_keys_match_known_terms(self, base_uri):
+        EX = Namespace("http://example.org/stuff#")
+        onto = Graph()
+        onto.add((EX.shippingAddress, RDF.type, OWL.DatatypeProperty))
+        data = {"id": "p1", "first_name": "Ann", "shipping-address": "Paris", "Shoe_Size": "38"}
+
+        graph = GraphBuilder(
+            data=data, ontologies=[Ontology(graph=onto)], base_uri=base_uri, normalize_keys=True
+        ).build()
+        assert (None, FOAF.firstName, Literal("Ann")) in graph
+        assert (None, EX.shippingAddress, Literal("Paris")) in graph
+        # unmatched keys still fall back to the base namespace
+        assert (None, URIRef(f"{base_uri}shoe_size"), Literal("38")) in graph
+
+        plain = GraphBuilder(data=data, base_uri=base_uri).build()
+        assert (None, URIRef(f"{base_uri}first_name"), Literal("Ann")) in plain
+
+    def test_approximate_and_singular_key_matching(self, base_uri):
+        data = {"id": "p1", "familyNme": "Doe", "homepages": "http://example.org/~doe"}
+        graph = GraphBuilder(
+            data=data, base_uri=base_uri, match_threshold=0.7, singular_keys=True
+        ).build()
+        assert (None, FOAF.familyName, Literal("Doe")) in graph
+        assert next(graph.objects(predicate=FOAF.homepage), None) is not None
+
+    def test_write_within_memory_budget(self, base_uri, tmp_path):
+        EX = Namespace("http://example.org/stuff#")
+        onto = Graph()
+        onto.add((EX.sequel, RDF.type, OWL.ObjectProperty))
+        # each book links back to the previous one, the last to the first:
+        # by then its label has been spilled to disk
+        records = [{"id": "b0", "name": "Book 0"}] + [
+            {"id": f"b{i}", "name": f"Book {i}", "pages": i, "sequel": f"Book {i - 1}"}
+            for i in range(1, 300)
+        ]
+        records.append({"id": "b300", "name": "Book 300", "sequel": "Book 0"})
+
+        expected = GraphBuilder(
+            data=records, ontologies=[Ontology(graph=onto)], base_uri=base_uri, tabular=False
+        ).build()
+        builder = GraphBuilder(
+            data=iter(records),
+            ontologies=[Ontology(graph=onto)],
+            base_uri=base_uri,
+            max_memory=50_000,
+            spill_dir=tmp_path,
+        )
+        path = tmp_path / "out.nt"
+        with path.open("wb") as f:
+            count = builder.write(f)
+
+        assert builder.flushes > 10 and builder.spills > 0
+        assert count == sum(1 for line in path.open(encoding="utf-8") if line.strip())
+        graph = Graph().parse(path, format="nt")
+        # apart from the random root resource, the output is the unbounded one
+        strip = lambda g: {t for t in g if t[2] != OWL.Thing}
+        assert strip(graph) == strip(expected)
+        # the spilled label database is removed
+        assert [p.name for p in tmp_path.iterdir()] == ["out.nt"]
+
+    @pytest.fixture
+    def records(self):
+        return [
+            {"id": f"i{i}", "name": f"Item {i}", "owner": {"id": "bob", "name": "Bob"}}
+            for i in range(3)
+        ]
+
+    @staticmethod
+    def _graphs(dataset):
+        return {str(g.identifier): g for g in dataset.store.contexts() if len(g)}
+
+    def test_partition_by_file(self, records, base_uri):
+        dataset = Dataset()
+        for name in ("a.json", "file:///data/b.json"):
+            GraphBuilder(
+                data=records, base_uri=base_uri, partition="file", source=name, dataset=dataset
+            ).build()
+        graphs = self._graphs(dataset)
+        assert set(graphs) == {f"{base_uri}graph/a.json", "file:///data/b.json"}
+        assert len(graphs["file:///data/b.json"]) == len(graphs[f"{base_uri}graph/a.json"])
+
+    def test_partition_by_record(self, records, base_uri):
+        dataset = GraphBuilder(data=records, base_uri=base_uri, partition="record").build()
+        again = GraphBuilder(data=records, base_uri=base_uri, partition="record").build()
+        graphs = self._graphs(dataset)
+        # one graph per record, named after the record's resource, plus the root
+        assert len(graphs) == len(records) + 1
+        assert str(DATASET_DEFAULT_GRAPH_ID) in graphs
+        # records with an id get the same graph on every run
+        assert set(graphs) == set(self._graphs(again))
+        for record in records:
+            graph = next(g for g in graphs.values() if (None, None, Literal(record["name"])) in g)
+            subject = graph.value(predicate=RDFS.label, object=Literal(record["name"]))
+            assert str(graph.identifier) == str(subject).replace(base_uri, f"{base_uri}graph/")
+            # shared resources are repeated in every record using them
+            assert (None, RDFS.label, Literal("Bob")) in graph
+
+    def test_partition_by_path(self, records, base_uri):
+        data = {"items": records, "title": "Catalogue"}
+        graphs = self._graphs(GraphBuilder(data=data, base_uri=base_uri, partition="path").build())
+        items = graphs[f"{base_uri}graph/$.items%5B*%5D"]
+        owners = graphs[f"{base_uri}graph/$.items%5B*%5D.owner"]
+        assert len(list(items.subjects(RDFS.label, None))) == len(records)
+        assert (None, RDFS.label, Literal("Bob")) in owners
+        assert (None, RDFS.label, Literal("Catalogue")) in graphs[f"{base_uri}graph/$"]
+
+    def test_write_nquads_within_memory_budget(self, records, base_uri, tmp_path):
+        expected = GraphBuilder(data=records, base_uri=base_uri, partition="record").build()
+        builder = GraphBuilder(
+            data=iter(records), base_uri=base_uri, partition="record", max_memory=1
+        )
+        path = tmp_path / "out.nq"
+        with path.open("wb") as f:
+            builder.write(f, format="nq")
+
+        assert builder.flushes > len(records)
+        loaded = Dataset().parse(path, format="nquads")
+        named = lambda d: {
+            (s, p, o, g) for s, p, o, g in d.quads() if g is not None and o != OWL.Thing
+        }
+        assert named(loaded) == named(expected)
+
+    def test_partition_errors(self, records):
+        with pytest.raises(ValueError):
+            GraphBuilder(data=records, partition="key")
+        with pytest.raises(ValueError):
+            GraphBuilder(data=records, partition="file")
+        with pytest.raises(ValueError):
+            GraphBuilder(data=records, partition="record").write(io.BytesIO())
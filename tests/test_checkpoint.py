@@ -0,0 +1,143 @@
+import io
+import json
+from dataclasses import replace
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDFS
+
+import jrt.reader
+from jrt.builder import GraphBuilder
+from jrt.checkpoint import Checkpoint, CheckpointState, LabelJournal
+from jrt.reader import RecordStream, fingerprint
+
+STUFFS = URIRef("http://example.org/stuff#stuffs")
+
+
+@pytest.fixture
+def source(tmp_path):
+    # "stuffs" is an object property: its values link to earlier records by label
+    records = [{"id": f"r{i}", "name": f"Item {i}", "n": i} for i in range(40)]
+    for i, record in enumerate(records[3:], 3):
+        record["stuffs"] = f"Item {i - 3}"
+    path = tmp_path / "records.json"
+    path.write_text(json.dumps(records, indent=1), encoding="utf-8")
+    return path
+
+
+def convert(source, output, ontology, crash_at=None, resume=False, **kwargs):
+    def rule(key, value):
+        if value == crash_at:
+            raise RuntimeError("crash")
+        return None  # not handled: the value is converted as usual
+
+    builder = GraphBuilder(data=RecordStream(source), ontologies=[ontology], **kwargs)
+    builder.add_rule("n", rule)
+    checkpoint = Checkpoint(output.with_name(output.name + ".checkpoint"), every=6, resume=resume)
+    with output.open("r+b" if checkpoint.state else "wb") as f:
+        count = builder.write(f, checkpoint=checkpoint)
+    checkpoint.remove()
+    return count
+
+
+def lines(path):
+    # the root resource is random in every run, and shifts the order of the
+    # lines written with it
+    return sorted(line for line in path.read_bytes().splitlines() if b"owl#Thing" not in line)
+
+
+class TestCheckpoint:
+
+    def test_save_and_reload(self, tmp_path):
+        path = tmp_path / "out.checkpoint"
+        with Checkpoint(path) as checkpoint:
+            assert checkpoint.state is None
+            checkpoint.save(CheckpointState(3, 120, 900, 12), [("a", URIRef("http://x/a"))])
+            state = CheckpointState(6, 240, 1800, 24, 5000, "abc", "nq", "def")
+            checkpoint.save(state, [("b", URIRef("http://x/b"))])
+
+        with Checkpoint(path, resume=True) as checkpoint:
+            assert checkpoint.state == state
+            assert dict(checkpoint.labels()) == {
+                "a": URIRef("http://x/a"),
+                "b": URIRef("http://x/b"),
+            }
+        # a new conversion starts over
+        with Checkpoint(path) as checkpoint:
+            assert checkpoint.state is None
+        with pytest.raises(ValueError):
+            Checkpoint(path, every=0)
+
+    def test_label_journal_records_additions(self):
+        journal = LabelJournal({"a": URIRef("http://x/a")})
+        assert journal.setdefault("a", URIRef("http://x/other")) == URIRef("http://x/a")
+        journal.setdefault("b", URIRef("http://x/b"))
+        journal["c"] = URIRef("http://x/c")
+        assert journal.added == [("b", URIRef("http://x/b")), ("c", URIRef("http://x/c"))]
+        assert len(journal) == 3 and journal.get("d") is None
+
+
+class TestResume:
+
+    @pytest.mark.parametrize("options", [{}, {"max_memory": 1}])
+    def test_resumed_output_is_identical(self, source, teapot_ontology, tmp_path, options):
+        complete = tmp_path / "complete.nt"
+        expected = convert(source, complete, teapot_ontology, **options)
+
+        output = tmp_path / "out.nt"
+        with pytest.raises(RuntimeError):
+            convert(source, output, teapot_ontology, crash_at=27, **options)
+        with Checkpoint(tmp_path / "out.nt.checkpoint", resume=True) as checkpoint:
+            assert checkpoint.state.records == 24
+        assert convert(source, output, teapot_ontology, resume=True, **options) == expected
+
+        assert lines(output) == lines(complete)
+        assert not (tmp_path / "out.nt.checkpoint").exists()
+        graph = Graph().parse(output, format="nt")
+        # records after the checkpoint link to resources labelled before it
+        item = lambda i: graph.value(predicate=RDFS.label, object=Literal(f"Item {i}"))
+        assert (item(26), STUFFS, item(23)) in graph
+        assert len(set(graph.subjects(RDFS.label, Literal("Item 23")))) == 1
+
+    def test_resume_with_crlf_line_ends(self, source, teapot_ontology, tmp_path):
+        # offsets count both bytes of each "\r\n"
+        source.write_bytes(source.read_bytes().replace(b"\n", b"\r\n"))
+        output = tmp_path / "out.nt"
+        with pytest.raises(RuntimeError):
+            convert(source, output, teapot_ontology, crash_at=27)
+        convert(source, output, teapot_ontology, resume=True)
+        convert(source, tmp_path / "complete.nt", teapot_ontology)
+        assert lines(output) == lines(tmp_path / "complete.nt")
+
+    def test_resume_refuses_an_edit_of_converted_records(
+        self, source, teapot_ontology, tmp_path, monkeypatch
+    ):
+        output = tmp_path / "out.nt"
+        with pytest.raises(RuntimeError):
+            convert(source, output, teapot_ontology, crash_at=27)
+        size = output.stat().st_size
+        # same size, and out of reach of the fingerprint of both ends
+        monkeypatch.setattr(jrt.reader, "FINGERPRINT_BLOCK", 16)
+        with Checkpoint(tmp_path / "out.nt.checkpoint", resume=True) as checkpoint:
+            checkpoint.save(replace(checkpoint.state, input_fingerprint=fingerprint(source)), [])
+        source.write_bytes(source.read_bytes().replace(b'"Item 10"', b'"Item X0"'))
+        with pytest.raises(ValueError, match="another input"):
+            convert(source, output, teapot_ontology, resume=True)
+        assert output.stat().st_size == size
+
+    def test_crash_before_the_first_checkpoint(self, source, teapot_ontology, tmp_path):
+        output = tmp_path / "out.nt"
+        with pytest.raises(RuntimeError):
+            convert(source, output, teapot_ontology, crash_at=2)
+        convert(source, output, teapot_ontology, resume=True)
+        convert(source, tmp_path / "complete.nt", teapot_ontology)
+        assert lines(output) == lines(tmp_path / "complete.nt")
+
+    def test_requirements(self, source, tmp_path):
+        checkpoint = Checkpoint(tmp_path / "out.checkpoint")
+        with pytest.raises(ValueError):
+            GraphBuilder(data=[{"id": 1}]).write(io.BytesIO(), checkpoint=checkpoint)
+        with pytest.raises(ValueError):
+            GraphBuilder(data=RecordStream(source)).write(
+                io.BytesIO(), format="json-ld", checkpoint=checkpoint
+            )
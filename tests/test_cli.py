@@ -2,8 +2,8 @@ import json
 from pathlib import Path
 
 import pytest
-from rdflib import Graph, Literal
-from rdflib.namespace import RDF, RDFS
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS, Namespace
 from typer.testing import CliRunner
 
 from jrt.cli import app
@@ -85,3 +85,434 @@ def test_convert_command_without_ontology(json_input, tmp_path, format_arg, rdfl
     # Should include the basic RDF structure even without ontology
     subjects = list(g.subjects(RDFS.label, Literal("Teapot")))
     assert len(subjects) == 1
+
+
+def test_convert_command_with_csv_input(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("id,name,created\n1,Teapot,2024-01-15\n2,Cup,\n", encoding="utf-8")
+    output = tmp_path / "out.ttl"
+
+    result = runner.invoke(
+        app, ["convert", str(input_path), "--output", str(output), "--format", "ttl"]
+    )
+
+    assert result.exit_code == 0
+    g = Graph()
+    g.parse(output, format="turtle")
+    assert len(list(g.subjects(RDFS.label, Literal("Teapot")))) == 1
+    assert len(list(g.subjects(RDFS.label, Literal("Cup")))) == 1
+
+
+def test_convert_command_with_path_filters(json_input, tmp_path):
+    output = tmp_path / "out.ttl"
+
+    result = runner.invoke(
+        app,
+        [
+            "convert",
+            str(json_input),
+            "--output",
+            str(output),
+            "--format",
+            "ttl",
+            "--include",
+            "$.stuffs[*]",
+            "--exclude",
+            "$.stuffs[*].description",
+        ],
+    )
+
+    assert result.exit_code == 0
+    g = Graph()
+    g.parse(output, format="turtle")
+    assert len(list(g.subjects(RDFS.label, Literal("Cup")))) == 1
+    # members of the root outside the included path are not converted
+    assert not list(g.subjects(RDFS.label, Literal("Teapot")))
+    assert not list(g.triples((None, RDFS.comment, None)))
+
+
+def test_convert_command_sorted_and_deduplicated(json_input, tmp_path):
+    output = tmp_path / "out.nt"
+
+    result = runner.invoke(
+        app,
+        [
+            "convert",
+            str(json_input),
+            "--output",
+            str(output),
+            "--format",
+            "nt",
+            "--sort",
+            "--dedupe",
+        ],
+    )
+
+    assert result.exit_code == 0
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert lines == sorted(set(lines))
+    g = Graph()
+    g.parse(output, format="nt")
+    assert len(g) == len(lines)
+
+
+def test_convert_command_sort_requires_ntriples(json_input, tmp_path):
+    result = runner.invoke(
+        app, ["convert", str(json_input), "--output", str(tmp_path / "out.xml"), "--sort"]
+    )
+    assert result.exit_code != 0
+
+
+def test_sort_command(tmp_path):
+    source = tmp_path / "in.nt"
+    source.write_text("<b> <p> <o> .\n<a> <p> <o> .\n<b> <p> <o> .\n", encoding="utf-8")
+    output = tmp_path / "sorted.nt"
+
+    result = runner.invoke(app, ["sort", str(source), "--output", str(output), "--dedupe"])
+
+    assert result.exit_code == 0
+    assert output.read_text(encoding="utf-8") == "<a> <p> <o> .\n<b> <p> <o> .\n"
+
+
+def test_compile_ontology_and_convert_with_index(json_input, teapot_ontology_file, tmp_path):
+    index = tmp_path / "ontology.jrti"
+    output = tmp_path / "out.ttl"
+
+    result = runner.invoke(
+        app, ["compile-ontology", str(teapot_ontology_file), "--output", str(index)]
+    )
+    assert result.exit_code == 0
+    assert index.exists()
+
+    result = runner.invoke(
+        app,
+        [
+            "convert",
+            str(json_input),
+            "--output",
+            str(output),
+            "--format",
+            "ttl",
+            "--ontology-index",
+            str(index),
+        ],
+    )
+    assert result.exit_code == 0
+    g = Graph()
+    g.parse(output, format="turtle")
+    assert len(list(g.subjects(RDFS.label, Literal("Teapot")))) == 1
+
+    for command in (["convert", str(json_input)], ["serve", "--port", "0"]):
+        result = runner.invoke(app, [*command, "--ontology-index", str(index), "--hierarchy"])
+        assert result.exit_code == 2 and isinstance(result.exception, SystemExit)
+
+
+def test_convert_with_hierarchy(tmp_path):
+    ontology = tmp_path / "onto.ttl"
+    ontology.write_text(
+        "@prefix ex: <http://example.org/stuff#> .\n"
+        "@prefix owl: <http://www.w3.org/2002/07/owl#> .\n"
+        "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n"
+        "ex:relatedTo a owl:ObjectProperty .\n"
+        "ex:friend rdfs:subPropertyOf ex:relatedTo .\n",
+        encoding="utf-8",
+    )
+    source = tmp_path / "input.json"
+    source.write_text(json.dumps({"id": "p1", "friend": "Bob"}), encoding="utf-8")
+    output = tmp_path / "out.ttl"
+
+    args = ["convert", str(source), "--output", str(output), "--format", "ttl"]
+    result = runner.invoke(app, [*args, "--ontology", str(ontology), "--hierarchy"])
+    assert result.exit_code == 0
+    g = Graph()
+    g.parse(output, format="turtle")
+    friend = next(g.objects(predicate=URIRef("http://example.org/stuff#friend")))
+    assert (friend, RDFS.label, Literal("Bob")) in g
+
+
+def test_convert_with_normalized_keys(tmp_path):
+    source = tmp_path / "input.json"
+    source.write_text(json.dumps({"id": "p1", "first_name": "Ann"}), encoding="utf-8")
+    output = tmp_path / "out.ttl"
+
+    args = ["convert", str(source), "--output", str(output), "--format", "ttl"]
+    result = runner.invoke(app, [*args, "--normalize-keys"])
+    assert result.exit_code == 0
+    g = Graph()
+    g.parse(output, format="turtle")
+    assert (None, URIRef("http://xmlns.com/foaf/0.1/firstName"), Literal("Ann")) in g
+
+
+def test_convert_with_memory_limit(tmp_path):
+    source = tmp_path / "input.json"
+    records = [{"id": f"r{i}", "name": f"Record {i}", "rank": i} for i in range(200)]
+    source.write_text(json.dumps(records), encoding="utf-8")
+    output = tmp_path / "out.nt"
+
+    args = ["convert", str(source), "--output", str(output), "--format", "nt"]
+    result = runner.invoke(app, [*args, "--memory-limit", "64K", "--dedupe"])
+    assert result.exit_code == 0, result.output
+    assert "peak RSS" in result.output
+    g = Graph()
+    g.parse(output, format="nt")
+    assert len(list(g.subjects(RDFS.label, None))) == 200
+
+
+def test_memory_limit_requires_ntriples(json_input, tmp_path):
+    result = runner.invoke(
+        app,
+        [
+            "convert",
+            str(json_input),
+            "--output",
+            str(tmp_path / "o.ttl"),
+            "--format",
+            "ttl",
+            "--memory-limit",
+            "1M",
+        ],
+    )
+    assert result.exit_code != 0
+
+
+def test_convert_to_binary(json_input, tmp_path):
+    from jrt.binary import read_binary
+
+    output = tmp_path / "out.jrtb"
+    result = runner.invoke(
+        app, ["convert", str(json_input), "--output", str(output), "--format", "jrtb"]
+    )
+
+    assert result.exit_code == 0
+    g = read_binary(output)
+    assert (None, RDFS.label, Literal("Teapot")) in g
+
+
+def test_convert_to_streamed_jsonld(tmp_path):
+    input_path = tmp_path / "items.json"
+    input_path.write_text(json.dumps([{"id": f"i{i}", "name": f"Item {i}"} for i in range(3)]))
+    output = tmp_path / "out.jsonld"
+
+    result = runner.invoke(
+        app, ["convert", str(input_path), "--output", str(output), "--format", "json-ld"]
+    )
+
+    assert result.exit_code == 0
+    document = json.loads(output.read_text(encoding="utf-8"))
+    assert "@vocab" in document["@context"]
+    g = Graph()
+    g.parse(output, format="json-ld")
+    assert len(list(g.subjects(RDFS.label, None))) == 3
+
+
+def test_convert_with_partition(json_input, tmp_path):
+    from rdflib import Dataset
+
+    output = tmp_path / "out.nq"
+    result = runner.invoke(
+        app,
+        ["convert", str(json_input), "--output", str(output), "--format", "nq"]
+        + ["--partition", "file"],
+    )
+
+    assert result.exit_code == 0
+    dataset = Dataset().parse(output, format="nquads")
+    names = {g for _, _, _, g in dataset.quads() if g is not None}
+    assert names == {URIRef(json_input.resolve().as_uri())}
+
+
+def test_partition_requires_quads(json_input, tmp_path):
+    args = ["convert", str(json_input), "--output", str(tmp_path / "o.nt"), "--format", "nt"]
+    assert runner.invoke(app, args + ["--partition", "record"]).exit_code != 0
+    args[-1] = "nq"
+    assert runner.invoke(app, args + ["--partition", "other"]).exit_code != 0
+
+
+def test_convert_with_inferred_schema(tmp_path):
+    source = tmp_path / "input.json"
+    records = [{"id": f"r{i}", "name": f"Record {i}", "tags": [{"id": "t"}]} for i in range(20)]
+    source.write_text(json.dumps(records), encoding="utf-8")
+    output = tmp_path / "out.nt"
+
+    args = ["convert", str(source), "--output", str(output), "--format", "nt"]
+    result = runner.invoke(app, [*args, "--infer-schema"])
+    assert result.exit_code == 0, result.output
+    g = Graph()
+    g.parse(output, format="nt")
+    assert len(list(g.subjects(RDFS.label, None))) == 20
+
+
+def test_convert_with_checkpoints_and_resume(tmp_path, monkeypatch):
+    from jrt.checkpoint import Checkpoint
+
+    source = tmp_path / "input.json"
+    records = [{"id": f"r{i}", "name": f"Record {i}"} for i in range(30)]
+    source.write_text(json.dumps(records), encoding="utf-8")
+    output = tmp_path / "out.nt"
+    args = ["convert", str(source), "--output", str(output), "--format", "nt"]
+
+    result = runner.invoke(app, [*args, "--checkpoint-every", "7"])
+    assert result.exit_code == 0, result.output
+    assert not (tmp_path / "out.nt.checkpoint").exists()
+    complete = Graph().parse(output, format="nt")
+
+    # interrupt a run right after its second checkpoint
+    save = Checkpoint.save
+
+    def save_then_crash(self, state, labels):
+        save(self, state, labels)
+        if state.records == 14:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(Checkpoint, "save", save_then_crash)
+    assert runner.invoke(app, [*args, "--checkpoint-every", "7"]).exit_code != 0
+    monkeypatch.setattr(Checkpoint, "save", save)
+
+    result = runner.invoke(app, [*args, "--checkpoint-every", "7", "--resume"])
+    assert result.exit_code == 0, result.output
+    assert "Resuming after 14 records" in result.output
+    resumed = Graph().parse(output, format="nt")
+    assert len(resumed) == len(complete)
+    assert set(resumed.objects(predicate=RDFS.label)) == set(complete.objects(predicate=RDFS.label))
+
+
+def test_resume_refuses_a_mismatched_checkpoint(tmp_path, monkeypatch):
+    from jrt.checkpoint import Checkpoint
+
+    source = tmp_path / "input.json"
+    source.write_text(json.dumps([{"id": f"r{i}"} for i in range(30)]), encoding="utf-8")
+    output = tmp_path / "out.nt"
+    args = ["convert", str(source), "--output", str(output), "--checkpoint-every", "7"]
+
+    def save_then_crash(self, state, labels):
+        save(self, state, labels)
+        raise KeyboardInterrupt
+
+    save = Checkpoint.save
+    monkeypatch.setattr(Checkpoint, "save", save_then_crash)
+    assert runner.invoke(app, [*args, "--format", "nt"]).exit_code != 0
+    monkeypatch.setattr(Checkpoint, "save", save)
+    size = output.stat().st_size
+
+    result = runner.invoke(app, [*args, "--format", "nq", "--resume"])
+    assert result.exit_code != 0 and "saved for format 'nt'" in result.output
+    source.write_text(json.dumps([{"id": f"x{i}"} for i in range(30)]), encoding="utf-8")
+    result = runner.invoke(app, [*args, "--format", "nt", "--resume"])
+    assert result.exit_code != 0 and "another input" in result.output
+    assert output.stat().st_size == size  # left untouched
+
+    output.unlink()
+    result = runner.invoke(app, [*args, "--format", "nt", "--resume"])
+    assert result.exit_code != 0 and "is missing" in result.output
+
+
+def test_checkpoints_require_a_record_array(json_input, tmp_path):
+    args = ["convert", str(json_input), "--output", str(tmp_path / "o.nt"), "--format", "nt"]
+    assert runner.invoke(app, args + ["--resume"]).exit_code != 0
+    args[-1] = "ttl"
+    assert runner.invoke(app, args + ["--checkpoint-every", "5"]).exit_code != 0
+
+
+def test_ontology_prune(tmp_path):
+    EX = Namespace("http://example.org/zoo#")
+    g = Graph()
+    for name in ("owner", "engine", "fuel"):
+        g.add((EX[name], RDF.type, OWL.ObjectProperty))
+    g.add((EX.Dog, RDF.type, OWL.Class))
+    ontology = tmp_path / "zoo.ttl"
+    g.serialize(destination=ontology, format="turtle")
+    sample = tmp_path / "sample.json"
+    sample.write_text(json.dumps([{"id": "rex", "type": "Dog", "owner": "Ann"}]))
+    output = tmp_path / "pruned.ttl"
+
+    args = ["ontology-prune", str(ontology), "--output", str(output)]
+    result = runner.invoke(app, [*args, "--sample", str(sample), "--key", "fuel"])
+    assert result.exit_code == 0, result.output
+    assert "Kept 3 of 4 triples" in result.output
+    pruned = Graph().parse(output, format="turtle")
+    assert set(pruned.subjects()) == {EX.owner, EX.fuel, EX.Dog}
+
+    assert runner.invoke(app, args).exit_code != 0
+
+
+def test_convert_with_pipeline(tmp_path):
+    records = [{"id": f"r{i}", "name": f"Record {i}"} for i in range(30)]
+    source = tmp_path / "input.ndjson"
+    source.write_text("\n".join(json.dumps(r) for r in records), encoding="utf-8")
+    output = tmp_path / "out.nt"
+
+    args = ["convert", str(source), "--output", str(output), "--format", "nt", "--pipeline"]
+    result = runner.invoke(app, [*args, "--parse-workers", "2", "--profile"])
+    assert result.exit_code == 0, result.output
+    for stage in ("read", "parse", "build", "write"):
+        assert f"  {stage} " in result.output
+    g = Graph().parse(output, format="nt")
+    assert len(list(g.subjects(RDFS.label, None))) == 30
+
+    assert runner.invoke(app, [*args[:-3], "--profile"]).exit_code != 0
+    assert runner.invoke(app, [*args[:-2], "ttl", "--pipeline"]).exit_code != 0
+
+
+def test_convert_with_memo(json_input, tmp_path):
+    args = ["convert", str(json_input), "--output", str(tmp_path / "o.nt"), "--format", "nt"]
+    args += ["--memo", str(tmp_path / "jrt.memo")]
+    first = runner.invoke(app, args)
+    assert first.exit_code == 0, first.output
+    assert "results reused, 0 added" not in first.output
+    second = runner.invoke(app, args)
+    assert second.exit_code == 0, second.output
+    assert "results reused, 0 added" in second.output
+
+
+def test_convert_stats_only(tmp_path):
+    records = [{"id": f"r{i}", "name": f"Record {i}", "born": "2001-02-03"} for i in range(12)]
+    source = tmp_path / "input.json"
+    source.write_text(json.dumps(records), encoding="utf-8")
+    output = tmp_path / "out.nt"
+
+    args = ["convert", str(source), "--output", str(output), "--stats-only"]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.output
+    assert not output.exists()
+    assert "12  http://www.w3.org/2001/XMLSchema#date" in result.output
+    assert "Unresolved keys (2)" in result.output
+
+    result = runner.invoke(app, [*args, "--pipeline", "--profile"])
+    assert result.exit_code == 0, result.output
+    assert "12  http://www.w3.org/2001/XMLSchema#date" in result.output
+    assert "  build " in result.output
+    assert runner.invoke(app, [*args, "--format", "nt", "--sort"]).exit_code != 0
+
+
+def test_convert_range_and_shard(tmp_path):
+    records = [{"id": f"r{i}", "name": f"Record {i}"} for i in range(10)]
+    source = tmp_path / "input.json"
+    source.write_text(json.dumps(records, indent=1), encoding="utf-8")
+    output = tmp_path / "out.nt"
+    args = ["convert", str(source), "--output", str(output), "--format", "nt"]
+
+    assert runner.invoke(app, [*args, "--range", "2:5"]).exit_code != 0  # not indexed yet
+    result = runner.invoke(app, ["index", str(source)])
+    assert result.exit_code == 0, result.output
+    assert "Indexed 10 items" in result.output
+
+    result = runner.invoke(app, [*args, "--range", "2:5"])
+    assert result.exit_code == 0, result.output
+    assert "Converting items 2 to 5 of 10" in result.output
+    labels = set(Graph().parse(output, format="nt").objects(None, RDFS.label))
+    assert labels == {Literal(f"Record {i}") for i in range(2, 5)}
+
+    result = runner.invoke(app, [*args, "--shard", "1/2"])
+    assert result.exit_code == 0, result.output
+    labels = set(Graph().parse(output, format="nt").objects(None, RDFS.label))
+    assert labels == {Literal(f"Record {i}") for i in range(5, 10)}
+
+    for bad in (["--shard", "2/2"], ["--range", "5"], ["--range", "1:2", "--shard", "0/2"]):
+        assert runner.invoke(app, [*args, *bad]).exit_code != 0
+
+
+@pytest.mark.parametrize("fmt", ["jrtb", "nq", "trig"])
+def test_serve_rejects_formats_it_cannot_answer_in(fmt):
+    result = runner.invoke(app, ["serve", "--format", fmt, "--port", "0"])
+    assert result.exit_code == 2
+    assert isinstance(result.exception, SystemExit)
@@ -0,0 +1,113 @@
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS, XSD, Namespace
+
+from jrt.builder import GraphBuilder
+from jrt.compiled import MappedOntologyResolver, write_index
+from jrt.ontology import Ontology, OntologyResolver
+
+EX = Namespace("http://example.org/ontology#")
+
+
+@pytest.fixture
+def ontology_graph():
+    g = Graph()
+    g.add((EX.Teapot, RDF.type, OWL.Class))
+    g.add((EX.Teapot, RDFS.label, Literal("Théière")))
+    g.add((EX.stuffs, RDF.type, OWL.ObjectProperty))
+    g.add((EX.color, RDF.type, OWL.DatatypeProperty))
+    g.add((EX.weight, RDF.type, RDF.Property))
+    # two URIs sharing a label: resolution must pick the same one
+    g.add((EX.Kettle, RDFS.label, Literal("pot")))
+    g.add((EX.Pot, RDF.type, OWL.Class))
+    return g
+
+
+@pytest.fixture
+def mapped(ontology_graph, tmp_path):
+    path = tmp_path / "ontology.jrti"
+    write_index(OntologyResolver([ontology_graph]), path)
+    resolver = OntologyResolver.open(path)
+    yield resolver
+    resolver.close()
+
+
+class TestMappedOntologyResolver:
+
+    def test_open_returns_mapped_resolver(self, mapped):
+        assert isinstance(mapped, MappedOntologyResolver)
+
+    @pytest.mark.parametrize(
+        "label", ["teapot", "Théière", "THÉIÈRE", "stuffs", "color", "weight", "pot", "unknown"]
+    )
+    def test_resolve_matches_in_memory_resolver(self, ontology_graph, mapped, label):
+        assert mapped.resolve(label) == OntologyResolver([ontology_graph]).resolve(label)
+
+    def test_kinds_match_in_memory_resolver(self, ontology_graph, mapped):
+        resolver = OntologyResolver([ontology_graph])
+        for uri in [EX.Teapot, EX.stuffs, EX.color, EX.weight, EX.Kettle, EX.Pot, EX.unknown]:
+            assert mapped.is_class(uri) == resolver.is_class(uri)
+            assert mapped.is_object_property(uri) == resolver.is_object_property(uri)
+            assert mapped.is_datatype_property(uri) == resolver.is_datatype_property(uri)
+            assert mapped.is_property(uri) == resolver.is_property(uri)
+
+    def test_tables_round_trip(self, ontology_graph, mapped):
+        resolver = OntologyResolver([ontology_graph])
+        assert sorted(mapped.labels()) == sorted(resolver.labels())
+        assert sorted(mapped.classes()) == sorted(resolver.classes())
+        assert sorted(mapped.object_properties()) == sorted(resolver.object_properties())
+
+    def test_empty_resolver(self, tmp_path):
+        path = tmp_path / "empty.jrti"
+        write_index(OntologyResolver([]), path)
+        resolver = OntologyResolver.open(path)
+        assert resolver.resolve("anything") is None
+        assert not resolver.is_class(EX.Teapot)
+
+    def test_invalid_file_raises(self, tmp_path):
+        path = tmp_path / "bogus.jrti"
+        path.write_bytes(b"not an index at all")
+        with pytest.raises(ValueError):
+            OntologyResolver.open(path)
+
+    def test_fingerprint_is_the_file_content(self, ontology_graph, mapped, tmp_path):
+        path = tmp_path / "again.jrti"
+        write_index(OntologyResolver([ontology_graph]), path)
+        again = OntologyResolver.open(path)
+        assert again.fingerprint() == mapped.fingerprint()
+        again.close()
+
+    def test_builder_output_matches_in_memory_resolver(self, ontology_graph, mapped, base_uri):
+        data = {"id": "p1", "name": "Pot", "type": "Teapot", "color": "blue", "stuffs": "Cup"}
+        expected = GraphBuilder(
+            data=data, ontologies=[Ontology(graph=ontology_graph)], base_uri=base_uri
+        ).build()
+        expected -= ontology_graph
+        graph = GraphBuilder(data=data, base_uri=base_uri, resolver=mapped).build()
+
+        # the linked "Cup" resource gets a random URI: compare everything else
+        strip = lambda g: {t for t in g if "stuffs" not in t[1] and t[2] != Literal("Cup")}
+        assert strip(graph) == strip(expected)
+        assert len(list(graph.objects(predicate=EX.stuffs))) == 1
+        assert (None, EX.color, Literal("blue")) in graph
+        assert (None, RDF.type, EX.Teapot) in graph
+
+    def test_hierarchy_kinds_and_ranges_round_trip(self, ontology_graph, tmp_path):
+        ontology_graph.add((EX.links, RDFS.subPropertyOf, EX.stuffs))
+        ontology_graph.add((EX.born, RDFS.range, XSD.gYear))
+        resolver = OntologyResolver([ontology_graph], hierarchy=True)
+        path = tmp_path / "hierarchy.jrti"
+        write_index(resolver, path)
+        mapped = OntologyResolver.open(path)
+        try:
+            assert mapped.is_object_property(EX.links)
+            assert mapped.datatype_range(EX.born) == XSD.gYear
+            assert mapped.datatype_range(EX.color) is None
+            assert mapped.datatype_range(EX.unknown) is None
+        finally:
+            mapped.close()
+
+    def test_builder_refuses_hierarchy_without_it(self, mapped):
+        # the index holds no class hierarchy or domains to choose properties with
+        with pytest.raises(ValueError):
+            GraphBuilder(data={}, resolver=mapped, hierarchy=True)
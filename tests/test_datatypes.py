@@ -1,8 +1,11 @@
+import random
+
 import pytest
 from rdflib import Literal
 from rdflib.namespace import XSD
 
-from jrt.datatypes import detect_datatype, to_literal
+from jrt import datatypes
+from jrt.datatypes import detect_datatype, detect_datatypes, may_have_datatype, to_literal
 
 
 class TestDetectDatatype:
@@ -43,6 +46,66 @@ class TestDetectDatatype:
         assert detect_datatype(value) is None
 
 
+# Valid values of every kind, and pieces that break them in subtle ways
+SEEDS = [
+    "true",
+    "false",
+    "2024-01-15",
+    "2024-02-29",
+    "2023-02-29",
+    "0000-01-01",
+    "2024-01-15T10:30:00",
+    "2024-01-15T10:30:00.123456789Z",
+    "2024-01-15T23:59:60+02:00",
+    "2024-01-15T24:00:00",
+    "2024-01-15T10:30:00+24:00",
+    "http://example.org/x",
+    "https://example.org/x?y=1",
+    "ftp://example.org",
+    "http:/example.org",
+    "12345",
+]
+PIECES = ["", "0", "9", "-", ":", "T", "Z", "+", ".", " ", "\n", "\u0663", "/", "x", "http://"]
+
+
+def mutations(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        value = rng.choice(SEEDS)
+        for _ in range(rng.randint(0, 2)):
+            i = rng.randint(0, len(value))
+            cut = rng.randint(0, 1)
+            value = value[:i] + rng.choice(PIECES) + value[i + cut :]
+        yield value
+
+
+class TestDetectDatatypes:
+
+    def test_matches_detect_datatype(self):
+        values = SEEDS + list(mutations(5000))
+        assert detect_datatypes(values) == [detect_datatype(v) for v in values]
+
+    def test_pre_check_never_skips_typed_values(self):
+        for value in SEEDS + list(mutations(5000, seed=1)):
+            if not may_have_datatype(value):
+                assert detect_datatype(value) is None, value
+        assert not may_have_datatype("Item 12")
+
+    def test_repeated_values(self):
+        values = ["2024-01-15", "x", "2024-01-15", "true", "x"]
+        assert detect_datatypes(values) == [XSD.date, None, XSD.date, XSD.boolean, None]
+
+    def test_without_rdflib_converters(self, monkeypatch):
+        # the converters come from a private rdflib mapping: Literal is the fallback
+        monkeypatch.setattr(datatypes, "_toPythonMapping", {})
+        values = SEEDS + list(mutations(500, seed=2))
+        assert detect_datatypes(values) == [detect_datatype(v) for v in values]
+
+    def test_accepts_any_iterable(self):
+        assert detect_datatypes(iter(["true"])) == [XSD.boolean]
+        assert detect_datatypes([]) == []
+
+
 class TestToLiteral:
 
     def test_typed_string_gets_datatype(self):
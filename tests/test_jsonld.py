@@ -0,0 +1,118 @@
+import io
+import json
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import FOAF, RDF, RDFS, XSD
+
+from jrt.builder import GraphBuilder
+from jrt.jsonld import JsonLdWriter, jsonld_context
+
+BASE = "http://example.org/resource/"
+CONTEXT = jsonld_context(BASE, [("rdf", RDF), ("rdfs", RDFS), ("foaf", FOAF), ("xsd", XSD)])
+
+
+@pytest.fixture
+def graph():
+    g = Graph()
+    for i in range(10):
+        s = URIRef(f"{BASE}item-{i}")
+        g.add((s, RDF.type, FOAF.Document))
+        g.add((s, RDFS.label, Literal(f"Item {i}")))
+        g.add((s, URIRef(f"{BASE}rank"), Literal(i)))
+        g.add((s, URIRef(f"{BASE}ratio"), Literal(i / 7)))
+        g.add((s, URIRef(f"{BASE}active"), Literal(i % 2 == 0)))
+        g.add((s, URIRef(f"{BASE}name"), Literal(f"nom {i}", lang="fr")))
+        g.add((s, FOAF.maker, URIRef(f"{BASE}person/{i % 3}")))
+        g.add((s, URIRef(f"{BASE}linked"), BNode(f"b{i % 3}")))
+    g.add((BNode("b0"), URIRef(f"{BASE}created"), Literal("2021-03-04", datatype=XSD.date)))
+    g.add((URIRef(f"{BASE}x"), RDF.type, Literal("not a class")))
+    g.add(
+        (URIRef(f"{BASE}x"), URIRef("http://other.org/a:b"), Literal("007", datatype=XSD.integer))
+    )
+    g.add((URIRef(f"{BASE}x"), URIRef(f"{BASE}foaf"), Literal("a term named like a prefix")))
+    g.add((URIRef(f"{BASE}x"), URIRef(f"{BASE}@odd"), Literal(10**25)))
+    return g
+
+
+def write(*batches):
+    buffer = io.BytesIO()
+    with JsonLdWriter(buffer, CONTEXT) as writer:
+        for batch in batches:
+            writer.write(batch)
+    return buffer.getvalue()
+
+
+def parse(data):
+    return Graph().parse(data=data.decode("utf-8"), format="json-ld")
+
+
+class TestJsonLdWriter:
+
+    def test_round_trip(self, graph):
+        assert isomorphic(parse(write(graph)), graph)
+
+    def test_compact_nodes(self, graph):
+        document = json.loads(write(graph))
+        assert document["@context"] == CONTEXT
+        node = next(n for n in document["@graph"] if n["@id"] == "item-1")
+        assert node["@type"] == "foaf:Document"
+        assert node["rdfs:label"] == "Item 1"
+        assert node["rank"] == 1
+        assert node["active"] is False
+        assert node["ratio"] == {"@value": str(Literal(1 / 7)), "@type": "xsd:double"}
+        assert node["name"] == {"@value": "nom 1", "@language": "fr"}
+        assert node["foaf:maker"] == {"@id": "person/1"}
+
+    def test_batches_stream_nodes(self, graph):
+        triples = sorted(graph)
+        middle = len(triples) // 2
+        data = write(triples[:middle], triples[middle:])
+        assert isomorphic(parse(data), graph)
+
+    def test_base_without_trailing_slash(self, graph):
+        context = jsonld_context("http://example.org/resource/item-1#", [("rdf", RDF)])
+        buffer = io.BytesIO()
+        with JsonLdWriter(buffer, context) as writer:
+            writer.write(graph)
+        assert isomorphic(parse(buffer.getvalue()), graph)
+
+    def test_smaller_than_rdflib(self, graph):
+        # rdflib cannot serialize integers this large
+        graph.remove((None, URIRef(f"{BASE}@odd"), None))
+        assert len(write(graph)) < len(graph.serialize(format="json-ld", encoding="utf-8")) / 2
+
+    def test_empty_document(self):
+        assert json.loads(write()) == {"@context": CONTEXT, "@graph": []}
+
+    def test_context_skips_unusable_prefixes(self):
+        context = jsonld_context(
+            BASE,
+            [("", "http://a.org/"), ("ex", BASE), ("n", "http://a.org/ns"), ("b", "http://b.org/")],
+        )
+        assert context == {"@base": BASE, "@vocab": BASE, "b": "http://b.org/"}
+
+
+class TestBuilderWriteJsonLd:
+
+    def test_write_streams_records(self, sample_data, teapot_ontology):
+        data = [dict(sample_data, id=f"item-{i}") for i in range(5)]
+        builder = GraphBuilder(data=data, ontologies=[teapot_ontology])
+        buffer = io.BytesIO()
+        count = builder.write(buffer, format="json-ld")
+
+        expected = GraphBuilder(data=data, ontologies=[teapot_ontology]).build()
+        loaded = parse(buffer.getvalue())
+        assert len(loaded) == count
+        # one flush per record, plus the root resource and the ontology
+        assert builder.flushes == len(data) + 1
+        label = Literal("Teapot")
+        assert len(list(loaded.subjects(RDFS.label, label))) == len(
+            list(expected.subjects(RDFS.label, label))
+        )
+        assert "stuff" in json.loads(buffer.getvalue())["@context"]
+
+    def test_unknown_format(self, sample_data):
+        with pytest.raises(ValueError):
+            GraphBuilder(data=sample_data).write(io.BytesIO(), format="xml")
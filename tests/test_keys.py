@@ -0,0 +1,67 @@
+import pytest
+
+from jrt.keys import KeyMatcher, key_tokens, normalize_key
+
+
+@pytest.mark.parametrize(
+    "key", ["first_name", "firstName", "FirstName", "first-name", "First Name", "FIRST_NAME"]
+)
+def test_normalize_key_agrees_across_conventions(key):
+    assert normalize_key(key) == "firstname"
+
+
+@pytest.mark.parametrize(
+    "key, tokens",
+    [
+        ("HTTPServer", ["http", "server"]),
+        ("item2Count", ["item", "2", "count"]),
+        ("Théière verte", ["théière", "verte"]),
+        ("__", []),
+    ],
+)
+def test_key_tokens(key, tokens):
+    assert key_tokens(key) == tokens
+
+
+@pytest.mark.parametrize(
+    "key, singular",
+    [
+        ("addresses", "address"),
+        ("categories", "category"),
+        ("book_titles", "booktitle"),
+        ("status", "status"),
+        ("address", "address"),
+    ],
+)
+def test_singularize(key, singular):
+    assert normalize_key(key, singularize=True) == singular
+
+
+class TestKeyMatcher:
+
+    def test_exact_normalized_match(self):
+        matcher = KeyMatcher(["firstName", "familyName"])
+        assert matcher.match("first_name") == "firstName"
+        assert matcher.match("family-name") == "familyName"
+        assert matcher.match("familyNme") is None
+
+    def test_threshold_enables_approximate_match(self):
+        matcher = KeyMatcher(["firstName", "familyName", "homepage"], threshold=0.7)
+        assert matcher.match("familyNme") == "familyName"
+        assert matcher.match("zipcode") is None
+
+    def test_threshold_is_respected(self):
+        assert KeyMatcher(["familyName"], threshold=1.0).match("familyNme") is None
+
+    def test_colliding_terms_resolve_deterministically(self):
+        assert KeyMatcher(["first_name", "firstName"]).match("FirstName") == "firstName"
+
+    def test_results_are_cached_per_key(self):
+        matcher = KeyMatcher(["firstName"], threshold=0.5)
+        assert matcher.match("first_nam") == "firstName"
+        matcher._normalized.clear()
+        assert matcher.match("first_nam") == "firstName"
+
+    def test_invalid_threshold(self):
+        with pytest.raises(ValueError):
+            KeyMatcher([], threshold=0)
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from rdflib import Literal, URIRef
+from rdflib.namespace import FOAF, RDF, XSD, Namespace
+
+from jrt.builder import GraphBuilder
+from jrt.mapping import MappingSpec, PathRule
+from jrt.tabular import MIN_TABLE_ROWS
+
+SCHEMA = Namespace("https://schema.org/")
+
+
+@pytest.fixture
+def spec():
+    return MappingSpec.from_dict(
+        {
+            "prefixes": {"schema": str(SCHEMA)},
+            "paths": {
+                "$.items[*]": {"class": "schema:Book"},
+                "$.items[*].author": {"predicate": "schema:author"},
+                "$.items[*].published": {"datatype": "xsd:gYear"},
+                "$.internal": {"skip": True},
+            },
+        }
+    )
+
+
+@pytest.fixture
+def catalogue():
+    return {
+        "id": "catalogue",
+        "name": "Catalogue",
+        "internal": {"secret": "do not export"},
+        "items": [
+            {"id": "b1", "name": "Dune", "author": "Herbert", "published": "1965"},
+            {"id": "b2", "name": "Emma", "author": "Austen", "published": "1815"},
+        ],
+    }
+
+
+class TestMappingSpec:
+
+    def test_prefixes_are_expanded(self, spec):
+        assert spec.paths["$.items[*]"].rdf_type == SCHEMA.Book
+        assert spec.paths["$.items[*].published"].datatype == XSD.gYear
+
+    def test_full_uris_are_kept(self):
+        spec = MappingSpec.from_dict({"paths": {"$.a": {"predicate": "http://x.org/a"}}})
+        assert spec.paths["$.a"].predicate == URIRef("http://x.org/a")
+
+    def test_unknown_option_raises(self):
+        with pytest.raises(ValueError):
+            MappingSpec.from_dict({"paths": {"$.a": {"predicat": "foaf:name"}}})
+
+    def test_load_yaml_and_json(self, tmp_path):
+        yaml_path = tmp_path / "mapping.yaml"
+        yaml_path.write_text("paths:\n  $.name:\n    predicate: foaf:nick\n", encoding="utf-8")
+        json_path = tmp_path / "mapping.json"
+        json_path.write_text(json.dumps({"paths": {"$.name": {"predicate": "foaf:nick"}}}))
+
+        assert MappingSpec.load(yaml_path).paths == MappingSpec.load(json_path).paths
+        assert MappingSpec.load(yaml_path).source == yaml_path
+
+    def test_rule_merge_prefers_exact_fields(self):
+        exact = PathRule(predicate=FOAF.nick)
+        wildcard = PathRule(predicate=FOAF.name, datatype=XSD.string)
+        assert exact.merge(wildcard) == PathRule(predicate=FOAF.nick, datatype=XSD.string)
+
+
+class TestMappingConversion:
+
+    def test_overrides_are_applied(self, spec, catalogue, base_uri):
+        graph = GraphBuilder(data=catalogue, base_uri=base_uri, mapping=spec).build()
+
+        books = set(graph.subjects(RDF.type, SCHEMA.Book))
+        assert len(books) == 2
+        assert set(graph.objects(predicate=SCHEMA.author)) == {
+            Literal("Herbert"),
+            Literal("Austen"),
+        }
+        assert Literal("1965", datatype=XSD.gYear) in set(graph.objects())
+
+    def test_skipped_subtree_is_not_converted(self, spec, catalogue, base_uri):
+        graph = GraphBuilder(data=catalogue, base_uri=base_uri, mapping=spec).build()
+
+        assert Literal("do not export") not in set(graph.objects())
+        assert not list(graph.objects(predicate=URIRef(f"{base_uri}internal")))
+
+    def test_unmatched_paths_use_heuristics(self, spec, catalogue, base_uri):
+        with_spec = GraphBuilder(data=catalogue, base_uri=base_uri, mapping=spec).build()
+        without = GraphBuilder(data=catalogue, base_uri=base_uri).build()
+
+        label = URIRef("http://www.w3.org/2000/01/rdf-schema#label")
+        assert set(with_spec.triples((None, label, None))) == set(
+            without.triples((None, label, None))
+        )
+
+    def test_tabular_records_use_the_plan(self, spec, base_uri):
+        items = [
+            {"id": f"b{i}", "name": f"Book {i}", "author": "Anon", "published": "2000"}
+            for i in range(MIN_TABLE_ROWS)
+        ]
+        graph = GraphBuilder(data={"items": items}, base_uri=base_uri, mapping=spec).build()
+
+        assert len(set(graph.subjects(RDF.type, SCHEMA.Book))) == MIN_TABLE_ROWS
+        assert len(list(graph.triples((None, SCHEMA.author, Literal("Anon"))))) == MIN_TABLE_ROWS
+        assert Literal("2000", datatype=XSD.gYear) in set(graph.objects())
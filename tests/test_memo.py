@@ -0,0 +1,124 @@
+import io
+
+import pytest
+from rdflib import Graph, URIRef
+from rdflib.namespace import FOAF, OWL, RDF, XSD
+
+from jrt.builder import GraphBuilder
+from jrt.memo import CLASS, DATATYPE, PREDICATE, Memo
+from jrt.ontology import Ontology
+
+RECORDS = [
+    {"id": f"r{i}", "name": f"Item {i}", "type": "TeaPot", "age": i, "born": "2001-02-03"}
+    for i in range(10)
+]
+
+
+def convert(memo, ontology, **kwargs):
+    builder = GraphBuilder(data=iter(RECORDS), ontologies=[ontology], memo=memo, **kwargs)
+    out = io.BytesIO()
+    builder.write(out)
+    # the random root resource aside
+    return sorted(line for line in out.getvalue().splitlines() if b"owl#Thing" not in line)
+
+
+class TestMemo:
+
+    def test_results_are_reused_by_later_runs(self, tmp_path):
+        calls = []
+        compute = lambda key: calls.append(key) or URIRef(f"http://x/{key}")
+
+        with Memo(tmp_path / "m.memo") as memo:
+            assert not memo.bind("ontology")
+            assert memo.lookup(PREDICATE, "a", compute, "a") == URIRef("http://x/a")
+            assert memo.lookup(PREDICATE, "a", compute, "a") == URIRef("http://x/a")
+            assert memo.lookup(CLASS, "b", lambda: None) is None
+        assert calls == ["a"]
+
+        with Memo(tmp_path / "m.memo") as memo:
+            assert memo.bind("ontology")
+            assert memo.lookup(PREDICATE, "a", compute, "a") == URIRef("http://x/a")
+            assert memo.lookup(CLASS, "b", compute, "b") is None
+            assert (memo.loaded, memo.reused, memo.added) == (2, 2, 0)
+        assert calls == ["a"]
+
+    def test_other_fingerprint_drops_entries(self, tmp_path):
+        with Memo(tmp_path / "m.memo") as memo:
+            memo.bind("ontology", "options")
+            memo.lookup(PREDICATE, "a", lambda: URIRef("http://x/a"))
+        with Memo(tmp_path / "m.memo") as memo:
+            assert not memo.bind("ontology", "other options")
+            assert memo.lookup(PREDICATE, "a", lambda: URIRef("http://y/a")) == URIRef("http://y/a")
+        with Memo(tmp_path / "m.memo") as memo:
+            assert not memo.bind("ontology", "options")
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        def run(*keys):
+            with Memo(tmp_path / "m.memo", max_entries=3) as memo:
+                memo.bind("ontology")
+                for key in keys:
+                    memo.lookup(CLASS, key, lambda: None)
+                return memo
+
+        run("a", "b", "c")
+        run("c", "d")
+        memo = run()
+        assert memo.loaded == 3
+        memo = run("x")
+        assert memo.loaded == 3 and memo.added == 1
+        # "a" or "b" went first, then the other one
+        assert run("a", "b").added == 2
+        with pytest.raises(ValueError):
+            Memo(tmp_path / "m.memo", max_entries=0)
+
+    def test_datatypes_of_plain_strings_are_not_stored(self, tmp_path):
+        with Memo(tmp_path / "m.memo") as memo:
+            memo.bind("ontology")
+            assert memo.datatype("2001-02-03") == XSD.date
+            assert memo.datatype("https://example.org") == XSD.anyURI
+            assert memo.datatype("hello") is None
+            assert memo.datatype("2001-02-30") is None
+            assert memo.added == 3
+            assert memo.lookup(DATATYPE, "2001-02-30", lambda: XSD.date) is None
+
+    def test_save_needs_a_fingerprint(self, tmp_path):
+        memo = Memo(tmp_path / "m.memo")
+        with pytest.raises(ValueError):
+            memo.save()
+        memo.close()
+
+
+class TestMemoConversion:
+
+    def test_same_output_cold_and_warm(self, tmp_path, teapot_ontology, monkeypatch):
+        expected = convert(None, teapot_ontology)
+        with Memo(tmp_path / "m.memo") as memo:
+            assert convert(memo, teapot_ontology) == expected
+            assert memo.added > 0
+
+        # a warm run resolves nothing again
+        def fail(*args):
+            raise AssertionError("resolved again")
+
+        monkeypatch.setattr(GraphBuilder, "_resolve_predicate", fail)
+        monkeypatch.setattr(GraphBuilder, "_resolve_class", fail)
+        with Memo(tmp_path / "m.memo") as memo:
+            assert convert(memo, teapot_ontology) == expected
+            assert memo.added == 0 and memo.reused == memo.loaded
+        assert any(FOAF.age.encode() in line for line in expected)
+
+    def test_changed_ontology_or_options_invalidate(self, tmp_path, teapot_ontology_graph):
+        with Memo(tmp_path / "m.memo") as memo:
+            convert(memo, Ontology(teapot_ontology_graph))
+
+        with Memo(tmp_path / "m.memo") as memo:
+            convert(memo, Ontology(teapot_ontology_graph), base_uri="http://example.org/other/")
+            assert memo.loaded == 0
+
+        # "age" now resolves to a property of the ontology, not foaf:age
+        changed = Graph() + teapot_ontology_graph
+        changed.add((URIRef("http://example.org/stuff#age"), RDF.type, OWL.DatatypeProperty))
+        with Memo(tmp_path / "m.memo") as memo:
+            lines = convert(memo, Ontology(changed))
+            assert memo.loaded == 0
+        assert any(b'<http://example.org/stuff#age> "3"' in line for line in lines)
@@ -0,0 +1,37 @@
+from rdflib import URIRef
+
+from jrt.memory import LabelIndex, peak_rss
+
+
+def test_peak_rss_is_reported():
+    assert peak_rss() > 0
+
+
+class TestLabelIndex:
+
+    def test_lookups_span_memory_and_disk(self, tmp_path):
+        index = LabelIndex(tmp_dir=tmp_path)
+        index["dune"] = URIRef("http://example.org/b1")
+        index.spill()
+        assert index.spilled and index.in_memory == 0
+        index.setdefault("emma", URIRef("http://example.org/b2"))
+        # setdefault keeps the spilled entry
+        assert index.setdefault("dune", URIRef("http://example.org/other")) == URIRef(
+            "http://example.org/b1"
+        )
+        assert index.get("emma") == URIRef("http://example.org/b2")
+        assert index.get("unknown") is None
+        assert sorted(index) == ["dune", "emma"]
+        assert len(index) == 2
+
+        del index["dune"]
+        assert "dune" not in index
+        index.close()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_memory_only_until_spilled(self, tmp_path):
+        index = LabelIndex(tmp_dir=tmp_path)
+        index["a"] = URIRef("http://example.org/a")
+        assert not index.spilled and index.in_memory == 1
+        assert list(tmp_path.iterdir()) == []
+        index.close()
@@ -0,0 +1,107 @@
+import io
+
+import pytest
+from rdflib import BNode, Dataset, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, RDFS, XSD
+
+import jrt.ntriples
+from jrt.builder import GraphBuilder
+from jrt.ntriples import NTriplesWriter, _memory_triples
+
+EX = "http://example.org/"
+
+
+@pytest.fixture
+def graph():
+    g = Graph()
+    for i in range(50):
+        s = URIRef(f"{EX}resource/{i % 7}")
+        g.add((s, RDF.type, URIRef(f"{EX}Thing")))
+        g.add((s, RDFS.label, Literal(f"Thing {i}")))
+        g.add((s, URIRef(f"{EX}rank"), Literal(i)))
+        g.add((s, URIRef(f"{EX}ratio"), Literal(i / 7)))
+        g.add((s, URIRef(f"{EX}name"), Literal(f"nom {i}", lang="fr")))
+        g.add((s, URIRef(f"{EX}linked"), BNode(f"b{i % 3}")))
+    g.add((BNode("b0"), URIRef(f"{EX}created"), Literal("2021-03-04", datatype=XSD.date)))
+    g.add((URIRef(f"{EX}é"), URIRef(f"{EX}note"), Literal('a "quoted"\\ line\nand\r\nmore ☃')))
+    g.add((URIRef(f"{EX}x"), URIRef(f"{EX}tagged"), Literal('"hi"\n', lang="en")))
+    return g
+
+
+def write(triples, **kwargs):
+    buffer = io.BytesIO()
+    with NTriplesWriter(buffer, **kwargs) as writer:
+        writer.write(triples)
+    return buffer.getvalue()
+
+
+class TestNTriplesWriter:
+
+    @pytest.mark.parametrize("background", [False, True])
+    def test_bytes_match_rdflib(self, graph, background):
+        assert write(graph, background=background) == graph.serialize(format="nt", encoding="utf-8")
+
+    def test_memory_store_fast_path(self, graph):
+        # fails when an rdflib upgrade moves the private store attributes read
+        triples = _memory_triples(graph)
+        assert triples is not None
+        assert list(triples) == list(graph.triples((None, None, None)))
+
+    def test_round_trip(self, graph):
+        parsed = Graph().parse(data=write(graph).decode("utf-8"), format="nt")
+        assert isomorphic(parsed, graph)
+
+    def test_builder_output_matches_rdflib(self, sample_data, teapot_ontology):
+        data = [dict(sample_data, id=f"item-{i}", rank=i, note="x\ny") for i in range(100)]
+        graph = GraphBuilder(data=data, ontologies=[teapot_ontology]).build()
+        assert write(graph) == graph.serialize(format="nt", encoding="utf-8")
+
+    def test_small_buffers_and_cache_resets(self, graph, monkeypatch):
+        monkeypatch.setattr(jrt.ntriples, "CACHE_SIZE", 2)
+        monkeypatch.setattr(jrt.ntriples, "_LINES_PER_ENCODE", 3)
+        expected = graph.serialize(format="nt", encoding="utf-8")
+        assert write(graph, buffer_size=10) == expected
+        assert write(graph, buffer_size=10, background=True) == expected
+
+    def test_iterable_of_triples(self, graph):
+        # a plain iterable is formatted in the order given
+        assert write(iter(list(graph))) == graph.serialize(format="nt", encoding="utf-8")
+
+    def test_written_counts_bytes(self, graph):
+        buffer = io.BytesIO()
+        with NTriplesWriter(buffer) as writer:
+            writer.write(graph)
+        assert writer.written == len(buffer.getvalue())
+
+    def test_empty_graph(self):
+        assert write(Graph()) == b""
+
+    def test_invalid_uri_raises_like_rdflib(self):
+        g = Graph()
+        g.add((URIRef(f"{EX}a b"), RDF.type, URIRef(f"{EX}Thing")))
+        with pytest.raises(Exception, match="does not look like a valid URI"):
+            g.serialize(format="nt")
+        with pytest.raises(Exception, match="does not look like a valid URI"):
+            write(g)
+
+    def test_background_errors_reach_the_caller(self, graph):
+        class Broken(io.RawIOBase):
+            def write(self, data):
+                raise OSError("disk full")
+
+        writer = NTriplesWriter(Broken(), buffer_size=1, background=True)
+        with pytest.raises(OSError, match="disk full"):
+            writer.write(graph)
+            writer.close()
+
+    def test_dataset_matches_rdflib_nquads(self, graph):
+        ds = Dataset()
+        ds.add((URIRef(f"{EX}a"), RDFS.label, Literal("default")))
+        named = ds.graph(URIRef(f"{EX}graph"))
+        for triple in graph:
+            named.add(triple)
+        buffer = io.BytesIO()
+        with NTriplesWriter(buffer) as writer:
+            writer.write_dataset(ds)
+        assert buffer.getvalue() == ds.serialize(format="nquads", encoding="utf-8")
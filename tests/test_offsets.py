@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+from jrt import reader
+from jrt.mapping import MappingSpec
+from jrt.offsets import RecordIndex, index_records
+
+# delimiters inside strings, nested values
+TAGS = ["a,]", {"x": 2.5}]
+RECORDS = [{"id": f"r{i}", "name": "é" * i, "tags": TAGS, "n": i} for i in range(30)]
+
+
+@pytest.fixture
+def source(tmp_path):
+    # multibyte characters, and CRLF line ends that must not be translated
+    text = json.dumps(RECORDS, ensure_ascii=False, indent=1).replace("\n", "\r\n")
+    path = tmp_path / "records.json"
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+
+class TestRecordIndex:
+
+    @pytest.mark.parametrize("read_size", [reader.READ_SIZE, 7])
+    def test_ranges(self, source, monkeypatch, read_size):
+        # a tiny read size cuts items and numbers across blocks
+        monkeypatch.setattr(reader, "READ_SIZE", read_size)
+        assert index_records(source) == len(RECORDS)
+        with RecordIndex(source) as index:
+            assert len(index) == len(RECORDS)
+            assert list(index.records(0, 3)) == RECORDS[:3]
+            assert list(index.records(12, 17)) == RECORDS[12:17]
+            assert list(index.records(28, 100)) == RECORDS[28:]
+            assert list(index.records(-2, None)) == RECORDS[-2:]
+            assert list(index.records(20, 20)) == []
+
+    def test_shards_cover_the_array(self, source):
+        index_records(source)
+        with RecordIndex(source) as index:
+            shards = [index.shard(i, 4) for i in range(4)]
+            assert shards[0][0] == 0 and shards[-1][1] == len(RECORDS)
+            assert [r for shard in shards for r in index.records(*shard)] == RECORDS
+            with pytest.raises(ValueError):
+                index.shard(4, 4)
+
+    def test_records_follow_the_plan(self, source):
+        index_records(source)
+        plan = MappingSpec().compile(exclude=["$[*].tags"])
+        with RecordIndex(source) as index:
+            assert list(index.records(5, 6, plan)) == [{"id": "r5", "name": "é" * 5, "n": 5}]
+
+    def test_invalid_indexes(self, source, tmp_path):
+        path = tmp_path / "custom.idx"
+        index_records(source, path)
+        assert not (tmp_path / "records.json.jrtx").exists()
+        RecordIndex(source, path).close()
+
+        # a copy (new modification time) keeps its index
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        RecordIndex(source, path).close()
+        # an edit of the same size does not
+        source.write_bytes(source.read_bytes().replace(b'"r0"', b'"x0"'))
+        with pytest.raises(ValueError, match="out of date"):
+            RecordIndex(source, path)
+        path.write_bytes(b"garbage")
+        with pytest.raises(ValueError):
+            RecordIndex(source, path)
+
+        document = tmp_path / "document.json"
+        document.write_text('{"id": 1}', encoding="utf-8")
+        with pytest.raises(ValueError):
+            index_records(document)
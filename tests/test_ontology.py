@@ -1,10 +1,11 @@
 from pathlib import Path
 
 import pytest
-from rdflib import Graph, Literal, URIRef
-from rdflib.namespace import OWL, RDF, RDFS, Namespace
+from rdflib import BNode, Dataset, Graph, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS, XSD, Namespace
 
-from jrt.ontology import Ontology, OntologyLoader, OntologyResolver
+import jrt.ontology
+from jrt.ontology import Ontology, OntologyLoader, OntologyResolver, _memory_indexes
 
 
 class TestOntology:
@@ -155,3 +156,181 @@ class TestOntologyResolver:
 
     def test_unknown_term(self):
         assert self.resolver.resolve("doesNotExist") is None
+
+    def test_rdf_property_is_datatype_property(self):
+        EX = Namespace("http://example.org/ontology#")
+        g = Graph()
+        g.add((EX.color, RDF.type, RDF.Property))
+        resolver = OntologyResolver([g])
+        assert resolver.is_datatype_property(resolver.resolve("color"))
+
+    def test_localname_indexed_for_untyped_subjects(self):
+        EX = Namespace("http://example.org/ontology#")
+        g = Graph()
+        g.add((EX.weight, RDFS.comment, Literal("no type, no label")))
+        assert OntologyResolver([g]).resolve("weight") == EX.weight
+
+    def test_blank_node_subjects_are_ignored(self):
+        g = Graph()
+        node = BNode()
+        g.add((node, RDF.type, OWL.Class))
+        g.add((node, RDFS.label, Literal("Anonymous")))
+        resolver = OntologyResolver([g])
+        assert resolver.resolve("Anonymous") is None
+        assert not resolver.is_class(node)
+
+    def test_removed_triples_are_not_indexed(self):
+        EX = Namespace("http://example.org/ontology#")
+        g = Graph()
+        g.add((EX.gone, RDF.type, OWL.Class))
+        g.remove((EX.gone, RDF.type, OWL.Class))
+        resolver = OntologyResolver([g])
+        assert resolver.resolve("gone") is None
+        assert not resolver.is_class(EX.gone)
+
+    def test_graph_sharing_a_dataset_store_only_indexes_its_own_triples(self):
+        EX = Namespace("http://example.org/ontology#")
+        dataset = Dataset()
+        mine = dataset.graph(URIRef("http://example.org/graphs/mine"))
+        other = dataset.graph(URIRef("http://example.org/graphs/other"))
+        mine.add((EX.Teapot, RDF.type, OWL.Class))
+        other.add((EX.Kettle, RDF.type, OWL.Class))
+        other.add((EX.Kettle, RDFS.label, Literal("Kettle")))
+
+        resolver = OntologyResolver([mine])
+        assert resolver.is_class(EX.Teapot)
+        assert resolver.resolve("teapot") == EX.Teapot
+        assert not resolver.is_class(EX.Kettle)
+        assert resolver.resolve("kettle") is None
+
+    def test_memory_store_fast_path(self, monkeypatch):
+        # fails when an rdflib upgrade moves the private store attributes read
+        EX = Namespace("http://example.org/ontology#")
+        g = Graph()
+        g.add((EX.Teapot, RDF.type, OWL.Class))
+        g.add((EX.Teapot, RDFS.label, Literal("Teapot")))
+        g.add((EX.Kettle, RDFS.label, Literal("Teapot")))
+        g.add((EX.gone, RDF.type, OWL.Class))
+        g.remove((EX.gone, RDF.type, OWL.Class))
+        assert _memory_indexes(g) is not None
+
+        def scan():
+            types, labels, subjects = OntologyResolver._scan(g, [OWL.Class])
+            return [set(t) for t in types], {o: set(s) for o, s in labels}, set(subjects)
+
+        fast = scan()
+        monkeypatch.setattr(jrt.ontology, "_memory_indexes", lambda g: None)
+        assert fast == scan()
+
+    def test_fingerprint_follows_the_lookup_tables(self):
+        EX = Namespace("http://example.org/ontology#")
+
+        def graph(*extra):
+            g = Graph()
+            g.add((EX.Teapot, RDF.type, OWL.Class))
+            restriction = BNode()  # a new blank node in every parse
+            g.add((EX.Teapot, RDFS.subClassOf, restriction))
+            g.add((restriction, OWL.onProperty, EX.beudon))
+            for triple in extra:
+                g.add(triple)
+            return g
+
+        fingerprint = OntologyResolver([graph()]).fingerprint()
+        assert OntologyResolver([graph()]).fingerprint() == fingerprint
+        changed = OntologyResolver([graph((EX.Teapot, RDFS.label, Literal("Pot")))])
+        assert changed.fingerprint() != fingerprint
+        assert OntologyResolver([graph()], hierarchy=True).fingerprint() != fingerprint
+
+
+class TestOntologyHierarchy:
+    """Unit tests for the optional RDFS/OWL hierarchy closures."""
+
+    EX = Namespace("http://example.org/ontology#")
+
+    @pytest.fixture
+    def graph(self):
+        EX = self.EX
+        g = Graph()
+        g.add((EX.Agent, RDF.type, OWL.Class))
+        g.add((EX.Person, RDFS.subClassOf, EX.Agent))
+        g.add((EX.Author, RDFS.subClassOf, EX.Person))
+        g.add((EX.Book, RDF.type, OWL.Class))
+
+        g.add((EX.relatedTo, RDF.type, OWL.ObjectProperty))
+        g.add((EX.friendOf, RDFS.subPropertyOf, EX.relatedTo))
+        g.add((EX.bestFriendOf, RDFS.subPropertyOf, EX.friendOf))
+        g.add((EX.bestFriendOf, RDF.type, RDF.Property))
+
+        g.add((EX.spouse, RDF.type, OWL.FunctionalProperty))
+        g.add((EX.spouse, RDFS.range, EX.Person))
+        g.add((EX.nickname, RDF.type, OWL.FunctionalProperty))
+        g.add((EX.ancestorOf, RDF.type, OWL.TransitiveProperty))
+
+        g.add((EX.date, RDFS.range, XSD.date))
+        g.add((EX.birthDate, RDFS.subPropertyOf, EX.date))
+
+        # two properties sharing the label "title", told apart by their domain
+        g.add((EX.bookTitle, RDF.type, OWL.DatatypeProperty))
+        g.add((EX.bookTitle, RDFS.label, Literal("title")))
+        g.add((EX.bookTitle, RDFS.domain, EX.Book))
+        g.add((EX.personTitle, RDF.type, OWL.DatatypeProperty))
+        g.add((EX.personTitle, RDFS.label, Literal("title")))
+        g.add((EX.personTitle, RDFS.domain, EX.Person))
+        return g
+
+    def test_disabled_by_default(self, graph):
+        resolver = OntologyResolver([graph])
+        assert not resolver.is_object_property(self.EX.friendOf)
+        assert resolver.superclasses(self.EX.Author) == frozenset()
+
+    def test_subclass_closure(self, graph):
+        resolver = OntologyResolver([graph], hierarchy=True)
+        assert resolver.superclasses(self.EX.Author) == {self.EX.Person, self.EX.Agent}
+        assert resolver.is_class(self.EX.Author)
+
+    def test_subproperty_of_object_property_is_object_property(self, graph):
+        resolver = OntologyResolver([graph], hierarchy=True)
+        assert resolver.is_object_property(self.EX.friendOf)
+        # transitively, and overriding the rdf:Property datatype default
+        assert resolver.is_object_property(self.EX.bestFriendOf)
+        assert not resolver.is_datatype_property(self.EX.bestFriendOf)
+
+    def test_owl_characteristics(self, graph):
+        resolver = OntologyResolver([graph], hierarchy=True)
+        # a class range makes a functional property an object property
+        assert resolver.is_object_property(self.EX.spouse)
+        # without a range it defaults to datatype, like rdf:Property
+        assert resolver.is_datatype_property(self.EX.nickname)
+        assert resolver.is_object_property(self.EX.ancestorOf)
+
+    def test_datatype_range_is_inherited(self, graph):
+        resolver = OntologyResolver([graph], hierarchy=True)
+        assert resolver.datatype_range(self.EX.birthDate) == XSD.date
+        assert resolver.is_datatype_property(self.EX.birthDate)
+        assert resolver.datatype_range(self.EX.spouse) is None
+
+    def test_domain_drives_property_choice(self, graph):
+        resolver = OntologyResolver([graph], hierarchy=True)
+        assert resolver.resolve_property("title", self.EX.Book) == self.EX.bookTitle
+        # superclasses of the subject count as matching domains
+        assert resolver.resolve_property("title", self.EX.Author) == self.EX.personTitle
+        assert resolver.resolve_property("title") in {self.EX.bookTitle, self.EX.personTitle}
+
+    def test_cycles_terminate(self):
+        EX = self.EX
+        g = Graph()
+        g.add((EX.A, RDFS.subClassOf, EX.B))
+        g.add((EX.B, RDFS.subClassOf, EX.A))
+        resolver = OntologyResolver([g], hierarchy=True)
+        assert resolver.superclasses(EX.A) == {EX.B}
+        assert resolver.superclasses(EX.B) == {EX.A}
+
+    def test_generic_ranges_are_not_applied(self):
+        EX = self.EX
+        g = Graph()
+        g.add((EX.note, RDFS.range, RDFS.Literal))
+        g.add((EX.code, RDFS.range, XSD.string))
+        resolver = OntologyResolver([g], hierarchy=True)
+        assert resolver.is_datatype_property(EX.note)
+        assert resolver.datatype_range(EX.note) is None
+        assert resolver.datatype_range(EX.code) is None
@@ -1,8 +1,35 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
 import jrt
-from jrt import GraphBuilder, Ontology, OntologyLoader, OntologyResolver
+from jrt import BatchRule, GraphBuilder, Ontology, OntologyLoader, OntologyResolver
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def imported_modules(statement: str) -> set[str]:
+    """Names of the modules imported by *statement*, as reported by ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    return {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
 
 
 def test_public_api_exports():
+    assert BatchRule is jrt.BatchRule
     assert GraphBuilder is jrt.GraphBuilder
     assert Ontology is jrt.Ontology
     assert OntologyLoader is jrt.OntologyLoader
@@ -12,3 +39,23 @@ def test_public_api_exports():
 def test_version_is_exposed():
     assert isinstance(jrt.__version__, str)
     assert jrt.__version__
+
+
+def test_unknown_attribute_raises():
+    with pytest.raises(AttributeError):
+        jrt.DoesNotExist
+
+
+@pytest.mark.parametrize("statement", ["import jrt", "import jrt.cli"])
+def test_import_does_not_load_rdflib(statement):
+    modules = imported_modules(statement)
+    assert "jrt" in modules
+    assert not {m for m in modules if m.split(".")[0] == "rdflib"}
+    assert "jrt.builder" not in modules
+
+
+def test_public_api_access_loads_rdflib_on_demand():
+    # import_module() itself is not instrumented by -X importtime, but
+    # everything jrt.builder imports is
+    modules = imported_modules("import jrt; jrt.GraphBuilder")
+    assert {"rdflib", "jrt.ontology"} <= modules
@@ -0,0 +1,70 @@
+import pytest
+
+from jrt.paths import ANY_ITEM, ANY_KEY, build_trie, format_segment, parse_path
+
+
+class TestParsePath:
+
+    @pytest.mark.parametrize(
+        "expr, expected",
+        [
+            ("$", ()),
+            ("$.name", ("name",)),
+            ("$.items[*].author", ("items", ANY_ITEM, "author")),
+            ("$['first name'].value", ("first name", "value")),
+            ("$.*.id", (ANY_KEY, "id")),
+            ("$[*]", (ANY_ITEM,)),
+        ],
+    )
+    def test_valid_paths(self, expr, expected):
+        assert parse_path(expr) == expected
+
+    @pytest.mark.parametrize("key", ["name", "first name", "a.b", "x[0]", "it's", "*", ""])
+    def test_formatted_segments_parse_back(self, key):
+        assert parse_path(f"${format_segment(key)}[*]") == (key, ANY_ITEM)
+
+    @pytest.mark.parametrize("expr", ["name", "$.", "$[0]", "$..name"])
+    def test_invalid_paths(self, expr):
+        with pytest.raises(ValueError):
+            parse_path(expr)
+
+
+class TestBuildTrie:
+
+    def test_lookup_follows_segments(self):
+        trie = build_trie([("$.items[*].author", "author")])
+        assert trie.child("items").items.child("author").value == "author"
+        assert trie.child("other") is None
+
+    def test_wildcard_is_grafted_onto_named_members(self):
+        trie = build_trie(
+            [("$.*.id", "any"), ("$.book.title", "title")],
+            merge=lambda exact, wildcard: f"{exact}+{wildcard}",
+        )
+        book = trie.child("book")
+        assert book.child("title").value == "title"
+        assert book.child("id").value == "any"
+        assert trie.child("other").child("id").value == "any"
+
+    def test_merge_combines_exact_and_wildcard_values(self):
+        trie = build_trie(
+            [("$.*", "wild"), ("$.book", "exact")],
+            merge=lambda exact, wildcard: f"{exact}+{wildcard}",
+        )
+        assert trie.child("book").value == "exact+wild"
+
+    def test_include_prunes_everything_off_the_selected_paths(self):
+        trie = build_trie([], include=["$.items[*].author"], pruned="pruned")
+
+        items = trie.child("items")
+        assert items.value is None
+        assert items.items.child("author").value is None
+        assert items.items.child("title").value == "pruned"
+        assert trie.child("other").value == "pruned"
+
+    def test_included_subtree_stays_open(self):
+        trie = build_trie([], include=["$.author"], pruned="pruned")
+
+        author = trie.child("author")
+        assert author.value is None
+        assert author.child("name") is None
@@ -0,0 +1,102 @@
+import io
+import json
+import threading
+
+import pytest
+
+from jrt.builder import GraphBuilder
+from jrt.mapping import MappingSpec
+from jrt.pipeline import STAGES, Pipeline
+from jrt.reader import RecordStream
+
+# "stuffs" links each record to the previous one by label
+RECORDS = [{"id": f"r{i}", "name": f"Item {i}", "n": i} for i in range(60)]
+for i, record in enumerate(RECORDS[1:], 1):
+    record["stuffs"] = f"Item {i - 1}"
+
+
+@pytest.fixture
+def array_file(tmp_path):
+    path = tmp_path / "records.json"
+    path.write_text(json.dumps(RECORDS, indent=1), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def ndjson_file(tmp_path):
+    path = tmp_path / "records.ndjson"
+    lines = [json.dumps(record) for record in RECORDS]
+    lines.insert(10, "")  # blank lines are skipped
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def write(data, teapot_ontology):
+    builder = GraphBuilder(data=data, ontologies=[teapot_ontology])
+    out = io.BytesIO()
+    count = builder.write(out)
+    # the random root resource aside
+    lines = sorted(line for line in out.getvalue().splitlines() if b"owl#Thing" not in line)
+    return count, lines, builder
+
+
+class TestRecords:
+
+    def test_array_records_in_order(self, array_file):
+        assert list(Pipeline(array_file, batch_size=7)) == RECORDS
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_ndjson_records_in_order(self, ndjson_file, workers):
+        pipeline = Pipeline(ndjson_file, parse_workers=workers, batch_size=3, queue_size=2)
+        assert list(pipeline) == RECORDS
+        assert pipeline.stats["parse"].workers == workers
+
+    def test_plan_prunes_records(self, ndjson_file, array_file):
+        plan = MappingSpec().compile(exclude=["$[*].n"])
+        expected = [{k: v for k, v in record.items() if k != "n"} for record in RECORDS]
+        assert list(Pipeline(ndjson_file, plan, parse_workers=2)) == expected
+        assert list(Pipeline(array_file, plan)) == expected
+
+    def test_array_items_use_one_parser(self, array_file):
+        assert Pipeline(array_file, parse_workers=4).parse_workers == 1
+        with pytest.raises(ValueError):
+            Pipeline(array_file, parse_workers=0)
+
+
+class TestFailures:
+
+    def test_parse_error_reaches_the_consumer(self, tmp_path):
+        path = tmp_path / "broken.ndjson"
+        path.write_text('{"id": 1}\n{"id": \n{"id": 3}\n', encoding="utf-8")
+        with pytest.raises(json.JSONDecodeError):
+            list(Pipeline(path, parse_workers=2, batch_size=1))
+
+    def test_stopping_early_stops_the_threads(self, ndjson_file):
+        before = threading.active_count()
+        for record in Pipeline(ndjson_file, parse_workers=3, batch_size=1, queue_size=1):
+            break
+        assert threading.active_count() == before
+
+
+class TestWrite:
+
+    @pytest.mark.parametrize("fixture", ["array_file", "ndjson_file"])
+    def test_same_output_as_sequential(self, fixture, array_file, teapot_ontology, request):
+        expected = write(RecordStream(array_file), teapot_ontology)
+        pipeline = Pipeline(request.getfixturevalue(fixture), parse_workers=2, flush_every=8)
+        count, lines, builder = write(pipeline, teapot_ontology)
+
+        assert (count, lines) == expected[:2]
+        assert builder.flushes > len(RECORDS) // 8
+
+    def test_stage_stats(self, ndjson_file, teapot_ontology):
+        pipeline = Pipeline(ndjson_file, batch_size=10, flush_every=20)
+        write(pipeline, teapot_ontology)
+
+        assert list(pipeline.stats) == list(STAGES)
+        assert pipeline.stats["parse"].items == pipeline.stats["build"].items == len(RECORDS)
+        # three flushes, the last one with the ontology, and closing the output
+        assert pipeline.stats["write"].items == 5
+        for stats in pipeline.stats.values():
+            assert stats.elapsed > 0 and 0 <= stats.utilization <= 1
+        assert "items" in str(pipeline.stats["build"])
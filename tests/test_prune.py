@@ -0,0 +1,97 @@
+import pytest
+from rdflib import BNode, Graph, Literal, Namespace
+from rdflib.namespace import OWL, RDF, RDFS, XSD
+
+from jrt.builder import GraphBuilder
+from jrt.ontology import Ontology
+from jrt.prune import prune_ontology, used_terms
+
+EX = Namespace("http://example.org/zoo#")
+
+DATA = [
+    {"id": "ann", "name": "Ann", "type": "Person", "pets": [{"id": "tom", "type": "Cat"}]},
+    {"id": "rex", "name": "Rex", "type": "Dog", "owner": "Ann", "weight": "12.5"},
+]
+
+
+@pytest.fixture
+def zoo():
+    g = Graph()
+    g.bind("zoo", EX)
+    g.add((EX[""], RDF.type, OWL.Ontology))
+    g.add((EX[""], RDFS.label, Literal("Zoo")))
+    for cls in ("Animal", "Dog", "Cat", "Person", "Car", "Engine"):
+        g.add((EX[cls], RDF.type, OWL.Class))
+    g.add((EX.Dog, RDFS.subClassOf, EX.Animal))
+    g.add((EX.Cat, RDFS.subClassOf, EX.Animal))
+    g.add((EX.Animal, RDFS.subClassOf, EX.Living))  # untyped, only reached by closure
+    restriction = BNode()
+    g.add((EX.Dog, RDFS.subClassOf, restriction))
+    g.add((restriction, RDF.type, OWL.Restriction))
+    g.add((restriction, OWL.onProperty, EX.owner))
+    # "related" is only a property because sub-properties point to it
+    g.add((EX.owner, RDFS.subPropertyOf, EX.related))
+    g.add((EX.owner, RDFS.domain, EX.Animal))
+    g.add((EX.owner, RDFS.range, EX.Person))
+    g.add((EX.weight, RDF.type, OWL.DatatypeProperty))
+    g.add((EX.weight, RDFS.range, XSD.decimal))
+    g.add((EX.pets, RDF.type, OWL.ObjectProperty))
+    # two terms share the label "owner": both must stay
+    g.add((EX.carOwner, RDF.type, OWL.ObjectProperty))
+    g.add((EX.carOwner, RDFS.label, Literal("owner")))
+    g.add((EX.carOwner, RDFS.domain, EX.Car))
+    g.add((EX.engine, RDF.type, OWL.ObjectProperty))
+    g.add((EX.engine, RDFS.domain, EX.Car))
+    g.add((EX.engine, RDFS.range, EX.Engine))
+    g.add((EX.fuel, RDFS.subPropertyOf, EX.related))
+    return g
+
+
+def convert(graph, hierarchy):
+    builder = GraphBuilder(data=DATA, ontologies=[Ontology(graph)], hierarchy=hierarchy)
+    # the merged ontology and the random root resource aside
+    return {t for t in builder.build() if t not in graph and t[2] != OWL.Thing}
+
+
+class TestUsedTerms:
+
+    def test_keys_and_types(self):
+        keys, types = used_terms(DATA)
+        assert keys == {"id", "owner", "weight", "pets"}
+        assert types == {"Dog", "Person", "Cat"}
+
+
+class TestPruneOntology:
+
+    def test_keeps_used_terms_and_their_closure(self, zoo):
+        keys, types = used_terms(DATA)
+        pruned = prune_ontology([zoo], keys, types)
+        subjects = set(pruned.subjects())
+
+        assert {EX.Dog, EX.Cat, EX.Person, EX.owner, EX.carOwner, EX.weight, EX.pets} <= subjects
+        # superclasses, super-properties, domains and ranges
+        assert {EX.Animal, EX.related, EX.Car} <= set(pruned.all_nodes())
+        assert (EX.Animal, RDFS.subClassOf, EX.Living) in pruned
+        # blank node descriptions and the ontology header
+        assert (None, OWL.onProperty, EX.owner) in pruned
+        assert (EX[""], RDFS.label, Literal("Zoo")) in pruned
+        assert EX.engine not in subjects and EX.fuel not in subjects
+        assert len(pruned) < len(zoo)
+        assert pruned.namespace_manager.store.namespace("zoo") is not None
+
+    @pytest.mark.parametrize("hierarchy", [False, True])
+    def test_conversion_is_unchanged(self, zoo, hierarchy):
+        pruned = prune_ontology([zoo], *used_terms(DATA), hierarchy=hierarchy)
+        assert convert(pruned, hierarchy) == convert(zoo, hierarchy)
+
+    def test_hierarchy_kinds_are_stated(self, zoo):
+        pruned = prune_ontology([zoo], ["owner", "related"], hierarchy=True)
+        # inferred from the range, and from sub-properties left out
+        assert (EX.owner, RDF.type, OWL.ObjectProperty) in pruned
+        assert (EX.related, RDF.type, OWL.DatatypeProperty) in pruned
+        assert (EX.fuel, None, None) not in pruned
+
+    def test_key_list(self, zoo):
+        pruned = prune_ontology([zoo], keys=["engine"])
+        assert (EX.engine, RDFS.range, EX.Engine) in pruned
+        assert EX.Dog not in set(pruned.subjects())
@@ -0,0 +1,157 @@
+import hashlib
+import json
+
+import pytest
+
+import jrt.reader
+from jrt.mapping import MappingSpec
+from jrt.reader import (
+    RecordStream,
+    fingerprint,
+    hash_range,
+    is_array_document,
+    iter_records,
+    load_json,
+    loads,
+)
+
+DOCUMENT = {
+    "id": "catalogue",
+    "name": "Catalogue",
+    "internal": {"secret": [1, 2, 3]},
+    "items": [
+        {"id": "b1", "name": "Dune", "author": {"name": "Herbert"}, "pages": 412},
+        {"id": "b2", "name": "Emma", "author": {"name": "Austen"}, "pages": 474},
+    ],
+}
+
+
+def plan(include=(), exclude=()):
+    return MappingSpec().compile(include=include, exclude=exclude)
+
+
+class TestLoads:
+
+    def test_without_plan_matches_json(self):
+        text = json.dumps(DOCUMENT)
+        assert loads(text) == json.loads(text)
+
+    def test_unfiltered_plan_matches_json(self):
+        spec = MappingSpec.from_dict({"paths": {"$.items[*].author": {"predicate": "foaf:maker"}}})
+        text = json.dumps(DOCUMENT, indent=2)
+        assert loads(text, spec.compile()) == DOCUMENT
+
+    def test_exclude_drops_subtree(self):
+        loaded = loads(json.dumps(DOCUMENT), plan(exclude=["$.internal"]))
+        assert "internal" not in loaded
+        assert loaded["items"] == DOCUMENT["items"]
+
+    def test_include_keeps_selected_subtrees_and_identity_keys(self):
+        loaded = loads(json.dumps(DOCUMENT), plan(include=["$.items[*].author"]))
+        assert loaded == {
+            "id": "catalogue",
+            "name": "Catalogue",
+            "items": [
+                {"id": "b1", "name": "Dune", "author": {"name": "Herbert"}},
+                {"id": "b2", "name": "Emma", "author": {"name": "Austen"}},
+            ],
+        }
+
+    def test_excluded_array_items_are_dropped(self):
+        loaded = loads(json.dumps(DOCUMENT), plan(exclude=["$.items[*]"]))
+        assert loaded["items"] == []
+
+    @pytest.mark.parametrize("text", ['{"a": 1', '{"a" 1}', '{"a": 1} x', "[1 2]", "{1: 2}"])
+    def test_invalid_json_raises(self, text):
+        with pytest.raises(json.JSONDecodeError):
+            loads(text, plan(exclude=["$.b"]))
+
+    def test_load_json_reads_file(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_text(json.dumps(DOCUMENT), encoding="utf-8")
+        assert "internal" not in load_json(path, plan(exclude=["$.internal"]))
+
+
+class TestIterRecords:
+
+    RECORDS = [1, 2.5, "a,]b", {"x": [1, {"y": "]"}]}, None, True, 12345678901234567890]
+
+    @pytest.mark.parametrize("read_size", [1, 3, 64])
+    def test_yields_array_items(self, tmp_path, monkeypatch, read_size):
+        monkeypatch.setattr(jrt.reader, "READ_SIZE", read_size)
+        path = tmp_path / "records.json"
+        path.write_text(f"  \n{json.dumps(self.RECORDS, indent=1)}\n", encoding="utf-8")
+        assert list(iter_records(path)) == self.RECORDS
+        assert is_array_document(path)
+
+    def test_reads_lazily(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(jrt.reader, "READ_SIZE", 16)
+        path = tmp_path / "records.json"
+        path.write_text(json.dumps([{"id": i} for i in range(1000)]), encoding="utf-8")
+        records = iter_records(path)
+        assert next(records) == {"id": 0}
+        # the rest of the file is still unread
+        assert records.gi_frame.f_locals["f"].tell() < 100
+
+    def test_plan_prunes_items(self, tmp_path):
+        path = tmp_path / "records.json"
+        path.write_text(json.dumps(DOCUMENT["items"]), encoding="utf-8")
+        records = list(iter_records(path, plan(exclude=["$[*].author"])))
+        assert records == [
+            {"id": "b1", "name": "Dune", "pages": 412},
+            {"id": "b2", "name": "Emma", "pages": 474},
+        ]
+
+    def test_non_array_document_is_one_record(self, tmp_path):
+        path = tmp_path / "document.json"
+        path.write_text(json.dumps(DOCUMENT), encoding="utf-8")
+        assert list(iter_records(path)) == [DOCUMENT]
+        assert not is_array_document(path)
+
+    @pytest.mark.parametrize("text", ["[1, 2", "[1 2]", "[1, 2] x", "[1,]", "[,1]", "["])
+    def test_invalid_json_raises(self, tmp_path, text):
+        path = tmp_path / "bad.json"
+        path.write_text(text, encoding="utf-8")
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_records(path))
+
+    @pytest.mark.parametrize("read_size", [1, 5, 1 << 20])
+    def test_stream_resumes_at_item_offsets(self, tmp_path, monkeypatch, read_size):
+        monkeypatch.setattr(jrt.reader, "READ_SIZE", read_size)
+        records = ["é€", {"name": "𝄞 clef", "n": [1, 2]}, 3.5, "]", {}]
+        path = tmp_path / "records.json"
+        path.write_text("  \n" + json.dumps(records, indent=2, ensure_ascii=False), "utf-8")
+
+        stream = RecordStream(path)
+        for i, record in enumerate(stream):
+            assert record == records[i]
+            assert list(RecordStream(path, start=stream.offset)) == records[i + 1 :]
+        # a stream can be iterated again
+        assert list(stream) == records
+
+    def test_resumed_stream_checks_delimiters(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text("[1 2]", encoding="utf-8")
+        with pytest.raises(json.JSONDecodeError):
+            list(RecordStream(path, start=2))
+
+
+def test_fingerprint(tmp_path, monkeypatch):
+    monkeypatch.setattr(jrt.reader, "FINGERPRINT_BLOCK", 4)
+    path, copy = tmp_path / "a.json", tmp_path / "b.json"
+    path.write_bytes(b"[1, 2, 3, 4, 5]")
+    copy.write_bytes(path.read_bytes())
+    assert fingerprint(path) == fingerprint(copy)
+    for edited in (b"[9, 2, 3, 4, 5]", b"[1, 2, 3, 4, 9]", b"[1]"):
+        copy.write_bytes(edited)
+        assert fingerprint(copy) != fingerprint(path)
+
+
+def test_hash_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(jrt.reader, "READ_SIZE", 3)
+    path = tmp_path / "a.json"
+    path.write_bytes(b"[1, 2, 3, 4, 5]")
+    digest = hashlib.sha256()
+    hash_range(digest, path, 0, 4)
+    hash_range(digest, path, 4, 10)
+    assert digest.hexdigest() == hashlib.sha256(b"[1, 2, 3, ").hexdigest()
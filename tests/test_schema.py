@@ -0,0 +1,103 @@
+import pytest
+from rdflib import Literal, URIRef
+from rdflib.namespace import FOAF, OWL, RDF, RDFS
+
+from jrt.builder import GraphBuilder
+from jrt.schema import MAX_SHAPES, infer_schema, value_kind
+
+# the random root resource typed owl:Thing differs between builds
+strip = lambda g: {t for t in g if t[2] != OWL.Thing}
+
+
+@pytest.fixture
+def records():
+    return [
+        {
+            "id": f"p{i}",
+            "name": f"Person {i}",
+            "type": "Person",
+            "born": "1990-01-02",
+            "age": i,
+            "active": i % 2 == 0,
+            "note": None if i % 2 else "",
+            "address": {"id": f"a{i % 2}", "city": "Paris"},
+            "tags": ["a", 1],
+            "friends": [{"id": f"p{i + 1}", "name": f"Person {i + 1}"}],
+        }
+        for i in range(4)
+    ]
+
+
+class TestInferSchema:
+
+    def test_shapes_kinds_and_keys(self, records):
+        schema = infer_schema(records)
+
+        assert len(schema) == 3
+        person = schema.shapes[tuple(records[0])]
+        assert person.count == len(records)
+        assert person.kinds["note"] == {"null", "string"}
+        assert person.kinds["address"] == {"object"}
+        assert person.kinds["tags"] == {"array"}
+        assert (person.id_key, person.label_keys, person.type_key) == ("id", ["name"], "type")
+        assert ("id", "city") in schema
+        assert schema.shapes[("id", "name")].count == len(records)
+
+    def test_arrays_are_sampled(self, records):
+        schema = infer_schema({"items": records, "other": [{"x": 1}, {"y": 2}]}, sample=1)
+        assert ("y",) not in schema
+        assert schema.shapes[tuple(records[0])].count == 1
+
+    def test_number_of_shapes_is_bounded(self):
+        schema = infer_schema({str(i): {str(i): i} for i in range(MAX_SHAPES + 10)})
+        assert len(schema) == MAX_SHAPES
+
+    def test_value_kind(self):
+        kinds = [value_kind(v) for v in ({}, [], "", True, None, 1.5)]
+        assert kinds == ["object", "array", "string", "boolean", "null", "number"]
+
+
+class TestSchemaConversion:
+
+    def test_same_triples_as_generic_path(self, records, base_uri):
+        generic = GraphBuilder(data=records, base_uri=base_uri, tabular=False).build()
+        planned = GraphBuilder(data=records, base_uri=base_uri, infer_schema=True).build()
+
+        assert strip(planned) == strip(generic)
+        assert len(list(planned.objects(predicate=FOAF.age))) == len(records)
+
+    def test_objects_outside_the_schema_use_the_generic_path(self, records, base_uri):
+        schema = infer_schema(records[:1])
+        data = records + [{"id": "x", "label": "Other", "address": {"id": "lyon", "city": "Lyon"}}]
+        generic = GraphBuilder(data=data, base_uri=base_uri).build()
+        builder = GraphBuilder(data=data, base_uri=base_uri, schema=schema)
+
+        assert strip(builder.build()) == strip(generic)
+        assert builder.schema is schema
+
+    def test_streamed_records_are_sampled_and_all_converted(self, records, base_uri):
+        generic = GraphBuilder(data=records, base_uri=base_uri).build()
+        builder = GraphBuilder(data=iter(records), base_uri=base_uri, infer_schema=True)
+
+        assert strip(builder.build()) == strip(generic)
+        assert tuple(records[0]) in builder.schema
+
+    def test_rules_and_partitions_still_apply(self, records, base_uri):
+        def build(**kwargs):
+            builder = GraphBuilder(data=records, base_uri=base_uri, partition="record", **kwargs)
+            builder.add_rule("city", lambda key, value: (key, Literal(value.upper())))
+            return builder.build()
+
+        generic, planned = build(), build(infer_schema=True)
+        quads = lambda d: {q for q in d.quads() if q[2] != OWL.Thing}
+        assert quads(planned) == quads(generic)
+        assert any(o == Literal("PARIS") for _, _, o, _ in planned.quads())
+
+    def test_not_used_with_mapping_specs(self, records, base_uri):
+        builder = GraphBuilder(
+            data=records, base_uri=base_uri, infer_schema=True, exclude=["$[*].tags"]
+        )
+        graph = builder.build()
+        assert builder.schema is None
+        assert (None, URIRef(f"{base_uri}tags"), None) not in graph
+        assert (None, RDF.type, None) in graph and (None, RDFS.label, None) in graph
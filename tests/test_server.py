@@ -0,0 +1,212 @@
+import http.client
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS
+
+from jrt.server import ConversionService, make_server
+
+
+@pytest.fixture
+def service(teapot_ontology):
+    return ConversionService(ontologies=[teapot_ontology], base_uri="http://example.org/resource/")
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def tcp_server(service):
+    server = make_server(service, port=0, workers=2)
+    thread = _serve(server)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _connect(server):
+    return http.client.HTTPConnection(*server.server_address, timeout=10)
+
+
+def _parse(body, fmt="turtle"):
+    g = Graph()
+    g.parse(data=body.decode("utf-8"), format=fmt)
+    return g
+
+
+def _raw_status(server, request):
+    # http.client cannot send malformed framing headers
+    with socket.create_connection(server.server_address, timeout=10) as sock:
+        sock.sendall(request)
+        # read up to the close, which follows the metrics update
+        return int(sock.makefile("rb").read().split()[1])
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost", timeout=10)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(self.path))
+
+
+class TestConversionServer:
+
+    def test_convert_returns_streamed_rdf(self, tcp_server, sample_data):
+        conn = _connect(tcp_server)
+        conn.request("POST", "/convert?format=ttl", body=json.dumps(sample_data))
+        response = conn.getresponse()
+        assert response.status == 200
+        assert response.getheader("Content-Type").startswith("text/turtle")
+        assert response.getheader("Transfer-Encoding") == "chunked"
+
+        g = _parse(response.read())
+        subject = next(g.subjects(RDFS.label, Literal("Teapot")))
+        assert (subject, RDF.type, URIRef("http://example.org/stuff#TeaPot")) in g
+
+    def test_format_from_accept_header(self, tcp_server, sample_data):
+        conn = _connect(tcp_server)
+        conn.request(
+            "POST",
+            "/convert",
+            body=json.dumps(sample_data),
+            headers={"Accept": "application/n-triples"},
+        )
+        response = conn.getresponse()
+        assert response.getheader("Content-Type").startswith("application/n-triples")
+        assert (None, RDFS.label, Literal("Teapot")) in _parse(response.read(), "nt")
+
+    def test_jsonld_response(self, tcp_server, sample_data):
+        conn = _connect(tcp_server)
+        conn.request("POST", "/convert?format=json-ld", body=json.dumps(sample_data))
+        response = conn.getresponse()
+        assert response.getheader("Content-Type").startswith("application/ld+json")
+        assert (None, RDFS.label, Literal("Teapot")) in _parse(response.read(), "json-ld")
+
+    def test_chunked_request_body(self, tcp_server, sample_data):
+        payload = json.dumps(sample_data).encode("utf-8")
+        chunks = (payload[i : i + 7] for i in range(0, len(payload), 7))
+        conn = _connect(tcp_server)
+        conn.request("POST", "/convert", body=chunks, encode_chunked=True)
+        response = conn.getresponse()
+        assert response.status == 200
+        assert (None, RDFS.label, Literal("Cup")) in _parse(response.read())
+
+    def test_keep_alive_serves_several_requests(self, tcp_server, sample_data):
+        conn = _connect(tcp_server)
+        for _ in range(3):
+            conn.request("POST", "/convert", body=json.dumps(sample_data))
+            assert conn.getresponse().read()
+
+    def test_errors(self, tcp_server):
+        conn = _connect(tcp_server)
+        conn.request("POST", "/convert", body="{not json")
+        response = conn.getresponse()
+        assert response.status == 400
+        response.read()
+
+        conn.request("POST", "/convert?format=rdfa", body="{}")
+        response = conn.getresponse()
+        assert response.status == 406
+        response.read()
+
+        conn.request("GET", "/nowhere")
+        response = conn.getresponse()
+        assert response.status == 404
+        response.read()
+
+    @pytest.mark.parametrize(
+        "framing",
+        [
+            b"Content-Length: abc\r\n\r\n{}",
+            b"Content-Length: -1\r\n\r\n{}",
+            b"Content-Length: 1_0\r\n\r\n{}",
+            b"Transfer-Encoding: chunked\r\n\r\nzz\r\n{}\r\n0\r\n\r\n",
+            b"Transfer-Encoding: chunked\r\n\r\n-2\r\n{}\r\n0\r\n\r\n",
+        ],
+    )
+    def test_malformed_body_framing(self, tcp_server, framing):
+        assert _raw_status(tcp_server, b"POST /convert HTTP/1.1\r\n" + framing) == 400
+        conn = _connect(tcp_server)
+        conn.request("GET", "/metrics")
+        text = conn.getresponse().read().decode("utf-8")
+        assert 'jrt_requests_total{status="400"} 1' in text
+        assert 'status="500"' not in text
+
+    def test_body_size_limit(self, service, sample_data):
+        body = json.dumps(sample_data).encode("utf-8")
+        server = make_server(service, port=0, workers=1, max_body=len(body))
+        thread = _serve(server)
+        try:
+            conn = _connect(server)
+            conn.request("POST", "/convert", body=body)
+            assert conn.getresponse().read()
+            conn.request("POST", "/convert", body=body + b" ")
+            assert conn.getresponse().status == 413
+
+            chunks = b"10\r\n" + b" " * 16 + b"\r\n"
+            request = b"POST /convert HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+            assert _raw_status(server, request + chunks * (len(body) // 16 + 1)) == 413
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    def test_concurrent_requests(self, tcp_server, sample_data):
+        def convert(i):
+            conn = _connect(tcp_server)
+            conn.request("POST", "/convert", body=json.dumps({**sample_data, "id": f"item-{i}"}))
+            return conn.getresponse().status
+
+        with ThreadPoolExecutor(8) as pool:
+            assert set(pool.map(convert, range(16))) == {200}
+
+    def test_metrics(self, tcp_server, sample_data):
+        conn = _connect(tcp_server)
+        conn.request("POST", "/convert", body=json.dumps(sample_data))
+        conn.getresponse().read()
+        conn.request("POST", "/convert", body="[")
+        conn.getresponse().read()
+
+        conn.request("GET", "/metrics")
+        text = conn.getresponse().read().decode("utf-8")
+        assert 'jrt_requests_total{status="200"} 1' in text
+        assert 'jrt_requests_total{status="400"} 1' in text
+        assert 'jrt_request_duration_seconds_bucket{le="+Inf"} 2' in text
+        assert "jrt_request_duration_seconds_count 2" in text
+        assert "jrt_throughput_requests_per_second" in text
+        assert "jrt_requests_in_flight 0" in text
+
+    def test_unix_socket(self, service, sample_data, tmp_path):
+        path = tmp_path / "jrt.sock"
+        server = make_server(service, socket_path=path, workers=1)
+        thread = _serve(server)
+        try:
+            conn = _UnixConnection(path)
+            conn.request("GET", "/health")
+            assert conn.getresponse().read() == b"ok\n"
+            conn.request("POST", "/convert", body=json.dumps(sample_data))
+            assert (None, RDFS.label, Literal("Teapot")) in _parse(conn.getresponse().read())
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        assert not path.exists()
+
+    def test_invalid_settings(self, service):
+        with pytest.raises(ValueError):
+            make_server(service, port=0, workers=0)
+        with pytest.raises(ValueError):
+            make_server(service, port=0, default_format="rdfa")
+        with pytest.raises(ValueError):
+            make_server(service, port=0, max_body=-1)
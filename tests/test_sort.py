@@ -0,0 +1,74 @@
+import io
+import random
+
+import pytest
+
+from jrt.sort import parse_size, sort_lines, sort_ntriples
+
+
+@pytest.fixture
+def ntriples_lines():
+    rng = random.Random(42)
+    lines = [
+        f'<http://example.org/s{rng.randrange(200)}> <http://example.org/p> "v{i % 50}" .\n'
+        for i in range(2000)
+    ]
+    return lines
+
+
+class TestParseSize:
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [("1024", 1024), ("64M", 64 * 1024**2), ("2GiB", 2 * 1024**3), ("1.5k", 1536)],
+    )
+    def test_valid_sizes(self, value, expected):
+        assert parse_size(value) == expected
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            parse_size("lots")
+
+
+class TestSortLines:
+
+    def test_in_memory_sort(self, ntriples_lines):
+        out = io.StringIO()
+        count = sort_lines(ntriples_lines, out)
+        assert count == len(ntriples_lines)
+        assert out.getvalue() == "".join(sorted(ntriples_lines))
+
+    @pytest.mark.parametrize("dedupe", [False, True])
+    def test_spilled_runs_match_in_memory_sort(self, ntriples_lines, tmp_path, dedupe):
+        expected = sorted(set(ntriples_lines)) if dedupe else sorted(ntriples_lines)
+        out = io.StringIO()
+        # a tiny budget forces dozens of spill files
+        count = sort_lines(ntriples_lines, out, dedupe=dedupe, max_memory=4096, tmp_dir=tmp_path)
+        assert count == len(expected)
+        assert out.getvalue() == "".join(expected)
+
+    def test_blank_lines_and_comments_are_dropped(self):
+        out = io.StringIO()
+        sort_lines(["# comment\n", "\n", "<b> <p> <o> .", "<a> <p> <o> .\n"], out)
+        assert out.getvalue() == "<a> <p> <o> .\n<b> <p> <o> .\n"
+
+    def test_code_point_order_matches_byte_order(self):
+        lines = ['<x> <p> "é" .\n', '<x> <p> "z" .\n', '<x> <p> "Z" .\n']
+        out = io.StringIO()
+        sort_lines(lines, out)
+        assert out.getvalue().splitlines(keepends=True) == sorted(
+            lines, key=lambda line: line.encode("utf-8")
+        )
+
+
+class TestSortNTriples:
+
+    def test_sort_in_place(self, ntriples_lines, tmp_path):
+        path = tmp_path / "out.nt"
+        path.write_text("".join(ntriples_lines), encoding="utf-8")
+
+        count = sort_ntriples(path, path, dedupe=True, max_memory=4096)
+
+        assert count == len(set(ntriples_lines))
+        assert path.read_text(encoding="utf-8") == "".join(sorted(set(ntriples_lines)))
+        assert [p.name for p in tmp_path.iterdir()] == ["out.nt"]
@@ -0,0 +1,84 @@
+import io
+from collections import Counter
+
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import FOAF, RDF, RDFS, XSD
+
+from jrt.builder import GraphBuilder
+from jrt.stats import StatsSink
+
+STUFF = "http://example.org/stuff#"
+
+RECORDS = [
+    {"id": f"r{i}", "name": f"Item {i}", "type": "TeaPot", "age": i, "born": "2001-02-03"}
+    for i in range(30)
+]
+# links to earlier records by label, and to a label nobody has
+for i, record in enumerate(RECORDS[1:], 1):
+    record["stuffs"] = f"Item {i - 1}" if i % 3 else "Nobody"
+
+
+def builder(teapot_ontology, base_uri, data=None):
+    return GraphBuilder(data=iter(data or RECORDS), ontologies=[teapot_ontology], base_uri=base_uri)
+
+
+class TestWriteStats:
+
+    def test_counts_match_the_written_output(self, teapot_ontology, base_uri):
+        out = io.BytesIO()
+        builder(teapot_ontology, base_uri).write(out)
+        graph = Graph().parse(data=out.getvalue(), format="nt")
+
+        stats = builder(teapot_ontology, base_uri).write_stats()
+
+        assert stats.triples == len(graph)
+        assert stats.predicates == Counter(p for _, p, _ in graph)
+        assert stats.classes[URIRef(f"{STUFF}TeaPot")] == len(RECORDS)
+        assert stats.datatypes[XSD.integer] == len(RECORDS)
+        assert stats.datatypes[XSD.date] == len(RECORDS)
+        plain = [o for o in graph.objects() if isinstance(o, Literal) and o.datatype is None]
+        assert stats.untyped == len(plain) and stats.ill_typed == 0
+
+    def test_unresolved_keys_and_links(self, teapot_ontology, base_uri):
+        stats = builder(teapot_ontology, base_uri).write_stats()
+
+        # "age" is foaf:age and "stuffs" a property of the ontology; "id" and "born" have no term
+        assert stats.unresolved == {"id": len(RECORDS), "born": len(RECORDS)}
+        assert stats.predicates[FOAF.age] == len(RECORDS)
+        # every third value is "Nobody": one new resource, then linked to it
+        assert (stats.link_hits, stats.link_misses) == (len(RECORDS) - 2, 1)
+        assert 0.9 < stats.link_hit_rate < 1
+
+    def test_graph_is_not_held(self, teapot_ontology, base_uri, monkeypatch):
+        monkeypatch.setattr("jrt.builder.FLUSH_EVERY", 10)
+        b = builder(teapot_ontology, base_uri)
+        b.write_stats()
+        assert b.flushes == len(RECORDS) // 10 + 1
+        assert len(b.graph) == 0
+
+    def test_report(self, teapot_ontology, base_uri):
+        report = str(builder(teapot_ontology, base_uri).write_stats())
+        for title in ("Predicates", "Classes", "Datatypes", "Unresolved keys (2)"):
+            assert title in report
+        assert str(FOAF.age) in report
+
+
+class TestStatsSink:
+
+    def test_literal_kinds(self):
+        s = URIRef("http://x/s")
+        sink = StatsSink("http://x/")
+        sink.write(
+            [
+                (s, RDFS.label, Literal("hello", lang="en")),
+                (s, RDFS.comment, Literal("plain")),
+                (s, URIRef("http://x/when"), Literal("2001-02-30", datatype=XSD.date)),
+                (s, RDF.type, URIRef("http://x/Thing")),
+            ]
+        )
+        stats = sink.stats
+        assert stats.triples == 4
+        assert stats.datatypes == {RDF.langString: 1, XSD.string: 1, XSD.date: 1}
+        assert (stats.untyped, stats.ill_typed) == (1, 1)
+        assert stats.classes == {URIRef("http://x/Thing"): 1}
+        assert stats.unresolved == {"when": 1}
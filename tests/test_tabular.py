@@ -0,0 +1,129 @@
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS, XSD, Namespace
+
+from jrt import builder as builder_module
+from jrt import datatypes
+from jrt.builder import GraphBuilder
+from jrt.ontology import Ontology
+from jrt.tabular import MIN_TABLE_ROWS, read_csv, read_table, record_columns
+
+
+@pytest.fixture
+def table_rows():
+    return [
+        {
+            "id": f"row-{i}",
+            "name": f"Item {i}",
+            "type": "Thing",
+            "released": "2024-01-15",
+            "count": i,
+            "active": i % 2 == 0,
+            "remark": "" if i % 3 == 0 else f"note {i}",
+        }
+        for i in range(MIN_TABLE_ROWS * 2)
+    ]
+
+
+class TestRecordColumns:
+
+    def test_homogeneous_records_are_a_table(self, table_rows):
+        assert record_columns(table_rows) == list(table_rows[0])
+
+    def test_too_few_rows(self, table_rows):
+        assert record_columns(table_rows[: MIN_TABLE_ROWS - 1]) is None
+
+    def test_different_keys(self, table_rows):
+        table_rows[3] = {"id": "other"}
+        assert record_columns(table_rows) is None
+
+    def test_nested_values(self, table_rows):
+        table_rows[5]["remark"] = {"nested": True}
+        assert record_columns(table_rows) is None
+
+    def test_non_mapping_rows(self):
+        assert record_columns(["a"] * MIN_TABLE_ROWS) is None
+
+
+class TestTabularConversion:
+
+    def test_same_triples_as_generic_path(self, table_rows, base_uri):
+        fast = GraphBuilder(data=table_rows, base_uri=base_uri).build()
+        slow = GraphBuilder(data=table_rows, base_uri=base_uri, tabular=False).build()
+
+        # the top-level list gets a random root URI typed owl:Thing; ignore it
+        strip = lambda g: {t for t in g if t[2] != OWL.Thing}
+        assert strip(fast) == strip(slow)
+
+    def test_nested_table_is_linked_to_parent(self, table_rows, base_uri):
+        data = {"id": "root", "name": "Root", "items": table_rows}
+        fast = GraphBuilder(data=data, base_uri=base_uri).build()
+        slow = GraphBuilder(data=data, base_uri=base_uri, tabular=False).build()
+
+        assert set(fast) == set(slow)
+        assert len(list(fast.objects(predicate=URIRef(f"{base_uri}items")))) == len(table_rows)
+
+    def test_column_datatypes_and_empty_cells(self, table_rows, base_uri):
+        graph = GraphBuilder(data=table_rows, base_uri=base_uri).build()
+
+        created = set(graph.objects(predicate=URIRef(f"{base_uri}released")))
+        assert {o.datatype for o in created} == {XSD.date}
+        # empty cells are skipped exactly like empty JSON strings
+        remarks = set(graph.objects(predicate=URIRef(f"{base_uri}remark")))
+        assert Literal("") not in remarks
+        assert len(remarks) == len([r for r in table_rows if r["remark"]])
+
+    def test_datatypes_detected_once_per_column(self, table_rows, base_uri, monkeypatch):
+        calls = []
+
+        def detect(values):
+            calls.append(sorted(values))
+            return datatypes.detect_datatypes(values)
+
+        monkeypatch.setattr(builder_module, "detect_datatypes", detect)
+        graph = GraphBuilder(data=table_rows, base_uri=base_uri).build()
+
+        # one batch per plain string column: id, name, released and remark
+        assert len(calls) == 4 and ["2024-01-15"] in calls
+        created = set(graph.objects(predicate=URIRef(f"{base_uri}released")))
+        assert {o.datatype for o in created} == {XSD.date}
+
+    def test_rules_apply_per_column(self, table_rows, base_uri):
+        builder = GraphBuilder(data=table_rows, base_uri=base_uri)
+        builder.add_rule("remark", lambda key, value: (key, Literal(str(value).upper())))
+        builder.add_rule("released", Literal("forced"))
+        graph = builder.build()
+
+        assert Literal("NOTE 1") in set(graph.objects(predicate=URIRef(f"{base_uri}remark")))
+        assert set(graph.objects(predicate=URIRef(f"{base_uri}released"))) == {Literal("forced")}
+
+    def test_object_property_column_links_by_label(self, base_uri):
+        EX = Namespace("http://example.org/stuff#")
+        onto = Graph()
+        onto.add((EX.owner, RDF.type, OWL.ObjectProperty))
+        rows = [{"name": f"Pot {i}", "owner": "Alice"} for i in range(MIN_TABLE_ROWS)]
+
+        graph = GraphBuilder(
+            data=rows, ontologies=[Ontology(graph=onto)], base_uri=base_uri
+        ).build()
+
+        owners = set(graph.objects(predicate=EX.owner))
+        assert len(owners) == 1
+        assert (owners.pop(), RDFS.label, Literal("Alice")) in graph
+
+
+class TestReadTable:
+
+    def test_read_csv(self, tmp_path):
+        path = tmp_path / "table.csv"
+        path.write_text("id,name\n1,Teapot\n2,Cup\n", encoding="utf-8")
+        assert read_csv(path) == [{"id": "1", "name": "Teapot"}, {"id": "2", "name": "Cup"}]
+
+    def test_read_tsv(self, tmp_path):
+        path = tmp_path / "table.tsv"
+        path.write_text("id\tname\n1\tTeapot\n", encoding="utf-8")
+        assert read_table(path) == [{"id": "1", "name": "Teapot"}]
+
+    def test_unknown_extension(self, tmp_path):
+        with pytest.raises(ValueError):
+            read_table(tmp_path / "table.xlsx")